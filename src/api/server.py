@@ -0,0 +1,182 @@
+# src/api/server.py
+
+import sys
+import os
+import json
+import asyncio
+import argparse
+import logging
+from typing import Optional
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.engine import QAEngine, build_engine
+from src.vector_store.metadata_index import validate_filters
+
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """Parses one HTTP/1.1 request: returns (method, path, json_body)."""
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise HTTPError(400, "Empty request.")
+    try:
+        method, path, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.")
+
+    headers = {}
+    while (line := (await reader.readline()).decode("latin-1").strip()):
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length.")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large.")
+    body = {}
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except json.JSONDecodeError:
+            raise HTTPError(400, "Request body must be JSON.")
+    return method.upper(), path.split("?", 1)[0], body
+
+
+def _head(status: int, content_type: str, extra: str = "") -> bytes:
+    return (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\nConnection: close\r\n{extra}\r\n").encode()
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict, head_only: bool = False):
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, "application/json", f"Content-Length: {len(body)}\r\n") + (b"" if head_only else body))
+    await writer.drain()
+
+
+async def _send_figure(writer: asyncio.StreamWriter, engine: QAEngine, path: str, head_only: bool = False):
+    """GET /figures/<name> (full size) or /figures/<name>/thumbnail (from the packed thumbnails)."""
+    name, _, variant = path[len("/figures/"):].partition("/")
+    if engine.figure_index is None or name not in engine.figure_index.figures or variant not in ("", "thumbnail"):
+        raise HTTPError(404, f"Unknown figure {path}.")
+    if variant:
+        data = engine.figure_index.thumbnail(name)
+    else:
+        data = await asyncio.to_thread(_read_file, engine.figure_index.full_path(name))
+    # Figures only change when the manuals are re-ingested, so clients may keep them for a day.
+    writer.write(_head(200, "image/jpeg", f"Content-Length: {len(data)}\r\nCache-Control: max-age=86400\r\n")
+                 + (b"" if head_only else data))
+    await writer.drain()
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _question(body: dict) -> str:
+    question = body.get("question") if isinstance(body, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        raise HTTPError(400, "Body must be a JSON object with a non-empty 'question'.")
+    return question.strip()
+
+
+def _filters(body: dict) -> Optional[dict]:
+    """Optional metadata selectors, e.g. {"source": "manual.pdf", "pages": [10, 20]}."""
+    filters = body.get("filters")
+    if not filters:
+        return None
+    try:
+        return validate_filters(filters)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+
+def make_handler(engine: QAEngine):
+    """
+    Returns the connection handler. Routes:
+      GET  /health  -> {"status": "ok"}
+      GET  /metrics -> cache, single-flight and other engine counters
+      GET  /figures/<name>[/thumbnail] -> a figure listed with an answer, full size or as a thumbnail
+      POST /answer  -> {"answer", "source", "figures", "timings"}
+      POST /stream  -> the answer as chunked text/plain, sent as it is generated
+    Both POST routes take {"question": ..., "filters": {...}}; filters are optional.
+    The GET routes also answer HEAD; any other method gets 405, as does a non-POST request to a POST route.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        streaming = False
+        try:
+            method, path, body = await _read_request(reader)
+            if path in ("/health", "/metrics") or path.startswith("/figures/"):
+                if method not in ("GET", "HEAD"):
+                    raise HTTPError(405, "Use GET.")
+                head_only = method == "HEAD"
+                if path == "/health":
+                    await _send_json(writer, 200, {"status": "ok"}, head_only)
+                elif path == "/metrics":
+                    await _send_json(writer, 200, engine.metrics(), head_only)
+                else:
+                    await _send_figure(writer, engine, path, head_only)
+            elif path not in ("/answer", "/stream"):
+                raise HTTPError(404, f"Unknown path {path}.")
+            elif method != "POST":
+                raise HTTPError(405, "Use POST.")
+            elif path == "/answer":
+                await _send_json(writer, 200, await engine.answer(_question(body), filters=_filters(body)))
+            else:
+                question, filters = _question(body), _filters(body)
+                writer.write(_head(200, "text/plain; charset=utf-8", "Transfer-Encoding: chunked\r\n"))
+                streaming = True
+                async for chunk in engine.stream_answer(question, filters=filters):
+                    data = chunk.encode()
+                    writer.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except HTTPError as e:
+            await _send_json(writer, e.status, {"error": str(e)})
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            log.exception("Request failed")
+            if not streaming:
+                await _send_json(writer, 500, {"error": str(e)})
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(engine: QAEngine, host: str, port: int):
+    server = await asyncio.start_server(make_handler(engine), host, port)
+    log.info("Question-answering API listening on http://%s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the question-answering engine over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    asyncio.run(serve(build_engine(), args.host, args.port))
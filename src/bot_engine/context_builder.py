@@ -0,0 +1,173 @@
+# src/bot_engine/context_builder.py
+
+import re
+import math
+import logging
+from collections import Counter
+from langchain_core.documents import Document
+
+log = logging.getLogger(__name__)
+
+# Gemini tokenizes English manual text at roughly four characters per token.
+CHARS_PER_TOKEN = 4
+# Chunks more similar than this to an already selected chunk are treated as duplicates.
+DUPLICATE_SIMILARITY = 0.9
+# Longest text overlap searched for when chunks carry no `start_index` (splitter overlap is 300).
+MAX_TEXT_OVERLAP = 400
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# A table block as the loader writes it; a block cut off by the end of a chunk runs to the end of the text.
+_TABLE_RE = re.compile(r"(--- TABLE START ---\n)(.*?)(\n--- TABLE END ---|\Z)", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _term_vector(text: str) -> Counter:
+    return Counter(_WORD_RE.findall(text.lower()))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def select_mmr(docs: list[Document], question: str, token_budget: int, mmr_lambda: float = 0.7) -> list[Document]:
+    """
+    Picks chunks by maximal marginal relevance until the token budget is spent.
+
+    Relevance blends the retriever's rank (semantic) with lexical overlap with the
+    question; redundancy is lexical similarity to chunks already picked. Everything
+    is computed locally, so no extra embedding calls are made.
+    """
+    if not docs:
+        return []
+    query_vector = _term_vector(question)
+    doc_vectors = [_term_vector(d.page_content) for d in docs]
+    relevance = [
+        0.5 * (1 - rank / len(docs)) + 0.5 * _cosine(query_vector, vector)
+        for rank, vector in enumerate(doc_vectors)
+    ]
+
+    selected, remaining, used_tokens = [], list(range(len(docs))), 0
+    while remaining and used_tokens < token_budget:
+        best_index, best_score, best_redundancy = None, -math.inf, 0.0
+        for i in remaining:
+            redundancy = max((_cosine(doc_vectors[i], doc_vectors[j]) for j in selected), default=0.0)
+            score = mmr_lambda * relevance[i] - (1 - mmr_lambda) * redundancy
+            if score > best_score:
+                best_index, best_score, best_redundancy = i, score, redundancy
+        remaining.remove(best_index)
+        if best_redundancy >= DUPLICATE_SIMILARITY:
+            continue
+        selected.append(best_index)
+        used_tokens += estimate_tokens(docs[best_index].page_content)
+
+    return [docs[i] for i in selected]
+
+
+def _merge_pair(first: Document, second: Document) -> Document or None:
+    """Returns `first` extended by `second` if they overlap or touch, else None."""
+    start_a, start_b = first.metadata.get("start_index"), second.metadata.get("start_index")
+    if start_a is not None and start_b is not None:
+        end_a = start_a + len(first.page_content)
+        if not start_a <= start_b <= end_a:
+            return None
+        text = first.page_content + second.page_content[end_a - start_b:]
+    else:
+        a, b = first.page_content, second.page_content
+        overlap = next(
+            (k for k in range(min(len(a), len(b), MAX_TEXT_OVERLAP), 19, -1) if a.endswith(b[:k])),
+            0,
+        )
+        if not overlap:
+            return None
+        text = a + b[overlap:]
+    return Document(page_content=text, metadata=dict(first.metadata))
+
+
+def merge_overlapping(docs: list[Document]) -> list[Document]:
+    """
+    Merges chunks from the same source that overlap or are adjacent, so the
+    splitter's shared overlap is only sent to the LLM once.
+    """
+    merged = list(docs)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(len(merged)):
+                if i == j or merged[i].metadata.get("source") != merged[j].metadata.get("source"):
+                    continue
+                combined = _merge_pair(merged[i], merged[j])
+                if combined is not None:
+                    merged[i] = combined
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+def _compact_table(match: re.Match, query_terms: set, max_rows: int) -> str:
+    start, body, end = match.groups()
+    lines = body.split("\n")
+    if len(lines) <= max_rows + 1:
+        return match.group(0)
+    header, rows = lines[0], lines[1:]
+    # The rows sharing the most words with the question, kept in table order.
+    ranked = sorted(range(len(rows)), key=lambda i: -len(query_terms & set(_WORD_RE.findall(rows[i].lower()))))
+    kept = sorted(ranked[:max_rows])
+    omitted = len(rows) - len(kept)
+    return start + "\n".join([header] + [rows[i] for i in kept] + [f"(... {omitted} more rows)"]) + end
+
+
+def compact_tables(docs: list[Document], question: str, max_rows: int = 8) -> list[Document]:
+    """
+    Shortens each table in the context to its header row and the `max_rows`
+    rows most related to the question, so a large table does not use up the
+    prompt budget.
+    """
+    query_terms = set(_WORD_RE.findall(question.lower()))
+    compacted = []
+    for doc in docs:
+        text = _TABLE_RE.sub(lambda m: _compact_table(m, query_terms, max_rows), doc.page_content)
+        compacted.append(doc if text == doc.page_content else Document(page_content=text, metadata=doc.metadata))
+    return compacted
+
+
+def trim_to_budget(docs: list[Document], token_budget: int) -> list[Document]:
+    """Keeps whole chunks while they fit and cuts the last one at a line boundary."""
+    trimmed, remaining = [], token_budget * CHARS_PER_TOKEN
+    for doc in docs:
+        if remaining <= 0:
+            break
+        text = doc.page_content
+        if len(text) > remaining:
+            cut = text.rfind("\n", 0, remaining)
+            text = text[:cut if cut > remaining // 2 else remaining]
+        trimmed.append(Document(page_content=text, metadata=doc.metadata))
+        remaining -= len(text)
+    return trimmed
+
+
+def assemble_context(docs: list[Document], question: str, token_budget: int = 2500,
+                     mmr_lambda: float = 0.7, table_rows: int = 8) -> list[Document]:
+    """
+    Packs retrieved chunks into the prompt budget: MMR selection, merging of
+    overlapping chunks from the same source, compaction of large tables, then
+    trimming to the budget.
+    """
+    selected = select_mmr(docs, question, token_budget, mmr_lambda)
+    packed = trim_to_budget(compact_tables(merge_overlapping(selected), question, table_rows), token_budget)
+    log.info(
+        "Context packed: %d retrieved -> %d selected -> %d blocks, ~%d of %d tokens.",
+        len(docs), len(selected), len(packed),
+        sum(estimate_tokens(d.page_content) for d in packed), token_budget,
+    )
+    return packed
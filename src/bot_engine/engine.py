@@ -0,0 +1,257 @@
+# src/bot_engine/engine.py
+
+import os
+import json
+import time
+import asyncio
+import logging
+from src.ingestion.excel_parser import parse_excel_qa
+from src.bot_engine.gemini_responder import get_rag_chain
+from src.bot_engine.orchestrator import prepare_question
+from src.bot_engine.streaming import astream_clean_line_breaks
+from src.bot_engine.singleflight import SingleFlight
+from src.bot_engine.faq_matcher import get_faq_answer
+from src.bot_engine.section_matcher import get_section_answer
+from src.bot_engine.table_matcher import get_table_answer
+from src.bot_engine.memory import ConversationMemory, build_conversation_memory
+from src.core.admission import AdmissionRejected, admission_stats, configure_admission
+from src.bot_engine.response_cache import get_index_version
+from src.core.registry import load_config, get_vector_store
+from src.vector_store.retriever import build_retriever
+from src.vector_store.embedding_cache import normalize_query
+from src.vector_store.heading_index import HeadingIndex
+from src.vector_store.table_store import TableStore
+from src.vector_store.figure_index import FigureIndex, load_figure_index
+
+log = logging.getLogger(__name__)
+
+# --- DEFINE PROJECT ROOT for reliable file paths ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# When Gemini is saturated, accept a looser FAQ match than the normal 90.
+FALLBACK_FAQ_CUTOFF = 70
+OVERLOAD_MESSAGE = (
+    "We are receiving a very large number of questions right now and could not search the manuals in time. "
+    "Please try again in a minute."
+)
+
+
+class QAEngine:
+    """
+    The question-answering pipeline (FAQ match -> section title match ->
+    table cell lookup -> retrieval -> Gemini) behind
+    an asyncio API. Blocking work runs in threads or async LangChain calls, so
+    one process can serve many questions concurrently; the Streamlit UI and
+    the HTTP server are both just clients.
+
+    Concurrent requests for the same normalized question and index version
+    share one computation (single-flight), including its stream.
+    """
+
+    def __init__(self, faq_data: list[dict], rag_chain, index_version: str = "", memory_factory=ConversationMemory,
+                 heading_index: HeadingIndex = None, section_config: dict = None,
+                 table_store: TableStore = None, table_config: dict = None,
+                 figure_index: FigureIndex = None, figure_config: dict = None):
+        self.faq_data = faq_data
+        self.rag_chain = rag_chain
+        self.heading_index = heading_index
+        self.section_config = section_config or {}
+        self.table_store = table_store
+        self.table_config = table_config or {}
+        self.figure_index = figure_index
+        self.figure_config = figure_config or {}
+        self.index_version = index_version
+        self.memory_factory = memory_factory
+        self.flights = SingleFlight()
+
+    def new_memory(self) -> ConversationMemory:
+        """A fresh, bounded conversation memory for one chat session."""
+        return self.memory_factory()
+
+    def _section_answer(self, question: str, filters: dict = None) -> str or None:
+        return get_section_answer(question, self.heading_index, self.section_config, filters)
+
+    def _table_answer(self, question: str, filters: dict = None) -> tuple:
+        return get_table_answer(question, self.table_store, self.table_config, filters)
+
+    async def prepare(self, question: str, filters: dict = None, standalone: str = None):
+        """
+        Runs the FAQ, section and table stages (with speculative retrieval) for a
+        question; `standalone`, a condensed follow-up, is what retrieval searches for.
+        """
+        section_lookup = self._section_answer if self.heading_index is not None else None
+        table_lookup = self._table_answer if self.table_store is not None else None
+        return await prepare_question(question, self.faq_data, self.rag_chain, filters=filters,
+                                      section_lookup=section_lookup, table_lookup=table_lookup,
+                                      retrieval_question=standalone)
+
+    def _overload_answer(self, question: str) -> str:
+        """FAQ-only answer used when the Gemini APIs are saturated."""
+        loose_match = get_faq_answer(question, self.faq_data, score_cutoff=FALLBACK_FAQ_CUTOFF)
+        if loose_match:
+            return loose_match
+        return OVERLOAD_MESSAGE
+
+    def _figures(self, docs: list) -> list[dict]:
+        """Figures on the pages of the retrieved chunks: names and sizes only, the UI fetches the images."""
+        if self.figure_index is None or not docs:
+            return []
+        return self.figure_index.for_documents(
+            docs,
+            limit=self.figure_config.get('max_per_answer', 6),
+            sources=self.figure_config.get('sources') or None,
+            min_side_px=self.figure_config.get('min_side_px', 100),
+        )
+
+    async def _compute_events(self, question: str, standalone: str, history: str, filters: dict = None):
+        try:
+            prepared = await self.prepare(question, filters, standalone)
+        except AdmissionRejected as e:
+            log.warning("Retrieval not admitted (%s); answering from FAQ only.", e)
+            yield ("source", "fallback")
+            yield ("chunk", await asyncio.to_thread(self._overload_answer, question))
+            yield ("done", {})
+            return
+
+        if prepared.faq_answer:
+            yield ("source", "faq")
+            yield ("chunk", prepared.faq_answer)
+            yield ("done", prepared.timings)
+            return
+
+        if prepared.section_answer:
+            yield ("source", "section")
+            yield ("chunk", prepared.section_answer)
+            yield ("done", prepared.timings)
+            return
+
+        if prepared.table_answer:
+            yield ("source", "table")
+            yield ("chunk", prepared.table_answer)
+            yield ("done", prepared.timings)
+            return
+
+        yield ("source", "rag")
+        start = time.perf_counter()
+        try:
+            async for chunk in astream_clean_line_breaks(self.rag_chain.astream(standalone, prepared.docs, history,
+                                                                                 filters)):
+                yield ("chunk", chunk)
+        except AdmissionRejected as e:
+            # Raised before the first token, so nothing has been streamed yet.
+            log.warning("Generation not admitted (%s); answering from FAQ only.", e)
+            yield ("source", "fallback")
+            yield ("chunk", await asyncio.to_thread(self._overload_answer, question))
+        prepared.timings["generation"] = round(time.perf_counter() - start, 3)
+        log.info("Per-stage timings for '%s': %s", question, prepared.timings)
+        figures = self._figures(prepared.docs)
+        if figures:
+            yield ("figures", figures)
+        yield ("done", prepared.timings)
+
+    async def stream_events(self, question: str, memory: ConversationMemory = None, filters: dict = None):
+        """
+        Yields ("source", "faq" | "section" | "table" | "rag" | "fallback")
+        once the FAQ, section and table stages are decided, then
+        ("chunk", text) as the answer is produced, then, for a RAG answer
+        whose chunks' pages have figures, ("figures", [{"name", "page",
+        "width", "height"}]), then ("done", timings). With a `memory`, follow-ups are condensed into a
+        standalone question for retrieval and generation (the FAQ, section and
+        table stages match the question as asked) and get the memory text in
+        their prompt; every finished turn is added to the memory.
+        `filters` (source, pages, section, element_type) scope retrieval.
+        """
+        standalone, history, fingerprint = question, "", ""
+        # Only a follow-up depends on the conversation; a self-contained question keeps
+        # sharing cached answers and in-flight computations with other sessions.
+        if memory is not None and memory.is_follow_up(question):
+            standalone, history, fingerprint = memory.condense_question(question), memory.history_text(), \
+                memory.fingerprint()
+            log.info("Condensed follow-up '%s' -> '%s'", question, standalone)
+
+        key = (normalize_query(standalone), self.index_version, fingerprint,
+               json.dumps(filters, sort_keys=True) if filters else "")
+        parts = []
+        async for event in self.flights.stream(
+                key, lambda: self._compute_events(question, standalone, history, filters)):
+            if event[0] == "chunk":
+                parts.append(event[1])
+            yield event
+        if memory is not None:
+            memory.add_turn(question, "".join(parts))
+
+    async def answer(self, question: str, memory: ConversationMemory = None, filters: dict = None) -> dict:
+        """Returns the full answer together with where it came from, related figures and stage timings."""
+        result = {"answer": "", "source": None, "figures": [], "timings": {}}
+        async for kind, value in self.stream_events(question, memory, filters):
+            if kind == "chunk":
+                result["answer"] += value
+            elif kind == "source":
+                result["source"] = value
+            elif kind == "figures":
+                result["figures"] = value
+            else:
+                result["timings"] = value
+        return result
+
+    async def stream_answer(self, question: str, memory: ConversationMemory = None, filters: dict = None):
+        """Yields the answer text as it is generated."""
+        async for kind, value in self.stream_events(question, memory, filters):
+            if kind == "chunk":
+                yield value
+
+    def metrics(self) -> dict:
+        metrics = {"single_flight": self.flights.stats()}
+        if self.rag_chain.response_cache is not None:
+            metrics["response_cache"] = self.rag_chain.response_cache.stats()
+        if hasattr(self.rag_chain.embeddings, "stats"):
+            metrics["embedding_cache"] = self.rag_chain.embeddings.stats()
+        metrics["admission"] = admission_stats()
+        metrics["llm"] = self.rag_chain.resilient_llm.stats()
+        metrics["intent_routes"] = self.rag_chain.router.stats()
+        if hasattr(self.rag_chain.retriever.vectorstore, "stats"):
+            metrics["collections"] = self.rag_chain.retriever.vectorstore.stats()
+        return metrics
+
+
+def build_engine() -> QAEngine:
+    """
+    Loads the vector store, retriever, FAQ sheet and RAG chain described by
+    the shared config and returns a ready QAEngine. Raises ConfigError for an
+    invalid config and RuntimeError if any of the resources fails to load.
+    """
+    config = load_config()
+    configure_admission(config)
+    vector_store = get_vector_store()
+    if vector_store is None:
+        raise RuntimeError("Failed to load or build the vector store.")
+    retriever = build_retriever(vector_store, config)
+    print("Retriever created successfully.")
+
+    faq_data = None
+    try:
+        excel_path = os.path.join(PROJECT_ROOT, config['data']['excel_path'])
+        faq_data = parse_excel_qa(excel_path)
+        print(f"FAQ Data Loaded: {'SUCCESS' if faq_data is not None else 'FAILED'}")
+    except Exception as e:
+        print(f"FAQ Data Loaded: FAILED with an exception: {e}")
+
+    rag_chain = None
+    try:
+        rag_chain = get_rag_chain(retriever)
+        print(f"RAG Chain Loaded: {'SUCCESS' if rag_chain is not None else 'FAILED'}")
+    except Exception as e:
+        print(f"RAG Chain Loaded: FAILED with an exception: {e}")
+
+    if faq_data is None or rag_chain is None:
+        raise RuntimeError("Failed to load one or more resources. Please check terminal logs for details.")
+    vector_store_path = os.path.join(PROJECT_ROOT, config['data']['vector_store_path'])
+    section_config = config.get('section_answers', {})
+    heading_index = HeadingIndex.open(vector_store_path) if section_config.get('enabled', True) else None
+    table_config = config.get('tables', {})
+    table_store = TableStore.open(vector_store_path) if table_config.get('enabled', True) else None
+    return QAEngine(faq_data, rag_chain, index_version=get_index_version(vector_store_path),
+                    memory_factory=lambda: build_conversation_memory(config),
+                    heading_index=heading_index, section_config=section_config,
+                    table_store=table_store, table_config=table_config,
+                    figure_index=load_figure_index(config), figure_config=config.get('figures', {}))
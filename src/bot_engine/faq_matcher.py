@@ -0,0 +1,17 @@
+# src/bot_engine/faq_matcher.py
+
+from thefuzz import process
+
+
+def get_faq_answer(query: str, faqs: list[dict], score_cutoff: int = 90) -> str or None:
+    if not faqs: return None
+    faq_questions = [item['user_desc'] for item in faqs]
+    best_match = process.extractOne(query, faq_questions, score_cutoff=score_cutoff)
+    
+    if best_match:
+        best_matching_question_text = best_match[0]
+        for item in faqs:
+            if item['user_desc'] == best_matching_question_text:
+                print(f"FAQ Match Found: '{query}' -> '{best_matching_question_text}' (Score: {best_match[1]})")
+                return item['user_reply_desc']
+    return None
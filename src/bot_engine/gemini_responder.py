@@ -1,16 +1,153 @@
 
 
-import yaml
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+import time
+import asyncio
+import logging
+from operator import itemgetter
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
-import streamlit as st
+from src.bot_engine.response_cache import build_response_cache
+from src.bot_engine.context_builder import assemble_context
+from src.bot_engine.intent_router import IntentRouter, build_intent_router
+from src.bot_engine.resilience import LLMUnavailable, ResilientLLM, build_resilient_llm
+from src.bot_engine.orchestrator import iter_sync, run_sync
+from src.core.admission import AdmissionRejected, get_admission_controller
+from src.core.registry import load_config, get_llm
+
+log = logging.getLogger(__name__)
 
 # --- DEFINE PROJECT ROOT for reliable file paths ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+
+def format_excerpts(docs: list, max_docs: int = 3, max_chars: int = 600) -> str:
+    """
+    Fallback answer used when the LLM stage is unavailable: the top retrieved
+    passages, shown verbatim with their sources.
+    """
+    if not docs:
+        return "The assistant is temporarily unavailable and no matching passages were found. Please try again shortly."
+    parts = ["The assistant is temporarily unavailable, so here are the most relevant passages from the manuals:"]
+    for doc in docs[:max_docs]:
+        source = doc.metadata.get("source", "Unknown").replace('\\', '/').split('/')[-1]
+        page = doc.metadata.get("page", "N/A")
+        text = doc.page_content.strip()
+        if len(text) > max_chars:
+            text = text[:max_chars].rsplit(" ", 1)[0] + " ..."
+        parts.append(f"**{source} (Page: {page})**\n\n> " + text.replace("\n", "\n> "))
+    return "\n\n".join(parts)
+
+
+class RAGChain:
+    """
+    Runs retrieval and generation as separate steps so callers can supply
+    documents they already retrieved (e.g. speculatively), and puts the
+    semantic response cache in front of generation.
+    The question is embedded with the retriever's (cached) embeddings, so a
+    cache miss costs no extra embedding round trip when retrieval runs.
+
+    Generation goes through the shared LLM admission controller and the
+    ResilientLLM guard; if Gemini cannot answer in time the retrieved excerpts
+    are returned instead. The sync methods run the async ones on the engine's
+    background loop.
+    """
+
+    def __init__(self, retriever, answer_chains: dict, router: IntentRouter, embeddings, response_cache=None,
+                 resilient_llm: ResilientLLM = None):
+        self.retriever = retriever
+        # One answer chain per route plan (prompt variant + output cap).
+        self.answer_chains = answer_chains
+        self.router = router
+        self.embeddings = embeddings
+        self.response_cache = response_cache
+        # Every generation is admitted by the shared LLM controller and charged
+        # the plan's call_tokens against the TPM budget.
+        self.llm_admission = get_admission_controller("llm")
+        self.resilient_llm = resilient_llm or ResilientLLM()
+
+    def _retrieval_kwargs(self, question: str, filters: dict = None) -> dict:
+        kwargs = {"k": self.router.plan_for(question).k}
+        if filters:
+            # Metadata selectors (source, pages, section, element_type) for a scoped search.
+            kwargs["filters"] = filters
+        return kwargs
+
+    def retrieve(self, question: str, filters: dict = None) -> list:
+        return self.retriever.invoke(question, **self._retrieval_kwargs(question, filters))
+
+    async def aretrieve(self, question: str, filters: dict = None) -> list:
+        return await self.retriever.ainvoke(question, **self._retrieval_kwargs(question, filters))
+
+    def invoke(self, question: str, docs: list = None, history: str = "", filters: dict = None) -> str:
+        return run_sync(self.ainvoke(question, docs, history, filters))
+
+    def stream(self, question: str, docs: list = None, history: str = "", filters: dict = None):
+        """Yields the answer as it is generated; a cached answer is yielded in one piece."""
+        return iter_sync(self.astream(question, docs, history, filters))
+
+    async def _acache_lookup(self, question: str, filters: dict = None, history: str = ""):
+        # Scoped answers depend on the filter and follow-up answers on the conversation, so both bypass the cache.
+        if self.response_cache is None or filters or history:
+            return None, None
+        query_vector = await self.embeddings.aembed_query(question)
+        # SQLite reads and writes stay off the event loop, like the FAQ lookup.
+        return query_vector, await asyncio.to_thread(self.response_cache.lookup, query_vector)
+
+    def _hedge_admitter(self, call_tokens: int):
+        async def admit_hedge() -> bool:
+            # A hedge is only sent if there is spare LLM capacity right now.
+            try:
+                await self.llm_admission.acquire_async(call_tokens, timeout=0)
+                return True
+            except AdmissionRejected:
+                return False
+        return admit_hedge
+
+    async def ainvoke(self, question: str, docs: list = None, history: str = "", filters: dict = None) -> str:
+        return "".join([chunk async for chunk in self.astream(question, docs, history, filters)])
+
+    async def astream(self, question: str, docs: list = None, history: str = "", filters: dict = None):
+        """
+        Streams the answer to a standalone `question`. `history` is the bounded
+        conversation memory text; it only reaches the prompt, never retrieval.
+        `filters` scope retrieval to matching chunks (see metadata_index).
+        """
+        query_vector, cached = await self._acache_lookup(question, filters, history)
+        if cached is not None:
+            yield cached["answer"]
+            return
+
+        start = time.perf_counter()
+        plan = self.router.route(question)
+        if docs is None:
+            docs = await self.aretrieve(question, filters)
+        if self.resilient_llm.breaker.rejects():
+            # No point queueing for admission while Gemini is known to be down.
+            yield format_excerpts(docs)
+            return
+        await self.llm_admission.acquire_async(plan.call_tokens)
+        answer_chain = self.answer_chains[plan.name]
+        inputs = {"docs": docs, "question": question, "plan": plan, "history": history or "(none)"}
+        parts = []
+        try:
+            async for chunk in self.resilient_llm.astream(lambda: answer_chain.astream(inputs),
+                                                          self._hedge_admitter(plan.call_tokens)):
+                parts.append(chunk)
+                yield chunk
+        except LLMUnavailable as e:
+            log.warning("LLM stage unavailable for '%s': %s", question, e)
+            if parts:
+                yield f"\n\n_(The answer was interrupted: {e})_"
+            else:
+                yield format_excerpts(docs)
+            return
+        if self.response_cache is not None and query_vector is not None:
+            await asyncio.to_thread(self.response_cache.store, question, query_vector, "".join(parts),
+                                    time.perf_counter() - start)
+
+
 def get_rag_chain(retriever):
     """
     Creates and returns a robust RAG chain using the "Stuff" method,
@@ -18,41 +155,33 @@ def get_rag_chain(retriever):
     """
     print("RAG Chain: Initializing...")
     
-    # --- 1. Load Config (Hybrid Approach) ---
-    config = {}
-    settings_path = os.path.join(PROJECT_ROOT, "config", "settings.yaml")
-    try:
-        with open(settings_path, 'r') as f:
-            config = yaml.safe_load(f)
-        if "API_KEY" in st.secrets:
-            config['gemini']['api_key'] = st.secrets["API_KEY"]
-    except FileNotFoundError:
-        if "API_KEY" in st.secrets:
-            config = {
-                "gemini": {
-                    "api_key": st.secrets["API_KEY"],
-                    "llm_model": "models/gemini-1.5-flash-latest"
-                }
-            }
-        else:
-            raise ValueError("API Key not found in Streamlit secrets.")
-            
-    api_key = config['gemini']['api_key']
-    llm_model_name = config['gemini']['llm_model']
+    # --- 1. Load Config ---
+    config = load_config()
     
+    # --- 2. Route questions to a plan (k, context budget, output length, prompt) ---
+    router = build_intent_router(config)
+
     print("RAG Chain: Initializing Gemini LLM...")
-    llm = ChatGoogleGenerativeAI(
-        model=llm_model_name,
-        google_api_key=api_key,
-        temperature=0.1, # Lowered for more factual responses
-        max_output_tokens=2048
-    )
+    # One client per distinct output cap, so short answers are cut off at the API.
+    llms = {}
+    for max_output_tokens in sorted({plan.max_output_tokens for plan in router.plans.values()}):
+        llms[max_output_tokens] = get_llm(max_output_tokens)
     print("RAG Chain: Gemini LLM initialized.")
 
-    # --- 2. Define the Advanced Conditional Prompt ---
-    # This is your powerful prompt that handles both summaries and detailed steps.
-    conditional_prompt = PromptTemplate.from_template(
+    # --- 3. Define the Prompts ---
+    # The conditional prompt lets the LLM pick the format; the routed variants
+    # fix it up front so the output cap can match.
+    final_instructions = """
+        **Final Instruction for ALL answers:**
+        - Do not say "the provided text excerpts do not offer further details" or similar phrases.
+        - Write the answer as if you are the definitive expert using only the provided context.
+        - After the main answer, skip two lines and add a "Sources:" section, citing the source and page number for the information used.
+
+        Begin:
         """
+    prompts = {
+        "default": PromptTemplate.from_template(
+            """
         You are an expert technical assistant. You have been given the following context from a user manual.
         Your task is to synthesize this information into a single, high-quality answer to the user's original question.
 
@@ -60,23 +189,53 @@ def get_rag_chain(retriever):
         - If the question contains words like "detail", "explain", "how to", "steps", "process", or is a "what are the steps" type of question, you MUST provide a detailed, step-by-step answer using a NUMBERED LIST.
         - For all other questions (e.g., "what is", "describe"), you MUST provide a concise, high-level summary using BULLET POINTS.
 
+        Conversation so far (use it only to understand follow-up questions):
+        {history}
+
         User's Original Question: {question}
 
         Context to use:
         {context}
+        """ + final_instructions
+        ),
+        "detailed": PromptTemplate.from_template(
+            """
+        You are an expert technical assistant. You have been given the following context from a user manual.
+        Answer the user's question with a detailed, step-by-step answer using a NUMBERED LIST.
 
-        **Final Instruction for ALL answers:**
-        - Do not say "the provided text excerpts do not offer further details" or similar phrases.
-        - Write the answer as if you are the definitive expert using only the provided context.
-        - After the main answer, skip two lines and add a "Sources:" section, citing the source and page number for the information used.
+        Conversation so far (use it only to understand follow-up questions):
+        {history}
 
-        Begin:
-        """
-    )
+        User's Original Question: {question}
+
+        Context to use:
+        {context}
+        """ + final_instructions
+        ),
+        "brief": PromptTemplate.from_template(
+            """
+        You are an expert technical assistant. You have been given the following context from a user manual.
+        Answer the user's question with a concise, high-level summary of at most five BULLET POINTS.
+
+        Conversation so far (use it only to understand follow-up questions):
+        {history}
+
+        User's Original Question: {question}
+
+        Context to use:
+        {context}
+        """ + final_instructions
+        ),
+    }
 
-    # --- 3. Format Documents and Build the Chain ---
-    def format_docs_with_sources(docs):
-        # Joins the content of all retrieved documents and formats the sources
+    # --- 4. Format Documents and Build the Chains ---
+    mmr_lambda = config.get('context', {}).get('mmr_lambda', 0.7)
+    table_rows = config.get('context', {}).get('table_rows', 8)
+
+    def format_docs_with_sources(inputs):
+        # Packs the retrieved documents into the plan's token budget and formats the sources
+        docs = assemble_context(inputs["docs"], inputs["question"], inputs["plan"].context_token_budget, mmr_lambda,
+                                table_rows)
         context = "\n\n---\n\n".join([d.page_content for d in docs])
         
         sources = set()
@@ -89,17 +248,28 @@ def get_rag_chain(retriever):
         # We will append the sources to the context itself, so the LLM can see them.
         return f"{context}\n\n---SOURCES---\n{sources_str}"
 
-    print("RAG Chain: Building the final LCEL chain...")
-    rag_chain = (
-        {"context": retriever | format_docs_with_sources, "question": RunnablePassthrough()}
-        | conditional_prompt
-        | llm
-        | StrOutputParser()
-    )
-    print("RAG Chain: Chain built successfully.")
-    
-    return rag_chain
-
-
+    print("RAG Chain: Building the final LCEL chains...")
+    # Each answer chain takes {"docs", "question", "plan", "history"}; retrieval runs in
+    # RAGChain so that already-retrieved documents can be passed straight in.
+    answer_chains = {
+        name: (
+            {
+                "context": RunnableLambda(format_docs_with_sources),
+                "question": itemgetter("question"),
+                "history": itemgetter("history"),
+            }
+            | prompts[name]
+            | llms[plan.max_output_tokens]
+            | StrOutputParser()
+        )
+        for name, plan in router.plans.items()
+    }
+    print("RAG Chain: Chains built successfully.")
 
+    # --- 5. Put the semantic response cache in front of generation ---
+    response_cache = build_response_cache(config)
+    if response_cache is not None:
+        print(f"RAG Chain: Response cache enabled for index version {response_cache.index_version}.")
 
+    return RAGChain(retriever, answer_chains, router, retriever.vectorstore.embeddings, response_cache,
+                    resilient_llm=build_resilient_llm(config))
@@ -0,0 +1,94 @@
+# src/bot_engine/intent_router.py
+
+import re
+import logging
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+# The same cues the conditional prompt used to ask Gemini to look for.
+DETAILED_PATTERNS = [
+    r"\bdetail", r"\bexplain", r"\bhow (to|do|can|should)\b", r"\bsteps?\b", r"\bprocess\b",
+    r"\bprocedure\b", r"\bwalk me through\b", r"\bguide\b", r"\bwhat are the steps\b",
+]
+BRIEF_PATTERNS = [
+    r"^(what|who|when|where|which) (is|are|was|does)\b", r"^define\b", r"^describe\b", r"\bmeaning of\b",
+    r"^is there\b", r"^can i\b", r"^does\b",
+]
+_DETAILED_RE = re.compile("|".join(DETAILED_PATTERNS), re.IGNORECASE)
+_BRIEF_RE = re.compile("|".join(BRIEF_PATTERNS), re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class RoutePlan:
+    """How much retrieval and generation a question gets."""
+    name: str
+    k: int
+    context_token_budget: int
+    max_output_tokens: int
+
+    @property
+    def call_tokens(self) -> int:
+        # TPM charge for admission: context + prompt/question (~500) + output.
+        return self.context_token_budget + 500 + self.max_output_tokens
+
+
+DEFAULT_PLANS = {
+    "brief": {"k": 3, "context_token_budget": 1200, "max_output_tokens": 512},
+    "detailed": {"k": 7, "context_token_budget": 2500, "max_output_tokens": 2048},
+}
+
+
+def classify_intent(question: str) -> str:
+    """
+    Cheap local classification into "detailed" (procedures, step-by-step) or
+    "brief" (definitions, short lookups). Ambiguous questions default to
+    "detailed" so nothing gets under-answered.
+    """
+    text = question.strip()
+    if _DETAILED_RE.search(text):
+        return "detailed"
+    if _BRIEF_RE.search(text) or len(text.split()) <= 4:
+        return "brief"
+    return "detailed"
+
+
+class IntentRouter:
+    """
+    Maps a question to the RoutePlan for its intent, from the `routing` config
+    section. When routing is disabled every question gets the "default" plan,
+    which keeps the single conditional prompt.
+    """
+
+    def __init__(self, plans: dict[str, RoutePlan], enabled: bool = True):
+        self.plans = plans
+        self.enabled = enabled
+        self.counts = {name: 0 for name in plans}
+
+    def plan_for(self, question: str) -> RoutePlan:
+        return self.plans[classify_intent(question) if self.enabled else "default"]
+
+    def route(self, question: str) -> RoutePlan:
+        """Like `plan_for`, but counts and logs the decision; call once per answered question."""
+        plan = self.plan_for(question)
+        self.counts[plan.name] += 1
+        log.info("Intent router: '%s' -> %s", question, plan)
+        return plan
+
+    def stats(self) -> dict:
+        return dict(self.counts)
+
+
+def build_intent_router(config: dict) -> IntentRouter:
+    routing_config = config.get('routing', {})
+    plans = {
+        name: RoutePlan(name=name, **{**defaults, **routing_config.get(name, {})})
+        for name, defaults in DEFAULT_PLANS.items()
+    }
+    plans["default"] = RoutePlan(
+        name="default",
+        k=config.get('retrieval', {}).get('k', 7),
+        context_token_budget=config.get('context', {}).get('token_budget', 2500),
+        max_output_tokens=2048,
+    )
+    return IntentRouter(plans, enabled=routing_config.get('enabled', True))
@@ -0,0 +1,83 @@
+# src/bot_engine/memory.py
+
+import re
+import hashlib
+from collections import deque
+from src.bot_engine.context_builder import estimate_tokens, CHARS_PER_TOKEN
+
+# Words that point back at an earlier turn. Short questions without them (e.g. "refund rules") stand alone.
+_FOLLOW_UP_RE = re.compile(
+    r"\b(it|its|this|that|these|those|they|them|same|above|previous|earlier)\b|^(and|also|what about|how about)\b",
+    re.IGNORECASE,
+)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def _first_sentence(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    sentence = _SENTENCE_END_RE.split(text, 1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars].rsplit(" ", 1)[0] + " ..."
+
+
+class ConversationMemory:
+    """
+    Bounded per-session conversation memory.
+
+    The last `max_turns` turns are kept verbatim (answers clipped to
+    `turn_token_cap`); older turns are folded into a rolling extractive summary
+    of one line per turn, and the oldest lines are dropped once the summary
+    exceeds `summary_token_cap`. Memory and prompt size therefore stay bounded
+    however long a chat runs. Summarization is local, so it costs no LLM call.
+    """
+
+    def __init__(self, max_turns: int = 3, summary_token_cap: int = 300, turn_token_cap: int = 200):
+        self.max_turns = max_turns
+        self.summary_token_cap = summary_token_cap
+        self.turn_token_cap = turn_token_cap
+        self.turns = deque()
+        self.summary_lines = deque()
+
+    def add_turn(self, question: str, answer: str):
+        clipped = answer if estimate_tokens(answer) <= self.turn_token_cap else \
+            answer[:self.turn_token_cap * CHARS_PER_TOKEN].rsplit(" ", 1)[0] + " ..."
+        self.turns.append((question, clipped))
+        while len(self.turns) > self.max_turns:
+            old_question, old_answer = self.turns.popleft()
+            self.summary_lines.append(f"- User asked: {old_question} -> {_first_sentence(old_answer, 160)}")
+        while self.summary_lines and estimate_tokens("\n".join(self.summary_lines)) > self.summary_token_cap:
+            self.summary_lines.popleft()
+
+    def is_follow_up(self, question: str) -> bool:
+        return bool(self.turns) and bool(_FOLLOW_UP_RE.search(question))
+
+    def condense_question(self, question: str) -> str:
+        """
+        Returns a standalone version of `question` for retrieval: follow-ups
+        are anchored to the previous user question.
+        """
+        if not self.is_follow_up(question):
+            return question
+        previous_question = self.turns[-1][0]
+        return f"{question} (regarding: {previous_question})"
+
+    def history_text(self) -> str:
+        """The conversation so far, for the prompt: summary lines, then recent turns."""
+        parts = []
+        if self.summary_lines:
+            parts.append("Earlier in the conversation:\n" + "\n".join(self.summary_lines))
+        for question, answer in self.turns:
+            parts.append(f"User: {question}\nAssistant: {answer}")
+        return "\n\n".join(parts)
+
+    def fingerprint(self) -> str:
+        """Short hash of the history, so answers that depend on it are not shared across sessions."""
+        return hashlib.sha1(self.history_text().encode()).hexdigest()[:12] if self.turns else ""
+
+
+def build_conversation_memory(config: dict) -> ConversationMemory:
+    memory_config = config.get('memory', {})
+    return ConversationMemory(
+        max_turns=memory_config.get('max_turns', 3),
+        summary_token_cap=memory_config.get('summary_token_cap', 300),
+        turn_token_cap=memory_config.get('turn_token_cap', 200),
+    )
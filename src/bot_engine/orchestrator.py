@@ -0,0 +1,114 @@
+# src/bot_engine/orchestrator.py
+
+import asyncio
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from src.bot_engine.faq_matcher import get_faq_answer
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PreparedQuestion:
+    """The outcome of the FAQ, section and table stages, plus retrieved documents when all miss."""
+    question: str
+    faq_answer: str = None
+    section_answer: str = None
+    table_answer: str = None
+    docs: list = None
+    timings: dict = field(default_factory=dict)
+
+
+async def _timed(coro, timings: dict, stage: str):
+    start = time.perf_counter()
+    result = await coro
+    timings[stage] = round(time.perf_counter() - start, 3)
+    return result
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns a process-wide event loop running in a daemon thread. Unlike
+    asyncio.run, it does not wait for discarded speculative work to finish
+    before returning to the caller.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="bot-engine-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro):
+    """Runs a coroutine on the background loop and blocks until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+
+def iter_sync(agen):
+    """Iterates an async generator on the background loop from synchronous code."""
+    loop = get_event_loop()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+        except StopAsyncIteration:
+            break
+
+
+async def prepare_question(question: str, faq_data: list[dict], rag_chain, speculative: bool = True,
+                           filters: dict = None, section_lookup=None, table_lookup=None,
+                           retrieval_question: str = None) -> PreparedQuestion:
+    """
+    Runs the FAQ lookup and, speculatively, the query embedding + FAISS search
+    at the same time. On an FAQ miss, `section_lookup(question, filters)` may
+    answer with a manual section whose title the question names, and then
+    `table_lookup(question, filters)` with a table cell; the table rows it
+    finds go in front of the retrieved documents otherwise. On any hit the
+    retrieval task is cancelled (its thread finishes in the background and
+    the result is discarded); on a miss the documents are usually already
+    waiting. `filters` scope the retrieval. `retrieval_question` (e.g. a
+    condensed follow-up) is searched for instead of `question`; the FAQ,
+    section and table stages always match the question as asked.
+    """
+    prepared = PreparedQuestion(question=question)
+    timings = prepared.timings
+    retrieval_question = retrieval_question or question
+    start = time.perf_counter()
+
+    retrieval_task = None
+    if speculative:
+        retrieval_task = asyncio.create_task(_timed(rag_chain.aretrieve(retrieval_question, filters), timings,
+                                                    "retrieval"))
+
+    prepared.faq_answer = await _timed(asyncio.to_thread(get_faq_answer, question, faq_data), timings, "faq")
+    if not prepared.faq_answer and section_lookup is not None:
+        prepared.section_answer = await _timed(asyncio.to_thread(section_lookup, question, filters),
+                                               timings, "section")
+    table_excerpts = []
+    if not (prepared.faq_answer or prepared.section_answer) and table_lookup is not None:
+        prepared.table_answer, table_excerpts = await _timed(asyncio.to_thread(table_lookup, question, filters),
+                                                             timings, "table")
+
+    if prepared.faq_answer or prepared.section_answer or prepared.table_answer:
+        if retrieval_task is not None:
+            retrieval_task.cancel()
+            # Swallow any error the discarded retrieval raises (e.g. admission rejection).
+            retrieval_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            timings["retrieval"] = "cancelled"
+    else:
+        if retrieval_task is None:
+            retrieval_task = asyncio.create_task(_timed(rag_chain.aretrieve(retrieval_question, filters), timings,
+                                                    "retrieval"))
+        # Time spent waiting for retrieval after the FAQ miss: zero when speculation fully hid it.
+        prepared.docs = table_excerpts + await _timed(retrieval_task, timings, "retrieval_wait")
+
+    timings["prepare_total"] = round(time.perf_counter() - start, 3)
+    log.info("Per-stage timings for '%s': %s", question, timings)
+    return prepared
+
@@ -0,0 +1,255 @@
+# src/bot_engine/resilience.py
+
+import asyncio
+import time
+import logging
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """Raised when the LLM stage cannot produce an answer in time (or the breaker is open)."""
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies, used to derive the hedging delay."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float or None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_seconds`; then lets a single trial call through (half-open) and
+    closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def rejects(self) -> bool:
+        """True while a call would be turned away; unlike `allow`, never takes the half-open trial."""
+        state = self.state
+        return state == "open" or (state == "half_open" and self.trial_in_progress)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_progress:
+            self.trial_in_progress = True
+            return True
+        return False
+
+    def end_trial(self):
+        """Frees the half-open trial slot of a call that ended without success or failure (e.g. cancelled)."""
+        self.trial_in_progress = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_progress = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                self.times_opened += 1
+                log.warning("LLM circuit breaker opened after %d consecutive failures.", self.failures)
+            self.opened_at = time.monotonic()
+
+
+class _Attempt:
+    """One streaming LLM call, waiting for its next chunk."""
+
+    def __init__(self, agen):
+        self.agen = agen
+        self.next_chunk = asyncio.ensure_future(agen.__anext__())
+
+    async def close(self):
+        self.next_chunk.cancel()
+        try:
+            await self.agen.aclose()
+        except Exception:
+            pass
+
+
+class ResilientLLM:
+    """
+    Protects the LLM stage against tail latency:
+    - a deadline for the first token and for the whole answer,
+    - an optional hedged duplicate request, started when the first token has
+      not arrived after the recent p95 time-to-first-token,
+    - a circuit breaker that fails calls immediately while Gemini is unhealthy.
+    """
+
+    def __init__(self, first_token_seconds: float = 15.0, deadline_seconds: float = 60.0, hedge_enabled: bool = True,
+                 hedge_percentile: float = 0.95, hedge_min_delay: float = 2.0, hedge_min_samples: int = 20,
+                 failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.first_token_seconds = first_token_seconds
+        self.deadline_seconds = deadline_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self.first_token_latency = LatencyTracker()
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._timeouts = 0
+
+    def hedge_delay(self) -> float or None:
+        """Seconds to wait before hedging, or None while there is too little history."""
+        if not self.hedge_enabled or len(self.first_token_latency.samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.first_token_latency.percentile(self.hedge_percentile))
+
+    async def astream(self, agen_factory, admit_hedge=None):
+        """
+        Streams from `agen_factory()` under the deadlines. `admit_hedge` is an
+        optional coroutine function returning False when a hedge may not be sent
+        (e.g. no admission capacity). Raises LLMUnavailable, before the first
+        chunk if no answer can be produced in time, or mid-stream if the call
+        fails or runs past the overall deadline.
+        """
+        trial = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            raise LLMUnavailable("LLM circuit breaker is open.")
+        agen = self._astream(agen_factory, admit_hedge)
+        try:
+            async for chunk in agen:
+                yield chunk
+        finally:
+            await agen.aclose()
+            if trial:
+                # A cancelled trial would otherwise keep the breaker half-open with its slot taken.
+                self.breaker.end_trial()
+
+    async def _astream(self, agen_factory, admit_hedge):
+        start = time.monotonic()
+        first_token_deadline = start + self.first_token_seconds
+        hedge_at = None if self.hedge_delay() is None else start + self.hedge_delay()
+        attempts = [_Attempt(agen_factory())]
+        winner, first_chunk, last_error = None, None, None
+
+        while winner is None:
+            now = time.monotonic()
+            wake_at = first_token_deadline if hedge_at is None else min(hedge_at, first_token_deadline)
+            done, _ = await asyncio.wait(
+                [a.next_chunk for a in attempts], timeout=max(0.0, wake_at - now), return_when=asyncio.FIRST_COMPLETED
+            )
+            for attempt in list(attempts):
+                if attempt.next_chunk not in done:
+                    continue
+                try:
+                    first_chunk = attempt.next_chunk.result()
+                    winner = attempt
+                    break
+                except StopAsyncIteration:
+                    first_chunk, winner = "", attempt
+                    break
+                except Exception as e:
+                    last_error = e
+                    attempts.remove(attempt)
+            if winner is not None:
+                break
+
+            now = time.monotonic()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if admit_hedge is None or await admit_hedge():
+                    self._hedges += 1
+                    log.info("LLM hedge: no first token after %.2fs, sending a duplicate request.", now - start)
+                    attempts.append(_Attempt(agen_factory()))
+            if not attempts or now >= first_token_deadline:
+                for attempt in attempts:
+                    await attempt.close()
+                self.breaker.record_failure()
+                if not attempts:
+                    raise LLMUnavailable(f"LLM call failed: {last_error}")
+                self._timeouts += 1
+                raise LLMUnavailable(f"No first token within {self.first_token_seconds:g}s.")
+
+        if winner is not attempts[0]:
+            self._hedge_wins += 1
+        for attempt in attempts:
+            if attempt is not winner:
+                await attempt.close()
+        self.first_token_latency.record(time.monotonic() - start)
+
+        if first_chunk:
+            yield first_chunk
+        try:
+            while True:
+                remaining = start + self.deadline_seconds - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    chunk = await asyncio.wait_for(winner.agen.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            self.breaker.record_failure()
+            await winner.close()
+            raise LLMUnavailable(f"Answer not completed within {self.deadline_seconds:g}s.")
+        except Exception as e:
+            # A transport error mid-stream: the chunks already yielded stay with the caller,
+            # which can fall back for the rest.
+            self.breaker.record_failure()
+            await winner.close()
+            raise LLMUnavailable(f"LLM stream failed after it started: {e}") from e
+        self.breaker.record_success()
+
+    def stats(self) -> dict:
+        return {
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.times_opened,
+            "hedges_sent": self._hedges,
+            "hedges_won": self._hedge_wins,
+            "timeouts": self._timeouts,
+            "first_token_p95_seconds": self.first_token_latency.percentile(0.95),
+        }
+
+
+def build_resilient_llm(config: dict) -> ResilientLLM:
+    """Creates the LLM-stage guard from the `resilience` section of the config."""
+    resilience_config = config.get('resilience', {})
+    hedge_config = resilience_config.get('hedge', {})
+    breaker_config = resilience_config.get('breaker', {})
+    return ResilientLLM(
+        first_token_seconds=resilience_config.get('first_token_seconds', 15.0),
+        deadline_seconds=resilience_config.get('deadline_seconds', 60.0),
+        hedge_enabled=hedge_config.get('enabled', True),
+        hedge_percentile=hedge_config.get('percentile', 0.95),
+        hedge_min_delay=hedge_config.get('min_delay_seconds', 2.0),
+        hedge_min_samples=hedge_config.get('min_samples', 20),
+        failure_threshold=breaker_config.get('failure_threshold', 5),
+        reset_seconds=breaker_config.get('reset_seconds', 30.0),
+    )
@@ -0,0 +1,177 @@
+# src/bot_engine/response_cache.py
+
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# --- DEFINE PROJECT ROOT for reliable file paths ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def get_index_version(vector_store_path: str) -> str:
+    """
+    Returns a short fingerprint of the files in the vector store directory.
+    Any rebuild changes file sizes/mtimes and therefore the version.
+    """
+    digest = hashlib.sha1()
+    if os.path.isdir(vector_store_path):
+        for root, _, files in sorted(os.walk(vector_store_path)):
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f"{os.path.relpath(os.path.join(root, name), vector_store_path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+class SemanticResponseCache:
+    """
+    Caches full RAG answers keyed by the question's embedding.
+
+    A lookup returns an earlier answer whose question embedding has a cosine
+    similarity of at least `similarity_threshold` with the new question, so
+    paraphrases of the same question share one Gemini generation. Entries are
+    bound to an index version and evicted in LRU order; an optional SQLite file
+    keeps them across restarts.
+    """
+
+    def __init__(self, index_version: str, similarity_threshold: float = 0.93, max_entries: int = 500,
+                 persist_path: str = None):
+        self.index_version = index_version
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # entry_id -> dict(question, vector, answer, latency)
+        self._matrix = None  # Normalized vectors stacked in _entries order, rebuilt lazily
+        self._matrix_ids = []
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._hits = 0
+        self._misses = 0
+        self._saved_latency = 0.0
+
+        self._db = None
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "entry_id INTEGER PRIMARY KEY, index_version TEXT, question TEXT, answer TEXT, "
+                "latency REAL, last_used REAL, vector BLOB)"
+            )
+            # Answers generated against an older index are no longer valid.
+            self._db.execute("DELETE FROM responses WHERE index_version != ?", (index_version,))
+            self._db.commit()
+            self._load()
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT entry_id, question, answer, latency, vector FROM responses ORDER BY last_used"
+        ).fetchall()
+        for entry_id, question, answer, latency, blob in rows[-self.max_entries:]:
+            self._entries[entry_id] = {
+                "question": question,
+                "answer": answer,
+                "latency": latency,
+                "vector": np.frombuffer(blob, dtype=np.float32),
+            }
+            self._next_id = max(self._next_id, entry_id + 1)
+        log.info("Response cache: loaded %d entries for index version %s.", len(self._entries), self.index_version)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # --- 1. Lookup and store ---
+    def lookup(self, query_vector) -> dict or None:
+        """Returns the closest cached entry above the threshold, or None."""
+        query = self._normalize(query_vector)
+        with self._lock:
+            if not self._entries:
+                self._misses += 1
+                return None
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries.keys())
+                self._matrix = np.stack([self._entries[i]["vector"] for i in self._matrix_ids])
+
+            scores = self._matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self._misses += 1
+                return None
+
+            entry_id = self._matrix_ids[best]
+            entry = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            self._hits += 1
+            self._saved_latency += entry["latency"]
+            if self._db is not None:
+                self._db.execute("UPDATE responses SET last_used = ? WHERE entry_id = ?", (time.time(), entry_id))
+                self._db.commit()
+            log.info("Response cache hit (similarity %.3f) on '%s'; saved %.2fs of LLM latency %s.",
+                     scores[best], entry["question"], entry["latency"], self._stats_unlocked())
+            return {**entry, "similarity": float(scores[best])}
+
+    def store(self, question: str, query_vector, answer: str, latency: float):
+        vector = self._normalize(query_vector)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {"question": question, "answer": answer, "latency": latency, "vector": vector}
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                old_id, _ = self._entries.popitem(last=False)
+                evicted.append(old_id)
+            self._matrix = None
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT INTO responses (entry_id, index_version, question, answer, latency, last_used, vector) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (entry_id, self.index_version, question, answer, latency, time.time(), vector.tobytes()),
+                )
+                self._db.executemany("DELETE FROM responses WHERE entry_id = ?", [(i,) for i in evicted])
+                self._db.commit()
+
+    # --- 2. Metrics ---
+    def stats(self) -> dict:
+        with self._lock:
+            return self._stats_unlocked()
+
+    def _stats_unlocked(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._entries),
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "saved_llm_seconds": round(self._saved_latency, 2),
+        }
+
+
+def build_response_cache(config: dict) -> SemanticResponseCache or None:
+    """
+    Creates the response cache from the `cache.responses` section of the config,
+    or returns None if it is disabled.
+    """
+    cache_config = config.get('cache', {}).get('responses', {})
+    if not cache_config.get('enabled', True):
+        return None
+
+    vector_store_path = os.path.join(PROJECT_ROOT, config.get('data', {}).get('vector_store_path', 'vector_store/faiss_index'))
+    persist_path = cache_config.get('persist_path')
+    if persist_path:
+        persist_path = os.path.join(PROJECT_ROOT, persist_path)
+
+    return SemanticResponseCache(
+        index_version=get_index_version(vector_store_path),
+        similarity_threshold=cache_config.get('similarity_threshold', 0.93),
+        max_entries=cache_config.get('max_entries', 500),
+        persist_path=persist_path,
+    )
@@ -0,0 +1,57 @@
+# src/bot_engine/section_matcher.py
+
+import re
+import logging
+
+log = logging.getLogger(__name__)
+
+_MARKER_RE = re.compile(r"^--- TABLE (?:START|END) ---\n?", re.MULTILINE)
+
+
+def _trim(body: str, max_chars: int) -> str:
+    """Cuts a long section at the last paragraph break before `max_chars`."""
+    if len(body) <= max_chars:
+        return body
+    cut = body.rfind("\n\n", 0, max_chars)
+    return body[:cut if cut > max_chars // 2 else max_chars].rstrip() + "\n\n…"
+
+
+def get_section_answer(query: str, heading_index, section_config: dict, filters: dict = None) -> str or None:
+    """
+    Returns a manual section directly when the question is essentially that
+    section's title, e.g. "refund rules" or "cancellation of e-ticket". The
+    best title must score at least `min_score` (0-100) and clearly beat any
+    other section; otherwise the question goes on to retrieval.
+    """
+    if heading_index is None or not section_config.get('enabled', True):
+        return None
+    # Scoped questions only fit this tier when the scope is a choice of manuals.
+    if filters and set(filters) - {"source"}:
+        return None
+    if len(query.split()) > section_config.get('max_query_words', 8):
+        return None
+
+    sources = filters.get("source") if filters else None
+    matches = heading_index.search(query, sources=[sources] if isinstance(sources, str) else sources)
+    if not matches or matches[0]["score"] < section_config.get('min_score', 92):
+        return None
+    best = heading_index.section(matches[0])
+    for other in matches[1:]:
+        if matches[0]["score"] - other["score"] >= section_config.get('min_margin', 5):
+            break
+        # An equally good title elsewhere (e.g. the same heading in two manuals) is ambiguous,
+        # unless it carries the same text.
+        if heading_index.section(other)["body"] != best["body"]:
+            log.info("Section match for '%s' is ambiguous: '%s' (%s) vs '%s' (%s).", query,
+                     best["title"], best["source"], other["title"], other["source"])
+            return None
+
+    body = _MARKER_RE.sub("", best["body"]).strip()
+    if len(body) < section_config.get('min_body_chars', 40):
+        return None
+    print(f"Section Match Found: '{query}' -> '{best['title']}' in {best['source']} (Score: {best['score']})")
+    pages = ""
+    if best["page"] is not None:
+        pages = f", page {best['page']}" if best["page_end"] in (None, best["page"]) \
+            else f", pages {best['page']}-{best['page_end']}"
+    return f"**{best['title']}** ({best['source']}{pages})\n\n{_trim(body, section_config.get('max_chars', 3000))}"
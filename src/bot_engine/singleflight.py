@@ -0,0 +1,94 @@
+# src/bot_engine/singleflight.py
+
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-flight computation whose events are replayed to every subscriber."""
+
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Event()
+        self.task = None
+        self.subscribers = 0
+
+    def publish(self, event):
+        self.events.append(event)
+        self.changed.set()
+
+    async def subscribe(self):
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            self.changed.clear()
+            # Re-check after clearing so an event published in between is not missed.
+            if index == len(self.events) and not self.done:
+                await self.changed.wait()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent computations with the same key. The first caller
+    starts the computation as a background task; callers arriving while it is
+    running attach to it and receive every event it produced so far and all
+    later ones. When the last subscriber goes away (e.g. its deadline passed)
+    the computation is cancelled, so abandoned work stops holding admission
+    capacity.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._started = 0
+        self._coalesced = 0
+        self._cancelled = 0
+
+    async def stream(self, key, agen_factory):
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            self._started += 1
+            flight.task = asyncio.create_task(self._run(key, flight, agen_factory))
+        else:
+            self._coalesced += 1
+            log.info("Single-flight: coalesced request onto in-flight computation %s (total %d).", key, self._coalesced)
+
+        flight.subscribers += 1
+        try:
+            async for event in flight.subscribe():
+                yield event
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                log.info("Single-flight: last subscriber left %s; cancelling the computation.", key)
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self._cancelled += 1
+
+    async def _run(self, key, flight: _Flight, agen_factory):
+        try:
+            async for event in agen_factory():
+                flight.publish(event)
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            flight.changed.set()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stats(self) -> dict:
+        return {"started": self._started, "coalesced": self._coalesced, "cancelled": self._cancelled,
+                "in_flight": len(self._flights)}
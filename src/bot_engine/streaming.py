@@ -0,0 +1,58 @@
+# src/bot_engine/streaming.py
+
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+LINE_BREAK_TAG = "<br>"
+
+
+def clean_line_breaks(text: str) -> str:
+    """Replaces the HTML line breaks Gemini sometimes emits with newlines."""
+    return text.replace("<br><br>", "\n\n").replace(LINE_BREAK_TAG, "\n")
+
+
+def _partial_tag_length(text: str) -> int:
+    """Length of the longest suffix of `text` that could still grow into a <br> tag."""
+    for length in range(min(len(LINE_BREAK_TAG) - 1, len(text)), 0, -1):
+        if LINE_BREAK_TAG.startswith(text[-length:]):
+            return length
+    return 0
+
+
+class _LineBreakCleaner:
+    """Incremental `clean_line_breaks` that holds back a tag split across chunks."""
+
+    def __init__(self):
+        self.pending = ""
+
+    def feed(self, chunk: str) -> str:
+        self.pending = clean_line_breaks(self.pending + chunk)
+        hold = _partial_tag_length(self.pending)
+        ready, self.pending = (self.pending[:-hold], self.pending[-hold:]) if hold else (self.pending, "")
+        return ready
+
+    def flush(self) -> str:
+        ready, self.pending = self.pending, ""
+        return ready
+
+
+def stream_clean_line_breaks(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Applies `clean_line_breaks` to a stream of text chunks. A tag split across
+    chunks ("...<b" + "r>...") is held back until the next chunk completes it.
+    """
+    cleaner = _LineBreakCleaner()
+    for chunk in chunks:
+        if ready := cleaner.feed(chunk):
+            yield ready
+    if rest := cleaner.flush():
+        yield rest
+
+
+async def astream_clean_line_breaks(chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+    """Async counterpart of `stream_clean_line_breaks`."""
+    cleaner = _LineBreakCleaner()
+    async for chunk in chunks:
+        if ready := cleaner.feed(chunk):
+            yield ready
+    if rest := cleaner.flush():
+        yield rest
@@ -0,0 +1,67 @@
+# src/bot_engine/table_matcher.py
+
+import logging
+from src.vector_store.table_store import normalize_cell, row_excerpt
+
+log = logging.getLogger(__name__)
+
+
+def _markdown_row(cells: list[str]) -> str:
+    return "| " + " | ".join(cell.replace("|", "/") for cell in cells) + " |"
+
+
+def get_table_answer(query: str, table_store, table_config: dict, filters: dict = None) -> tuple[str or None, list]:
+    """
+    Answers a question that names a table row and column, e.g. "what is the
+    fee for tatkal", with that cell, without an LLM call. Returns
+    (answer, excerpts): the answer is None unless the question is short, the
+    row's key and the column header cover at least `min_score` percent of its
+    content words, and no differing cell comes within `min_margin`; `excerpts`
+    are the rows the question named, as small table documents to put in front
+    of the retrieved context instead.
+    """
+    if table_store is None or not table_config.get('enabled', True):
+        return None, []
+    # Like the section tier, only a choice of manuals can scope a table lookup.
+    if filters and set(filters) - {"source"}:
+        return None, []
+
+    sources = filters.get("source") if filters else None
+    hits = table_store.lookup(query, sources=[sources] if isinstance(sources, str) else sources,
+                              min_key_chars=table_config.get('min_key_chars', 3))
+    if not hits:
+        return None, []
+    excerpts, seen = [], set()
+    for hit in hits:
+        row_key = (hit["source"], hit["page"], tuple(hit["row"]))
+        if row_key not in seen and len(excerpts) < table_config.get('max_excerpt_rows', 5):
+            seen.add(row_key)
+            excerpts.append(row_excerpt(hit))
+
+    best = hits[0]
+    if best["value"] is None or not normalize_cell(best["value"]):
+        return None, excerpts
+    # A long question, or one the cell only partly names (e.g. a refund question that mentions
+    # "sleeper"), needs the LLM; the named rows still go in front of its context.
+    if len(query.split()) > table_config.get('max_query_words', 10) \
+            or best["coverage"] < table_config.get('min_score', 75):
+        return None, excerpts
+    close = [hit for hit in hits if hit["value"] is not None
+             and best["coverage"] - hit["coverage"] < table_config.get('min_margin', 10)]
+    if len({normalize_cell(hit["value"]) for hit in close}) > 1:
+        log.info("Table lookup for '%s' is ambiguous: %d cells with different values.", query, len(close))
+        return None, excerpts
+
+    print(f"Table Match Found: '{query}' -> {best['column']} of '{best['key']}' in {best['source']} "
+          f"(Page: {best['page']})")
+    width = len(best["header"])
+    answer = "\n".join([
+        f"**{best['column']}** for **{best['key']}**: {best['value']}",
+        "",
+        _markdown_row(best["header"]),
+        _markdown_row(["---"] * width),
+        _markdown_row(best["row"][:width]),
+        "",
+        f"Source: {best['source']} (Page: {best['page'] if best['page'] is not None else 'N/A'})",
+    ])
+    return answer, excerpts
@@ -0,0 +1,258 @@
+# src/core/admission.py
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+import logging
+from langchain_core.embeddings import Embeddings
+
+log = logging.getLogger(__name__)
+
+# Lower value = served first.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Upper bound on how long an async waiter sleeps before re-checking the queue.
+ASYNC_POLL_SECONDS = 0.05
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted: the queue is full or its deadline passed."""
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `per_minute` units."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # A single oversized call must still pass eventually.
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class AdmissionController:
+    """
+    Gates calls to one external API with requests-per-minute and
+    tokens-per-minute buckets and a bounded priority queue.
+
+    Waiters are served strictly by (priority, arrival), so interactive questions
+    overtake queued background ingestion. An interactive caller is rejected
+    immediately if the queue is full, and any caller once its deadline passes
+    while waiting.
+    """
+
+    def __init__(self, name: str, rpm: float = 60, tpm: float = 1_000_000, max_queue: int = 32,
+                 timeout_seconds: float = 10.0):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._queue = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._declined = 0
+        self._cancelled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # --- 1. Queue state machine (caller holds the condition) ---
+    def _enqueue(self, priority: int) -> tuple:
+        # Background work is never turned away; it simply waits behind interactive calls.
+        if priority == INTERACTIVE and len(self._queue) >= self.max_queue:
+            self._rejected += 1
+            raise AdmissionRejected(f"{self.name}: admission queue full ({self.max_queue} waiting).")
+        ticket = (priority, next(self._sequence))
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _try_admit(self, ticket: tuple, tokens: float) -> float:
+        """Admits the ticket if it is at the head and the buckets allow; else returns seconds to wait."""
+        if self._queue[0] != ticket:
+            return ASYNC_POLL_SECONDS
+        now = time.monotonic()
+        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        heapq.heappop(self._queue)
+        return 0.0
+
+    def _abandon(self, ticket: tuple, reason: str):
+        """Drops a waiting ticket; `reason` is "deadline", "declined" (a caller that would not wait) or "cancelled"."""
+        if ticket not in self._queue:
+            return
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        if reason == "deadline":
+            self._timed_out += 1
+        elif reason == "declined":
+            self._declined += 1
+        else:
+            self._cancelled += 1
+
+    def _reject(self, ticket: tuple, timeout: float, start: float):
+        self._abandon(ticket, "declined" if timeout == 0 else "deadline")
+        self._cond.notify_all()
+        raise AdmissionRejected(f"{self.name}: no capacity within {time.monotonic() - start:.1f}s.")
+
+    def _record(self, waited: float):
+        self._admitted += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        if waited > 0.5:
+            log.info("Admission (%s): waited %.2fs; queue depth %d.", self.name, waited, len(self._queue))
+
+    # --- 2. Blocking and async acquisition ---
+    def acquire(self, tokens: float = 1, priority: int = INTERACTIVE, timeout: float = None) -> float:
+        """Blocks until the call is admitted and returns the time waited."""
+        start = time.monotonic()
+        timeout = self.timeout_seconds if timeout is None else timeout
+        deadline = start + timeout
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._try_admit(ticket, tokens)
+                    if wait == 0:
+                        self._cond.notify_all()
+                        waited = time.monotonic() - start
+                        self._record(waited)
+                        return waited
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(ticket, timeout, start)
+                    self._cond.wait(min(wait, remaining))
+            except BaseException:
+                # E.g. KeyboardInterrupt while waiting: the ticket must not block the queue.
+                self._abandon(ticket, "cancelled")
+                self._cond.notify_all()
+                raise
+
+    async def acquire_async(self, tokens: float = 1, priority: int = INTERACTIVE, timeout: float = None) -> float:
+        """
+        Async counterpart of `acquire`; waits without holding a thread. A
+        cancelled waiter (e.g. a discarded speculative retrieval) leaves the queue.
+        """
+        start = time.monotonic()
+        timeout = self.timeout_seconds if timeout is None else timeout
+        deadline = start + timeout
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_admit(ticket, tokens)
+                    if wait == 0:
+                        self._cond.notify_all()
+                        waited = time.monotonic() - start
+                        self._record(waited)
+                        return waited
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(ticket, timeout, start)
+                await asyncio.sleep(min(wait, remaining, ASYNC_POLL_SECONDS))
+        except BaseException:
+            with self._cond:
+                self._abandon(ticket, "cancelled")
+                self._cond.notify_all()
+            raise
+
+    # --- 3. Metrics ---
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "admitted": self._admitted,
+                "rejected_queue_full": self._rejected,
+                "rejected_deadline": self._timed_out,
+                "declined_no_wait": self._declined,
+                "cancelled": self._cancelled,
+                "avg_wait_seconds": round(self._total_wait / self._admitted, 3) if self._admitted else 0.0,
+                "max_wait_seconds": round(self._max_wait, 3),
+            }
+
+
+# --- 4. Process-wide controllers for the Gemini APIs ---
+_DEFAULTS = {
+    "llm": {"rpm": 60, "tpm": 1_000_000, "max_queue": 32, "timeout_seconds": 10.0},
+    "embedding": {"rpm": 1500, "tpm": 1_000_000, "max_queue": 64, "timeout_seconds": 5.0},
+    "vision": {"rpm": 30, "tpm": 1_000_000, "max_queue": 1_000, "timeout_seconds": 600.0},
+}
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def configure_admission(config: dict):
+    """(Re)creates the shared controllers from the `admission` section of the config."""
+    admission_config = config.get('admission', {})
+    with _controllers_lock:
+        for kind, defaults in _DEFAULTS.items():
+            settings = {**defaults, **admission_config.get(kind, {})}
+            _controllers[kind] = AdmissionController(kind, **settings)
+
+
+def get_admission_controller(kind: str) -> AdmissionController:
+    """Returns the shared controller for "llm", "embedding" or "vision" calls."""
+    with _controllers_lock:
+        if kind not in _controllers:
+            _controllers[kind] = AdmissionController(kind, **_DEFAULTS[kind])
+        return _controllers[kind]
+
+
+def admission_stats() -> dict:
+    with _controllers_lock:
+        controllers = dict(_controllers)
+    return {kind: controller.stats() for kind, controller in controllers.items()}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class AdmittedEmbeddings(Embeddings):
+    """
+    Passes every embedding call through the shared "embedding" controller.
+    Query embeddings are interactive; document embeddings (ingestion) are
+    background work and yield to queries.
+    """
+
+    def __init__(self, underlying: Embeddings):
+        self.underlying = underlying
+        self.controller = get_admission_controller("embedding")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.controller.acquire(sum(estimate_tokens(t) for t in texts), BACKGROUND, timeout=float("inf"))
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self.controller.acquire(estimate_tokens(text), INTERACTIVE)
+        return self.underlying.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await self.controller.acquire_async(sum(estimate_tokens(t) for t in texts), BACKGROUND, timeout=float("inf"))
+        return await self.underlying.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await self.controller.acquire_async(estimate_tokens(text), INTERACTIVE)
+        return await self.underlying.aembed_query(text)
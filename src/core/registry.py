@@ -0,0 +1,160 @@
+# src/core/registry.py
+
+import os
+import copy
+import threading
+import tomllib
+import logging
+import yaml
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from src.core.admission import AdmittedEmbeddings
+from src.vector_store.embedding_cache import build_cached_embeddings
+
+log = logging.getLogger(__name__)
+
+# --- DEFINE PROJECT ROOT for reliable file paths ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SETTINGS_PATH = os.path.join(PROJECT_ROOT, "config", "settings.yaml")
+SECRETS_PATH = os.path.join(PROJECT_ROOT, ".streamlit", "secrets.toml")
+
+# Used for anything settings.yaml leaves out (and for everything when it is absent, e.g. on Streamlit Cloud).
+DEFAULT_CONFIG = {
+    "gemini": {
+        "embedding_model": "models/embedding-001",
+        "llm_model": "models/gemini-1.5-flash-latest",
+    },
+    "data": {
+        "pdf_path": "data/pdf",
+        "excel_path": "data/excelfile.xlsx",
+        "vector_store_path": "vector_store/faiss_index",
+    },
+    "ingestion": {
+        "parsing_strategy": "fast",
+    },
+}
+REQUIRED_KEYS = [
+    ("gemini", "api_key"), ("gemini", "embedding_model"), ("gemini", "llm_model"),
+    ("data", "pdf_path"), ("data", "excel_path"), ("data", "vector_store_path"),
+]
+
+
+class ConfigError(ValueError):
+    """Raised when the configuration is missing or invalid."""
+
+
+def _merge(base: dict, override: dict) -> dict:
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _secret_api_key() -> str or None:
+    """
+    The Gemini key from the environment or the Streamlit secrets file, read
+    directly so non-UI code does not need to import streamlit. (Streamlit
+    Cloud also exports root-level secrets as environment variables.)
+    """
+    for name in ("API_KEY", "GEMINI_API_KEY"):
+        if os.environ.get(name):
+            return os.environ[name]
+    try:
+        with open(SECRETS_PATH, "rb") as f:
+            return tomllib.load(f).get("API_KEY")
+    except (FileNotFoundError, tomllib.TOMLDecodeError):
+        return None
+
+
+def _validate(config: dict):
+    missing = [".".join(path) for path in REQUIRED_KEYS if not config.get(path[0], {}).get(path[1])]
+    if missing:
+        raise ConfigError(f"Missing required config value(s): {', '.join(missing)}.")
+    if config["gemini"]["api_key"] == "YOUR_API_KEY_HERE":
+        raise ConfigError("gemini.api_key is still the placeholder from settings.sample.yaml.")
+
+
+_config = None
+_resources = {}
+_lock = threading.RLock()
+
+
+def load_config() -> dict:
+    """
+    Loads, merges and validates the configuration once per process:
+    config/settings.yaml over DEFAULT_CONFIG, with the API key taken from the
+    environment / Streamlit secrets when present. Raises ConfigError.
+    """
+    global _config
+    with _lock:
+        if _config is not None:
+            return _config
+        file_config = {}
+        try:
+            with open(SETTINGS_PATH, 'r') as f:
+                file_config = yaml.safe_load(f) or {}
+            log.info("Loaded config from %s.", SETTINGS_PATH)
+        except FileNotFoundError:
+            log.info("'settings.yaml' not found. Using defaults and secrets.")
+
+        config = _merge(DEFAULT_CONFIG, file_config)
+        api_key = _secret_api_key()
+        if api_key:
+            config["gemini"]["api_key"] = api_key
+        _validate(config)
+        _config = config
+        return _config
+
+
+def _get_or_create(name: str, factory):
+    with _lock:
+        if name not in _resources:
+            _resources[name] = factory()
+            log.info("Registry: created %s.", name)
+        return _resources[name]
+
+
+def create_embeddings(config: dict):
+    """A new Gemini embeddings client behind admission control and the query cache."""
+    embeddings = GoogleGenerativeAIEmbeddings(model=config['gemini']['embedding_model'],
+                                              google_api_key=config['gemini']['api_key'])
+    return build_cached_embeddings(AdmittedEmbeddings(embeddings), config)
+
+
+def get_embeddings():
+    """The shared embeddings client."""
+    return _get_or_create("embeddings", lambda: create_embeddings(load_config()))
+
+
+def get_llm(max_output_tokens: int = 2048):
+    """The shared Gemini chat client for a given output cap."""
+    def create():
+        config = load_config()
+        resilience_config = config.get('resilience', {})
+        return ChatGoogleGenerativeAI(
+            model=config['gemini']['llm_model'],
+            google_api_key=config['gemini']['api_key'],
+            temperature=0.1, # Lowered for more factual responses
+            max_output_tokens=max_output_tokens,
+            # Deadlines and hedging are handled by ResilientLLM; keep client retries short.
+            timeout=resilience_config.get('request_timeout_seconds', 60),
+            max_retries=resilience_config.get('max_retries', 1),
+        )
+    return _get_or_create(f"llm[max_output_tokens={max_output_tokens}]", create)
+
+
+def get_vector_store():
+    """The shared FAISS vector store, loaded (or built) on first use. Returns None on failure."""
+    def create():
+        # Imported here: vector_builder itself uses create_embeddings from this module.
+        from src.vector_store.vector_builder import get_or_create_vector_store
+
+        return get_or_create_vector_store(load_config(), embeddings=get_embeddings())
+    with _lock:
+        store = _get_or_create("vector_store", create)
+        if store is None:
+            # Do not cache a failed load; the next call retries.
+            del _resources["vector_store"]
+        return store
@@ -1,25 +1,28 @@
 import os
 import yaml
-from unstructured.partition.pdf import partition_pdf
-from unstructured.documents.elements import Table, Title, Text
-from langchain.docstore.document import Document
+from langchain_core.documents import Document
 import base64
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-import google.generativeai as genai
-import streamlit as st # Import Streamlit
+from src.core.admission import AdmissionRejected, BACKGROUND, get_admission_controller
+from src.core.registry import ConfigError, load_config
+from src.ingestion.table_parser import format_rows, table_rows
+
+# The ingestion stack (unstructured's layout detection, google.generativeai) is
+# heavy and only needed when an index is built, so it is imported inside the
+# functions below rather than at module load.
 
 # --- Placeholder for Gemini Vision Functionality ---
 # This function will describe an image using the Gemini Pro Vision model.
 def get_image_description(image_bytes: bytes) -> str:
     """Uses Gemini Pro Vision to describe an image."""
+    import google.generativeai as genai
+    from google.generativeai.types import HarmCategory, HarmBlockThreshold
     
-    # Get the API key from Streamlit secrets instead of hardcoding it
-    # This assumes you have GEMINI_API_KEY set in your secrets.toml file
+    # Get the API key from the shared config (settings.yaml, environment or Streamlit secrets)
     try:
-        api_key = st.secrets["API_KEY"]
+        api_key = load_config()['gemini']['api_key']
         genai.configure(api_key=api_key)
-    except KeyError:
-        return "[Image Description: Error - GEMINI_API_KEY not found in Streamlit secrets.]"
+    except ConfigError as e:
+        return f"[Image Description: Error - {e}]"
     except Exception as e:
         return f"[Image Description: Error configuring Gemini - {e}]"
 
@@ -30,6 +33,12 @@ def get_image_description(image_bytes: bytes) -> str:
         *image_parts
     ]
     
+    try:
+        # Ingestion is background work: it queues behind interactive questions.
+        get_admission_controller("vision").acquire(tokens=1000, priority=BACKGROUND)
+    except AdmissionRejected as e:
+        return f"[Image Description: Skipped - {e}]"
+
     try:
         model = genai.GenerativeModel('gemini-pro-vision')
         response = model.generate_content(
@@ -45,21 +54,31 @@ def get_image_description(image_bytes: bytes) -> str:
         return f"[Image Description: Error processing image - {e}]"
 
 
-def load_and_process_pdfs(pdf_folder_path: str, config: dict) -> list[Document]:
+def load_and_process_pdfs(pdf_folder_path: str, config: dict, files: list[str] = None) -> list[Document]:
     """
     Loads and processes PDFs using the 'unstructured' library, handling text and tables.
     Optionally processes images using a multimodal model.
+    `files` restricts loading to the given file names in the folder.
     """
-    documents = []
+    return list(iter_pdf_documents(pdf_folder_path, config, files))
+
+
+def iter_pdf_documents(pdf_folder_path: str, config: dict, files: list[str] = None):
+    """
+    Like `load_and_process_pdfs`, but yields one Document per PDF as it is
+    parsed, so only one manual is held in memory at a time.
+    """
+    from unstructured.partition.pdf import partition_pdf
+    from unstructured.documents.elements import Table, Title, Text
+
     ingestion_config = config.get('ingestion', {})
     
-    # The API key is now managed by Streamlit secrets, not passed via config
-    # api_key = gemini_config.get('api_key') 
+    # The API key for image descriptions comes from the registry, not from this config
     
     strategy = ingestion_config.get('parsing_strategy', 'fast')
     process_images_flag = ingestion_config.get('process_images', False)
 
-    for file in os.listdir(pdf_folder_path):
+    for file in os.listdir(pdf_folder_path) if files is None else files:
         if not file.endswith('.pdf'):
             continue
             
@@ -75,11 +94,23 @@ def load_and_process_pdfs(pdf_folder_path: str, config: dict) -> list[Document]:
         )
         
         page_content = ""
+        # [character offset, page number] wherever a new page starts; used to tag chunks with their pages.
+        page_starts = []
+        # Tables with a recovered structure: {"offset", "page", "rows"}, for the table store.
+        tables = []
         for element in elements:
+            page_number = getattr(element.metadata, 'page_number', None)
+            if page_number is not None and (not page_starts or page_starts[-1][1] != page_number):
+                page_starts.append([len(page_content), page_number])
             if isinstance(element, Table):
-                # Format tables clearly for the LLM
+                # Format tables clearly for the LLM: one "cell | cell" line per row when the structure is known
                 page_content += "\n\n--- TABLE START ---\n"
-                page_content += element.text
+                rows = table_rows(getattr(element.metadata, 'text_as_html', None))
+                if rows:
+                    tables.append({'offset': len(page_content), 'page': page_number, 'rows': rows})
+                    page_content += format_rows(rows)
+                else:
+                    page_content += element.text
                 page_content += "\n--- TABLE END ---\n\n"
             elif isinstance(element, Title):
                 page_content += f"\n## {element.text}\n\n"
@@ -93,9 +124,7 @@ def load_and_process_pdfs(pdf_folder_path: str, config: dict) -> list[Document]:
                 page_content += image_description + "\n"
 
         if page_content:
-            documents.append(Document(
+            yield Document(
                 page_content=page_content,
-                metadata={'source': file}
-            ))
-            
-    return documents
+                metadata={'source': file, 'page_starts': page_starts, 'tables': tables}
+            )
@@ -0,0 +1,52 @@
+# src/ingestion/table_parser.py
+
+from html.parser import HTMLParser
+
+
+class _TableHTMLParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if any(self._row):
+                self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def table_rows(html: str) -> list[list[str]]:
+    """
+    The rows of a table from partition_pdf's `text_as_html`, as lists of cell
+    strings padded to the same width. The first row is taken as the header.
+    Returns [] when there is no usable table structure.
+    """
+    if not html:
+        return []
+    parser = _TableHTMLParser()
+    parser.feed(html)
+    rows = parser.rows
+    if len(rows) < 2:
+        return []
+    width = max(len(row) for row in rows)
+    return [row + [""] * (width - len(row)) for row in rows]
+
+
+def format_rows(rows: list[list[str]]) -> str:
+    """One line per row, cells separated by ' | ', as embedded and shown to the LLM."""
+    return "\n".join(" | ".join(cell.replace("|", "/") for cell in row) for row in rows)
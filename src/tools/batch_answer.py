@@ -0,0 +1,177 @@
+# src/tools/batch_answer.py
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.engine import QAEngine, build_engine
+from src.core.admission import TokenBucket
+from src.core.registry import load_config
+from src.vector_store.embedding_cache import normalize_query
+
+
+# --- 1. Input and resume state ---
+def read_questions(path: str, column: str = "user_desc", field: str = "question") -> list[dict]:
+    """
+    Questions from a JSONL file (objects with a `field` key and an optional
+    "id", or bare strings) or an Excel sheet (the `column` column; the FAQ
+    sheet's reference answer, if present, is kept as "expected").
+    """
+    items = []
+    if path.lower().endswith((".xlsx", ".xls")):
+        import pandas as pd
+
+        df = pd.read_excel(path)
+        if column not in df.columns:
+            raise ValueError(f"{path} has no '{column}' column (columns: {', '.join(map(str, df.columns))}).")
+        for row_number, record in enumerate(df.to_dict(orient="records"), start=2):
+            question = record.get(column)
+            if isinstance(question, str) and question.strip():
+                item = {"question": question.strip(), "row": row_number}
+                if isinstance(record.get("user_reply_desc"), str):
+                    item["expected"] = record["user_reply_desc"]
+                items.append(item)
+        return items
+
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {field: record}
+            question = record.get(field)
+            if not isinstance(question, str) or not question.strip():
+                raise ValueError(f"{path}:{line_number} has no '{field}' string.")
+            items.append({**record, "question": question.strip(), "line": line_number})
+    return items
+
+
+def question_key(item: dict) -> str:
+    """Identifies a question across runs: its "id" if the input has one, else its normalized text."""
+    return str(item["id"]) if item.get("id") is not None else normalize_query(item["question"])
+
+
+def load_done(output_path: str) -> set[str]:
+    """
+    Keys of questions already answered in an earlier run. Errors and
+    overload fallbacks are not counted as done, so a rerun retries them.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short when an earlier run was interrupted.
+            if "error" not in record and record.get("source") != "fallback":
+                done.add(record["key"])
+    return done
+
+
+# --- 2. Running the batch ---
+async def _take(bucket: TokenBucket, lock: asyncio.Lock):
+    async with lock:
+        while (wait := bucket.wait_time(1, time.monotonic())) > 0:
+            await asyncio.sleep(wait)
+        bucket.take(1)
+
+
+async def run_batch(engine: QAEngine, items: list[dict], output_path: str, concurrency: int = 4,
+                    rpm: float = 0, timeout: float = 120) -> list[dict]:
+    """
+    Answers `items` through the engine's full pipeline (FAQ -> section ->
+    table -> retrieval -> Gemini), at most `concurrency` at a time and, with
+    `rpm`, at most that many questions started per minute. Each result is
+    appended to `output_path` as one JSON line as soon as it is ready.
+    Returns the records written.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket, bucket_lock = None, asyncio.Lock()
+    if rpm:
+        bucket = TokenBucket(rpm)
+        bucket.level = min(bucket.level, float(concurrency))  # No burst of a whole minute's budget at start.
+    records = []
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def answer_one(item: dict):
+            async with semaphore:
+                if bucket is not None:
+                    await _take(bucket, bucket_lock)
+                record = {"key": question_key(item), **{k: v for k, v in item.items() if k != "key"}}
+                start = time.perf_counter()
+                try:
+                    # On timeout the engine's shared computation is cancelled too (unless another caller
+                    # is waiting on it), so timed-out items do not keep holding LLM admission.
+                    record.update(await asyncio.wait_for(engine.answer(item["question"]), timeout))
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                record["seconds"] = round(time.perf_counter() - start, 3)
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                records.append(record)
+                status = record.get("error") or record.get("source")
+                print(f"[{len(records)}/{len(items)}] {record['seconds']:6.2f}s {status}: {item['question'][:70]}")
+
+        await asyncio.gather(*(answer_one(item) for item in items))
+    return records
+
+
+def print_summary(records: list[dict], skipped: int):
+    print(f"\n=== Batch summary: {len(records)} answered, {skipped} skipped (already done or duplicated) ===")
+    if not records:
+        return
+    sources = Counter(record.get("source") or "error" for record in records)
+    print("By source: " + ", ".join(f"{source}={count}" for source, count in sources.most_common()))
+    seconds = sorted(record["seconds"] for record in records)
+    print(f"Seconds per question: p50={seconds[len(seconds) // 2]:.2f} "
+          f"p95={seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]:.2f} max={seconds[-1]:.2f}")
+
+
+# This block runs a batch from the command line
+if __name__ == '__main__':
+    batch_config = load_config().get('batch', {})
+    parser = argparse.ArgumentParser(description="Answer a file of questions with the full pipeline and "
+                                                 "stream the results to JSONL. Reruns skip answered questions.")
+    parser.add_argument("input", help="A .jsonl file of questions or an Excel sheet (e.g. the FAQ sheet).")
+    parser.add_argument("--output", default="batch_answers.jsonl", help="Results file; appended to across runs.")
+    parser.add_argument("--column", default="user_desc", help="Question column of an Excel sheet.")
+    parser.add_argument("--field", default="question", help="Question key of JSONL objects.")
+    parser.add_argument("--concurrency", type=int, default=batch_config.get('concurrency', 4))
+    parser.add_argument("--rpm", type=float, default=batch_config.get('rpm', 30),
+                        help="Questions started per minute (0 = no limit). Gemini calls are also "
+                             "limited by the `admission` config.")
+    parser.add_argument("--timeout", type=float, default=batch_config.get('timeout_seconds', 120),
+                        help="Seconds allowed per question.")
+    parser.add_argument("--limit", type=int, default=None, help="Answer at most this many pending questions.")
+    parser.add_argument("--no-faq", action="store_true",
+                        help="Skip the FAQ stage, e.g. to test retrieval on the FAQ sheet's own questions.")
+    args = parser.parse_args()
+
+    questions = read_questions(args.input, args.column, args.field)
+    already_done = load_done(args.output)
+    pending, seen = [], set(already_done)
+    for question in questions:
+        if question_key(question) not in seen:
+            seen.add(question_key(question))
+            pending.append(question)
+    pending = pending[:args.limit] if args.limit is not None else pending
+    print(f"{len(questions)} questions, {len(questions) - len(pending)} already done or duplicated, "
+          f"{len(pending)} to answer.")
+
+    qa_engine = build_engine()
+    if args.no_faq:
+        qa_engine.faq_data = []
+    results = asyncio.run(run_batch(qa_engine, pending, args.output, args.concurrency, args.rpm, args.timeout))
+    print_summary(results, len(questions) - len(pending))
@@ -0,0 +1,83 @@
+# src/tools/import_report.py
+
+import sys
+import os
+import argparse
+import subprocess
+from collections import defaultdict
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Modules the serving path must not load at startup: they belong to index building only.
+INGESTION_PACKAGES = ["unstructured", "unstructured_inference", "google.generativeai", "pdfminer", "detectron2"]
+SERVING_MODULES = ["src.bot_engine.engine", "src.api.server"]
+
+
+def measure_imports(module: str) -> list[tuple[str, int, int]]:
+    """
+    Imports `module` in a fresh interpreter under `-X importtime` and returns
+    (module name, self us, cumulative us) for every module it loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize(rows: list, top: int) -> dict:
+    """Total time, the slowest packages (self time summed per top-level package) and modules."""
+    per_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        per_package[name.split(".")[0]] += self_us
+    return {
+        "total_ms": sum(self_us for _, self_us, _ in rows) / 1000,
+        "modules": len(rows),
+        "packages": sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top],
+        "slowest": sorted(rows, key=lambda row: row[2], reverse=True)[:top],
+    }
+
+
+def ingestion_leaks(rows: list) -> list[str]:
+    """Ingestion-only modules that were imported."""
+    names = {name for name, _, _ in rows}
+    return sorted(name for name in names
+                  if any(name == package or name.startswith(package + ".") for package in INGESTION_PACKAGES))
+
+
+def print_report(module: str, rows: list, top: int):
+    summary = summarize(rows, top)
+    print(f"\n=== import {module}: {summary['total_ms']:.0f} ms, {summary['modules']} modules ===")
+    print("Top packages (self time):")
+    for package, self_us in summary["packages"]:
+        print(f"  {self_us / 1000:9.1f} ms  {package}")
+    print("Slowest imports (cumulative):")
+    for name, _, cumulative_us in summary["slowest"]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+
+# This block allows running the report from the command line to track cold start
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report import time of the serving path (python -X importtime).")
+    parser.add_argument("modules", nargs="*", default=SERVING_MODULES, help="Modules to import.")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    leaked = False
+    for module in args.modules:
+        rows = measure_imports(module)
+        print_report(module, rows, args.top)
+        leaks = ingestion_leaks(rows)
+        if leaks:
+            leaked = True
+            print(f"WARNING: {module} imports ingestion-only modules: {', '.join(leaks[:10])}")
+    sys.exit(1 if leaked else 0)
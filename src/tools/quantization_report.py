@@ -0,0 +1,96 @@
+# src/tools/quantization_report.py
+
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import faiss
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.vector_store.quantization import QUANTIZATION_TYPES, RERANK_VECTORS_FILE
+
+
+def load_float32_vectors(vector_store_path: str) -> np.ndarray:
+    """The corpus vectors in float32: the saved re-rank copy, or reconstructed from a flat index."""
+    rerank_path = os.path.join(vector_store_path, RERANK_VECTORS_FILE)
+    if os.path.exists(rerank_path):
+        return np.load(rerank_path)
+    index = faiss.read_index(os.path.join(vector_store_path, "index.faiss"))
+    if not isinstance(index, faiss.IndexFlat):
+        raise ValueError(f"{vector_store_path} holds a {type(index).__name__} without {RERANK_VECTORS_FILE}; "
+                         "the report needs the float32 vectors.")
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def _index_bytes(index: faiss.Index) -> int:
+    return len(faiss.serialize_index(index))
+
+
+def _evaluate(name: str, index: faiss.Index, queries: np.ndarray, truth: np.ndarray, k: int,
+              rerank_vectors: np.ndarray = None, rerank_factor: int = 4) -> dict:
+    start = time.perf_counter()
+    if rerank_vectors is None:
+        _, found = index.search(queries, k)
+    else:
+        _, shortlist = index.search(queries, k * rerank_factor)
+        found = np.empty((len(queries), k), dtype=np.int64)
+        for row, (query, candidates) in enumerate(zip(queries, shortlist)):
+            candidates = candidates[candidates != -1]
+            distances = ((rerank_vectors[candidates] - query) ** 2).sum(axis=1)
+            found[row] = candidates[np.argsort(distances)[:k]]
+    elapsed = time.perf_counter() - start
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    return {"name": name, "bytes": _index_bytes(index), "recall": recall, "ms": elapsed * 1000 / len(queries)}
+
+
+def run_report(vectors: np.ndarray, num_queries: int, k: int, rerank_factor: int) -> list[dict]:
+    """
+    Holds out `num_queries` chunk vectors as queries and compares every
+    quantization against exact float32 search over the remaining chunks.
+    """
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[order[:num_queries]])
+    base = np.ascontiguousarray(vectors[order[num_queries:]])
+    dim = base.shape[1]
+
+    exact = faiss.IndexFlatL2(dim)
+    exact.add(base)
+    _, truth = exact.search(queries, k)
+
+    rows = [_evaluate("float32 (flat)", exact, queries, truth, k)]
+    for quantization, qtype in QUANTIZATION_TYPES.items():
+        index = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_L2)
+        index.train(base)
+        index.add(base)
+        rows.append(_evaluate(quantization, index, queries, truth, k))
+        rows.append(_evaluate(f"{quantization} + float32 re-rank", index, queries, truth, k, base, rerank_factor))
+    return rows
+
+
+def print_report(rows: list[dict], num_vectors: int, k: int):
+    baseline = rows[0]["bytes"]
+    print(f"\n=== Quantization report: {num_vectors} vectors, recall@{k} vs exact float32 ===")
+    print(f"{'variant':<28} {'index MB':>9} {'smaller':>8} {'recall':>7} {'ms/query':>9}")
+    for row in rows:
+        print(f"{row['name']:<28} {row['bytes'] / 1024 / 1024:9.2f} {baseline / row['bytes']:7.1f}x "
+              f"{row['recall']:7.3f} {row['ms']:9.3f}")
+    print("Re-rank vectors are memory-mapped from disk, so they add little resident memory.")
+
+
+# This block allows running the report from the command line against a built index
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare float32, fp16 and int8 storage on the built index.")
+    parser.add_argument("--path", default="vector_store/faiss_index", help="Vector store path, relative to the project.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=7)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = load_float32_vectors(os.path.join(PROJECT_ROOT, args.path))
+    num_queries = min(args.queries, len(corpus) // 5)
+    print_report(run_report(corpus, num_queries, args.k, args.rerank_factor), len(corpus) - num_queries, args.k)
@@ -2,20 +2,19 @@
 # src/ui/app.py
 
 import streamlit as st
-import yaml
 import sys
 import os
-from thefuzz import process
+import uuid
 
 # --- System Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(PROJECT_ROOT)
 
 # --- Backend Imports ---
-from src.ingestion.excel_parser import parse_excel_qa
-from src.bot_engine.gemini_responder import get_rag_chain
-# We now only need this one function for the vector store
-from src.vector_store.vector_builder import get_or_create_vector_store
+from src.bot_engine.engine import build_engine
+from src.core.registry import ConfigError, load_config
+from src.bot_engine.orchestrator import iter_sync
+from src.ui.history import ChatHistoryStore
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Document & FAQ Chatbot", layout="wide")
@@ -26,118 +25,117 @@ st.write("Ask a question about your documents, or check our FAQs!")
 @st.cache_resource
 def load_all_resources():
     """
-    Loads all necessary resources using the robust get_or_create_vector_store function.
+    Loads the config and builds the question-answering engine once per process.
     """
     print("\n--- INITIATING RESOURCE LOADING ---")
 
-    # --- 1. Load Config (Hybrid Approach) ---
-    config = {}
-    settings_path = os.path.join(PROJECT_ROOT, "config", "settings.yaml")
+    # --- 1. Load Config (settings.yaml, environment and Streamlit secrets, via the registry) ---
     try:
-        with open(settings_path, 'r') as f:
-            config = yaml.safe_load(f)
-        print("1. Loaded config from local 'settings.yaml' file.")
-        if "API_KEY" in st.secrets:
-            config['gemini']['api_key'] = st.secrets["API_KEY"]
-    except FileNotFoundError:
-        print("1. 'settings.yaml' not found. Loading config from Streamlit secrets.")
-        if "API_KEY" in st.secrets:
-            config = {
-                "gemini": {
-                    "api_key": st.secrets["API_KEY"],
-                    "embedding_model": "models/embedding-001",
-                    "llm_model": "models/gemini-1.5-flash-latest"
-                },
-                "data": {
-                    "pdf_path": "data/pdf",
-                    "excel_path": "data/excelfile.xlsx",
-                    "vector_store_path": "vector_store/faiss_index"
-                },
-                "ingestion": {
-                    "parsing_strategy": "fast"
-                }
-            }
-        else:
-            st.error("API Key not found in Streamlit secrets.")
-            st.stop()
-
-    # --- 2. Load or Build the Vector Store and Create Retriever ---
-    vector_store = get_or_create_vector_store(config)
-    if vector_store is None:
-        st.error("Failed to load or build the vector store. App cannot continue.")
+        config = load_config()
+    except ConfigError as e:
+        st.error(f"{e} App cannot continue.")
         st.stop()
-    
-    retriever = vector_store.as_retriever(search_kwargs={"k": 7})
-    print("Retriever created successfully.")
-
-    # --- 3. Load other resources ---
-    faq_data = None
-    rag_chain = None
-
-    try:
-        excel_path = os.path.join(PROJECT_ROOT, config['data']['excel_path'])
-        faq_data = parse_excel_qa(excel_path)
-        print(f"FAQ Data Loaded: {'SUCCESS' if faq_data is not None else 'FAILED'}")
-    except Exception as e:
-        print(f"FAQ Data Loaded: FAILED with an exception: {e}")
 
+    # --- 2. Build the question-answering engine (vector store, FAQ sheet, RAG chain) ---
     try:
-        rag_chain = get_rag_chain(retriever)
-        print(f"RAG Chain Loaded: {'SUCCESS' if rag_chain is not None else 'FAILED'}")
-    except Exception as e:
-        print(f"RAG Chain Loaded: FAILED with an exception: {e}")
-    
-    # --- Final Check ---
-    if faq_data is None or retriever is None or rag_chain is None:
-        st.error("Failed to load one or more resources. Please check terminal logs for details.")
+        engine = build_engine()
+    except RuntimeError as e:
+        st.error(f"{e} App cannot continue.")
         st.stop()
+
+    # --- 3. Shared, capped chat history store ---
+    ui_config = config.get('ui', {})
+    history_store = ChatHistoryStore(
+        max_messages=ui_config.get('max_messages_per_session', 200),
+        idle_seconds=ui_config.get('idle_session_seconds', 1800),
+    )
         
     print("--- ALL RESOURCES LOADED SUCCESSFULLY ---\n")
-    return faq_data, retriever, rag_chain
-
-# --- Load all resources and assign them to variables ---
-faq_data, retriever, rag_chain = load_all_resources()
-
-# --- [The rest of your app.py (Chat Logic, UI State, Main Interaction) is correct and can remain the same] ---
-def get_faq_answer(query: str, faqs: list[dict]) -> str or None:
-    if not faqs: return None
-    faq_questions = [item['user_desc'] for item in faqs]
-    best_match = process.extractOne(query, faq_questions, score_cutoff=90)
-    
-    if best_match:
-        best_matching_question_text = best_match[0]
-        for item in faqs:
-            if item['user_desc'] == best_matching_question_text:
-                print(f"FAQ Match Found: '{query}' -> '{best_matching_question_text}' (Score: {best_match[1]})")
-                return item['user_reply_desc']
-    return None
-
-if 'messages' not in st.session_state:
-    st.session_state.messages = [{"role": "assistant", "content": "How can I help you today?"}]
-
-for message in st.session_state.messages:
+    return engine, history_store, ui_config.get('history_page_size', 20)
+
+# --- Load all resources; the UI is one client of the engine ---
+engine, history_store, history_page_size = load_all_resources()
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.history_window = history_page_size
+if 'memory' not in st.session_state:
+    # Bounded memory of earlier turns, used to understand follow-up questions.
+    st.session_state.memory = engine.new_memory()
+session_id = st.session_state.session_id
+history_store.evict_idle()
+
+def load_earlier_messages():
+    st.session_state.history_window += history_page_size
+
+def render_figures(figures: list[dict], message_key: str):
+    """
+    Thumbnails of the figures on the answer's pages, read from the packed
+    thumbnail file. A figure is loaded at full size only when its button is clicked.
+    """
+    if not figures or engine.figure_index is None:
+        return
+    st.caption("Figures on these pages:")
+    for column, figure in zip(st.columns(len(figures)), figures):
+        with column:
+            st.image(engine.figure_index.thumbnail(figure["name"]), caption=f"Page {figure['page']}")
+            if st.button("Full size", key=f"{message_key}-{figure['name']}"):
+                opened = (message_key, figure["name"])
+                st.session_state.open_figure = None if st.session_state.get("open_figure") == opened else opened
+    opened = st.session_state.get("open_figure")
+    if opened and opened[0] == message_key:
+        st.image(engine.figure_index.full_path(opened[1]), caption=f"{opened[1]}")
+
+# Only the most recent window is rendered, so a rerun costs the same however long the chat is.
+messages, hidden_count = history_store.window(session_id, st.session_state.history_window)
+if hidden_count:
+    st.button(f"Load earlier messages ({hidden_count} hidden)", on_click=load_earlier_messages)
+
+for message in messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
+        render_figures(message.get("figures"), message.get("key", ""))
 
 if prompt := st.chat_input("Ask your question..."):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    history_store.append(session_id, "user", prompt)
     with st.chat_message("user"):
         st.markdown(prompt)
 
+    figures, message_key = [], uuid.uuid4().hex[:8]
     with st.chat_message("assistant"):
+        # FAQ lookup and document retrieval start together; retrieval is
+        # discarded on an FAQ hit. Identical questions asked at the same time
+        # by other users share one computation.
+        events = iter_sync(engine.stream_events(prompt, st.session_state.memory))
         with st.spinner("Thinking..."):
-            faq_answer = get_faq_answer(prompt, faq_data)
-            
-            if faq_answer:
-                response = f"**From FAQ:**\n\n{faq_answer}"
-            else:
-                st.info("No FAQ match found. Searching documents...")
-                response = rag_chain.invoke(prompt)
-                response = response.replace("<br><br>", "\n\n")
-            # Replace any single <br> with a single newline
-                response = response.replace("<br>", "\n")
+            _, source = next(events)
             
+        if source == "faq":
+            faq_answer = "".join(value for kind, value in events if kind == "chunk")
+            response = f"**From FAQ:**\n\n{faq_answer}"
+            st.markdown(response)
+        elif source in ("section", "table"):
+            # The question named a manual section or a table cell; it is shown as written, without generation.
+            manual_answer = "".join(value for kind, value in events if kind == "chunk")
+            response = f"**From the manual:**\n\n{manual_answer}"
             st.markdown(response)
+        elif source == "fallback":
+            # The Gemini APIs are saturated; the engine answered from the FAQ sheet only.
+            response = "".join(value for kind, value in events if kind == "chunk")
+            st.markdown(response)
+        else:
+            st.info("No FAQ match found. Searching documents...")
+            # Render tokens as Gemini produces them; <br> tags are replaced with
+            # newlines on the partial output as well.
+            def answer_chunks():
+                for kind, value in events:
+                    if kind == "chunk":
+                        yield value
+                    elif kind == "figures":
+                        figures.extend(value)
+            response = st.write_stream(answer_chunks())
+            # Figures on the retrieved pages are attached once the answer is complete.
+            render_figures(figures, message_key)
             
-    st.session_state.messages.append({"role": "assistant", "content": response})
+    history_store.append(session_id, "assistant", response, figures=figures, key=message_key)
 
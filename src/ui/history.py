@@ -0,0 +1,61 @@
+# src/ui/history.py
+
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+GREETING = {"role": "assistant", "content": "How can I help you today?"}
+
+
+class ChatHistoryStore:
+    """
+    Process-wide chat histories keyed by session id, kept out of
+    st.session_state so they can be capped and evicted.
+
+    Each session keeps at most `max_messages` (oldest dropped first), and
+    sessions untouched for `idle_seconds` are evicted on the next sweep.
+    """
+
+    def __init__(self, max_messages: int = 200, idle_seconds: float = 1800, sweep_interval: float = 60):
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = sweep_interval
+        self._sessions = {}  # session_id -> [last_seen, deque of messages]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _session(self, session_id: str) -> list:
+        # Caller holds the lock.
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = [time.monotonic(), deque([dict(GREETING)], maxlen=self.max_messages)]
+            self._sessions[session_id] = entry
+        entry[0] = time.monotonic()
+        return entry
+
+    def append(self, session_id: str, role: str, content: str, **extra):
+        """Adds a message; `extra` fields (e.g. the figures shown with an answer) are kept with it."""
+        with self._lock:
+            self._session(session_id)[1].append({"role": role, "content": content, **extra})
+
+    def window(self, session_id: str, count: int) -> tuple[list[dict], int]:
+        """Returns the last `count` messages and how many earlier ones are hidden."""
+        with self._lock:
+            messages = self._session(session_id)[1]
+            hidden = max(0, len(messages) - count)
+            return list(islice(messages, hidden, None)), hidden
+
+    def evict_idle(self) -> int:
+        """Drops sessions idle for longer than `idle_seconds`; runs at most once per sweep interval."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return 0
+            self._last_sweep = now
+            idle = [sid for sid, (last_seen, _) in self._sessions.items() if now - last_seen > self.idle_seconds]
+            for sid in idle:
+                del self._sessions[sid]
+        if idle:
+            print(f"Chat history: evicted {len(idle)} idle session(s).")
+        return len(idle)
@@ -0,0 +1,217 @@
+# src/vector_store/collection_store.py
+
+import os
+import re
+import fnmatch
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from src.vector_store.vector_builder import PROJECT_ROOT, build_vector_store, index_exists
+from src.vector_store.quantization import QuantizedFAISS, load_vector_store
+
+log = logging.getLogger(__name__)
+
+COLLECTIONS_DIR = "collections"
+
+# File-name words that say nothing about which manual a question is about.
+_GENERIC_WORDS = {"manual", "guide", "user", "users", "the", "and", "for", "handbook", "document", "final", "version"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _slug(name: str) -> str:
+    return "-".join(_WORD_RE.findall(name.lower())) or "collection"
+
+
+def assign_collections(pdf_files: list[str], groups: dict) -> dict[str, list[str]]:
+    """
+    Maps collection name -> PDF file names. Files matching a configured group's
+    `files` patterns go to that group; every other manual gets its own collection.
+    """
+    assignment = {}
+    for file in pdf_files:
+        name = next((group for group, settings in groups.items()
+                     if any(fnmatch.fnmatch(file, pattern) for pattern in settings.get('files', []))), None)
+        assignment.setdefault(name or _slug(os.path.splitext(file)[0]), []).append(file)
+    return assignment
+
+
+def collection_keywords(name: str, extra: list[str]) -> set[str]:
+    """Words that route a question to a collection: its name's words plus configured keywords."""
+    words = {word for word in _WORD_RE.findall(name.lower()) if len(word) >= 3 and word not in _GENERIC_WORDS}
+    return words | {keyword.lower() for keyword in extra}
+
+
+def _directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+class CollectionStore(VectorStore):
+    """
+    A vector store over several FAISS collections (one per manual or
+    department) under `<vector_store_path>/collections`.
+
+    A question whose words name a collection searches only the matching
+    collections; any other question fans out over all of them on a thread pool
+    and the per-collection top-k lists are merged by distance. Collections are
+    loaded on first use and the least recently used ones are evicted beyond
+    `max_loaded` collections or `max_loaded_mb` of index files.
+    """
+
+    def __init__(self, root: str, embeddings, keywords: dict[str, set[str]], max_loaded: int = 8,
+                 max_loaded_mb: float = 1024, max_workers: int = 4, indexing_config: dict = None):
+        self.root = root
+        self._embeddings = embeddings
+        self.indexing_config = indexing_config or {}
+        self.keywords = keywords
+        self.max_loaded = max_loaded
+        self.max_loaded_bytes = max_loaded_mb * 1024 * 1024
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collection-search")
+        self._loaded = OrderedDict()  # name -> (FAISS, size in bytes), least recently used first
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in keywords}
+        self._loads = 0
+        self._evictions = 0
+        self._routed = 0
+        self._fanned_out = 0
+
+    @property
+    def embeddings(self):
+        return self._embeddings
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.keywords)
+
+    # --- 1. Lazy loading and eviction ---
+    def _get(self, name: str) -> QuantizedFAISS:
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name][0]
+        with self._load_locks[name]:
+            with self._lock:
+                if name in self._loaded:
+                    return self._loaded[name][0]
+            path = os.path.join(self.root, name)
+            store = load_vector_store(path, self._embeddings, self.indexing_config)
+            size = _directory_size(path)
+            with self._lock:
+                self._loaded[name] = (store, size)
+                self._loads += 1
+                self._evict_unlocked()
+            log.info("Collections: loaded '%s' (%.1f MB).", name, size / 1024 / 1024)
+            return store
+
+    def _evict_unlocked(self):
+        # The collection just loaded is last, so it is never evicted itself.
+        while len(self._loaded) > 1 and (
+            len(self._loaded) > self.max_loaded
+            or sum(size for _, size in self._loaded.values()) > self.max_loaded_bytes
+        ):
+            name, _ = self._loaded.popitem(last=False)
+            self._evictions += 1
+            log.info("Collections: evicted '%s'.", name)
+
+    # --- 2. Routing and fan-out search ---
+    def route(self, query: str, collections: list[str] = None) -> list[str]:
+        """The collections to search: the requested ones, those the question names, or all."""
+        requested = [name for name in collections or [] if name in self.keywords]
+        if requested:
+            return requested
+        words = set(_WORD_RE.findall(query.lower()))
+        matched = [name for name, keywords in self.keywords.items() if keywords & words]
+        with self._lock:
+            if matched:
+                self._routed += 1
+            else:
+                self._fanned_out += 1
+        return matched or self.names
+
+    def similarity_search_with_score(self, query: str, k: int = 4, collections: list[str] = None,
+                                     **kwargs) -> list[tuple[Document, float]]:
+        embedding = self._embeddings.embed_query(query)
+        names = self.route(query, collections)
+
+        def search(name: str) -> list[tuple[Document, float]]:
+            results = self._get(name).similarity_search_with_score_by_vector(embedding, k, **kwargs)
+            # Tagged copies: the collection's docstore may hand the same objects to concurrent queries.
+            return [(Document(page_content=doc.page_content, metadata={**doc.metadata, "collection": name}), score)
+                    for doc, score in results]
+
+        if len(names) == 1:
+            per_collection = [search(names[0])]
+        else:
+            per_collection = list(self._pool.map(search, names))
+        merged = sorted((result for results in per_collection for result in results), key=lambda r: r[1])
+        log.info("Collections: searched %d of %d (%s).", len(names), len(self.keywords), ", ".join(names[:5]))
+        return merged[:k]
+
+    def _select_relevance_score_fn(self):
+        # Every collection is a default FAISS index, i.e. Euclidean distance.
+        return self._euclidean_relevance_score_fn
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError("Collections are built by vector_builder; rebuild a collection to add documents.")
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError("Use get_or_create_collections to build collections.")
+
+    # --- 3. Metrics ---
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "collections": len(self.keywords),
+                "loaded": list(self._loaded),
+                "loaded_mb": round(sum(size for _, size in self._loaded.values()) / 1024 / 1024, 1),
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "routed_queries": self._routed,
+                "fanned_out_queries": self._fanned_out,
+            }
+
+
+def get_or_create_collections(config: dict, embeddings, vector_store_path: str) -> CollectionStore or None:
+    """
+    Builds any missing collection from its PDFs, then returns a CollectionStore
+    over every collection on disk. Nothing is loaded until it is searched.
+    """
+    collections_config = config.get('collections', {})
+    groups = collections_config.get('groups', {}) or {}
+    root = os.path.join(vector_store_path, COLLECTIONS_DIR)
+
+    pdf_path = os.path.join(PROJECT_ROOT, config['data']['pdf_path'])
+    pdf_files = sorted(f for f in os.listdir(pdf_path) if f.endswith('.pdf')) if os.path.isdir(pdf_path) else []
+    assignment = assign_collections(pdf_files, groups)
+
+    # Parent ids would collide across collections, so collections are built without parent documents.
+    build_config = {**config, 'retrieval': {**config.get('retrieval', {}), 'parent_document': {'enabled': False}}}
+    for name, files in assignment.items():
+        path = os.path.join(root, name)
+        if not index_exists(path):
+            print(f"Collection '{name}' not found. Building from {len(files)} PDF(s)...")
+            if build_vector_store(build_config, embeddings, path, files) is None:
+                print(f"WARNING: Collection '{name}' could not be built.")
+
+    names = sorted(d for d in os.listdir(root) if index_exists(os.path.join(root, d))
+                   and not d.endswith('.building')) if os.path.isdir(root) else []
+    if not names:
+        print("ERROR: No collections were found or built.")
+        return None
+    print(f"Found {len(names)} collections; they are loaded on first use.")
+    return CollectionStore(
+        root,
+        embeddings,
+        keywords={name: collection_keywords(name, groups.get(name, {}).get('keywords', [])) for name in names},
+        max_loaded=collections_config.get('max_loaded', 8),
+        max_loaded_mb=collections_config.get('max_loaded_mb', 1024),
+        max_workers=collections_config.get('max_workers', 4),
+        indexing_config=config.get('indexing', {}),
+    )
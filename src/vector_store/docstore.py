@@ -0,0 +1,197 @@
+# src/vector_store/docstore.py
+
+import sys
+import os
+import json
+import pickle
+import sqlite3
+import threading
+import logging
+import zstandard as zstd
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+log = logging.getLogger(__name__)
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+DOCSTORE_FILE = "docstore.sqlite"
+# Dictionary training uses at most this many chunks from the first batch written.
+DICTIONARY_SAMPLES = 2000
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    LangChain docstore backed by a SQLite file next to the FAISS index.
+
+    Chunks are written in batches as the index is built and read back one id
+    at a time, so neither the build nor a serving process holds every chunk's
+    text. With zstd compression, a dictionary is trained on the first batch
+    written and stored in the file; each chunk is compressed on its own, so a
+    lookup decompresses only the chunk asked for. Pickling (FAISS.save_local)
+    keeps only the file path, relative to the project root like the paths in
+    settings.yaml.
+    """
+
+    def __init__(self, path: str, compression: str = "zstd", level: int = 9, dictionary_kb: int = 64):
+        self.path = path
+        self.compression = compression
+        self.level = level
+        self.dictionary_kb = dictionary_kb
+        self._reset()
+
+    def _reset(self):
+        self._conn = None
+        self._lock = threading.Lock()
+        self._codec_ready = False
+        self._compressor = None
+        self._decompressor = None
+
+    # --- 1. Storage and codec (caller holds the lock) ---
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, text BLOB, metadata TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value BLOB)")
+            settings = dict(self._conn.execute("SELECT key, value FROM settings"))
+            if "compression" in settings:
+                self.compression = settings["compression"]
+                self._set_codec(settings.get("dictionary"))
+        return self._conn
+
+    def _set_codec(self, dictionary: bytes = None):
+        if self.compression == "zstd":
+            dict_data = zstd.ZstdCompressionDict(dictionary) if dictionary else None
+            self._compressor = zstd.ZstdCompressor(level=self.level, dict_data=dict_data)
+            self._decompressor = zstd.ZstdDecompressor(dict_data=dict_data)
+        self._codec_ready = True
+
+    def _start_codec(self, conn: sqlite3.Connection, texts: list[str]):
+        """Fixes the compression of a new file, training the dictionary on the first batch."""
+        dictionary = None
+        if self.compression == "zstd":
+            samples = [text.encode("utf-8") for text in texts[:DICTIONARY_SAMPLES]]
+            try:
+                dictionary = zstd.train_dictionary(self.dictionary_kb * 1024, samples).as_bytes()
+            except zstd.ZstdError as e:
+                log.info("Docstore: no zstd dictionary (%s); compressing chunks without one.", e)
+        conn.execute("INSERT OR REPLACE INTO settings VALUES ('compression', ?)", (self.compression,))
+        if dictionary:
+            conn.execute("INSERT OR REPLACE INTO settings VALUES ('dictionary', ?)", (dictionary,))
+        self._set_codec(dictionary)
+
+    def _encode(self, text: str) -> bytes:
+        data = text.encode("utf-8")
+        return self._compressor.compress(data) if self._compressor else data
+
+    def _decode(self, value) -> str:
+        if isinstance(value, str):
+            return value
+        return (self._decompressor.decompress(value) if self._decompressor else value).decode("utf-8")
+
+    # --- 2. Docstore interface ---
+    def add(self, texts: dict[str, Document]) -> None:
+        with self._lock:
+            conn = self._connection()
+            if not self._codec_ready:
+                self._start_codec(conn, [doc.page_content for doc in texts.values()])
+            rows = [(doc_id, self._encode(doc.page_content), json.dumps(doc.metadata, default=str))
+                    for doc_id, doc in texts.items()]
+            conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)", rows)
+            conn.commit()
+
+    def delete(self, ids: list) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.executemany("DELETE FROM chunks WHERE id = ?", [(doc_id,) for doc_id in ids])
+            conn.commit()
+
+    def search(self, search: str) -> Document or str:
+        with self._lock:
+            row = self._connection().execute("SELECT text, metadata FROM chunks WHERE id = ?", (search,)).fetchone()
+            if row is None:
+                return f"ID {search} not found."
+            text = self._decode(row[0])
+        return Document(page_content=text, metadata=json.loads(row[1]))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+        self._reset()
+
+    def relocate(self, vector_store_path: str):
+        """Closes the store and points it at the docstore file in another directory, e.g. where a build is moved."""
+        self.close()
+        self.path = os.path.join(vector_store_path, DOCSTORE_FILE)
+
+    def __getstate__(self) -> dict:
+        return {"path": os.path.relpath(self.path, PROJECT_ROOT), "level": self.level}
+
+    def __setstate__(self, state: dict):
+        self.path = os.path.join(PROJECT_ROOT, state["path"])
+        self.level = state.get("level", 9)
+        # Compression and dictionary are read from the file itself.
+        self.compression = "none"
+        self.dictionary_kb = 64
+        self._reset()
+
+
+def build_docstore(vector_store_path: str, config: dict) -> SQLiteDocstore:
+    """A new SQLite docstore in the vector store directory, from the `docstore` config section."""
+    docstore_config = config.get('docstore', {})
+    return SQLiteDocstore(
+        os.path.join(vector_store_path, DOCSTORE_FILE),
+        compression=docstore_config.get('compression', 'zstd'),
+        level=docstore_config.get('level', 9),
+        dictionary_kb=docstore_config.get('dictionary_kb', 64),
+    )
+
+
+def copy_to_sqlite(documents: dict[str, Document], vector_store_path: str, config: dict,
+                   batch_size: int = DICTIONARY_SAMPLES) -> SQLiteDocstore:
+    """Writes id -> Document pairs (e.g. an InMemoryDocstore's contents) to a new SQLite docstore."""
+    docstore = build_docstore(vector_store_path, config)
+    items = list(documents.items())
+    for start in range(0, len(items), batch_size):
+        docstore.add(dict(items[start:start + batch_size]))
+    return docstore
+
+
+def convert_vector_store(vector_store_path: str, config: dict):
+    """Moves the chunks of a saved index's pickled in-memory docstore into a compressed SQLite docstore."""
+    pickle_path = os.path.join(vector_store_path, "index.pkl")
+    with open(pickle_path, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    if isinstance(docstore, SQLiteDocstore):
+        print(f"{vector_store_path} already uses a SQLite docstore.")
+        return
+    before = os.path.getsize(pickle_path)
+    sqlite_docstore = copy_to_sqlite(docstore._dict, vector_store_path, config)
+    sqlite_docstore.close()
+    with open(pickle_path, "wb") as f:
+        pickle.dump((sqlite_docstore, index_to_docstore_id), f)
+    after = os.path.getsize(os.path.join(vector_store_path, DOCSTORE_FILE))
+    print(f"Converted {len(docstore._dict)} chunks: pickled docstore {before / 1024 / 1024:.1f} MB -> "
+          f"{after / 1024 / 1024:.1f} MB SQLite ({sqlite_docstore.compression}).")
+
+
+# This block converts the configured (already built) index from the command line
+if __name__ == '__main__':
+    from src.core.registry import load_config
+
+    main_config = load_config()
+    root_path = os.path.join(PROJECT_ROOT, main_config['data']['vector_store_path'])
+    collections_path = os.path.join(root_path, "collections")
+    if os.path.isdir(collections_path):
+        for name in sorted(os.listdir(collections_path)):
+            convert_vector_store(os.path.join(collections_path, name), main_config)
+    else:
+        convert_vector_store(root_path, main_config)
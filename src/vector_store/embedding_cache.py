@@ -0,0 +1,180 @@
+# src/vector_store/embedding_cache.py
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from array import array
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings
+
+log = logging.getLogger(__name__)
+
+# --- DEFINE PROJECT ROOT for reliable file paths ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalizes a user question so trivially different spellings of the same
+    question ("How to book?" / "how to  book") share one cache entry.
+    """
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model with a normalized-query -> vector cache.
+
+    Only `embed_query` is cached; document embedding during ingestion is passed
+    straight through. The cache is an in-memory LRU with a TTL, optionally
+    backed by a SQLite file so vectors survive restarts.
+    """
+
+    def __init__(self, underlying: Embeddings, max_size: int = 1024, ttl_seconds: float = 86400,
+                 persist_path: str = None, namespace: str = ""):
+        self.underlying = underlying
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._memory = OrderedDict()  # key -> (created_at, vector)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._db = None
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "namespace TEXT, query TEXT, created_at REAL, vector BLOB, "
+                "PRIMARY KEY (namespace, query))"
+            )
+            self._db.commit()
+
+    # --- 1. Embeddings interface ---
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = normalize_query(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            log.info("Query embedding cache hit %s", self.stats())
+            return vector
+        vector = self.underlying.embed_query(text)
+        self._store(key, vector)
+        log.info("Query embedding cache miss %s", self.stats())
+        return vector
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.underlying.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = normalize_query(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            log.info("Query embedding cache hit %s", self.stats())
+            return vector
+        vector = await self.underlying.aembed_query(text)
+        self._store(key, vector)
+        log.info("Query embedding cache miss %s", self.stats())
+        return vector
+
+    # --- 2. Cache tiers ---
+    def _lookup(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, vector = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._hits += 1
+                    return list(vector)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created_at, vector FROM query_embeddings WHERE namespace = ? AND query = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is not None:
+                    created_at, blob = row
+                    if now - created_at <= self.ttl_seconds:
+                        vector = array('f')
+                        vector.frombytes(blob)
+                        self._put_memory(key, created_at, vector)
+                        self._hits += 1
+                        self._persistent_hits += 1
+                        return list(vector)
+                    self._db.execute(
+                        "DELETE FROM query_embeddings WHERE namespace = ? AND query = ?",
+                        (self.namespace, key),
+                    )
+                    self._db.commit()
+
+            self._misses += 1
+            return None
+
+    def _store(self, key: str, vector: list[float]):
+        created_at = time.time()
+        packed = array('f', vector)
+        with self._lock:
+            self._put_memory(key, created_at, packed)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (namespace, query, created_at, vector) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, created_at, packed.tobytes()),
+                )
+                self._db.commit()
+
+    def _put_memory(self, key: str, created_at: float, vector: array):
+        # Caller holds the lock.
+        self._memory[key] = (created_at, vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    # --- 3. Metrics ---
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._memory),
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def build_cached_embeddings(embeddings: Embeddings, config: dict) -> Embeddings:
+    """
+    Wraps `embeddings` in a CachedEmbeddings according to the `cache.embeddings`
+    section of the config. Returns the model unchanged if caching is disabled.
+    """
+    cache_config = config.get('cache', {}).get('embeddings', {})
+    if not cache_config.get('enabled', True):
+        return embeddings
+
+    persist_path = cache_config.get('persist_path')
+    if persist_path:
+        persist_path = os.path.join(PROJECT_ROOT, persist_path)
+
+    log.info("Query embedding cache enabled (persistent tier: %s).", persist_path or "off")
+    return CachedEmbeddings(
+        embeddings,
+        max_size=cache_config.get('max_size', 1024),
+        ttl_seconds=cache_config.get('ttl_seconds', 86400),
+        persist_path=persist_path,
+        namespace=config['gemini']['embedding_model'],
+    )
@@ -0,0 +1,184 @@
+# src/vector_store/figure_index.py
+
+import sys
+import os
+import io
+import re
+import json
+import struct
+import logging
+from collections import defaultdict
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+log = logging.getLogger(__name__)
+
+# partition_pdf(extract_images_in_pdf=True) writes figures/figure-<page>-<n>.jpg
+FIGURE_RE = re.compile(r"^figure-(\d+)-(\d+)\.jpe?g$", re.IGNORECASE)
+# The pack ends with the byte offset of its JSON index.
+_FOOTER = struct.Struct("<Q")
+
+
+def _figure_files(figures_path: str) -> list[tuple[int, int, str]]:
+    """(page, n, file name) of every extracted figure, in page order."""
+    if not os.path.isdir(figures_path):
+        return []
+    files = [(int(m.group(1)), int(m.group(2)), name) for name in os.listdir(figures_path)
+             if (m := FIGURE_RE.match(name))]
+    return sorted(files)
+
+
+def _signature(figures_path: str, files: list) -> list:
+    """Changes whenever a figure is added, removed or rewritten."""
+    mtimes = [os.path.getmtime(os.path.join(figures_path, name)) for _, _, name in files]
+    return [len(files), round(max(mtimes), 3) if mtimes else 0]
+
+
+def build_figure_pack(figures_path: str, pack_path: str, thumbnail_px: int = 160, quality: int = 70) -> int:
+    """
+    Writes a JPEG thumbnail (longest side `thumbnail_px`) of every figure into
+    one packed file: the thumbnails back to back, then a JSON index of
+    name -> page, offset, length and full-size dimensions. Returns the number
+    of figures packed.
+    """
+    from PIL import Image
+
+    files = _figure_files(figures_path)
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+    figures = {}
+    temp_path = pack_path + ".tmp"
+    with open(temp_path, "wb") as pack:
+        for page, n, name in files:
+            try:
+                with Image.open(os.path.join(figures_path, name)) as image:
+                    size = image.size
+                    image = image.convert("RGB")
+                    image.thumbnail((thumbnail_px, thumbnail_px))
+                    buffer = io.BytesIO()
+                    image.save(buffer, "JPEG", quality=quality, optimize=True)
+            except OSError as e:
+                log.warning("Figure index: skipping unreadable %s (%s).", name, e)
+                continue
+            data = buffer.getvalue()
+            figures[name] = [page, n, pack.tell(), len(data), size[0], size[1]]
+            pack.write(data)
+        index_offset = pack.tell()
+        pack.write(json.dumps({"signature": _signature(figures_path, files), "thumbnail_px": thumbnail_px,
+                               "figures": figures}).encode("utf-8"))
+        pack.write(_FOOTER.pack(index_offset))
+    os.replace(temp_path, pack_path)
+    print(f"Figure index: packed {len(figures)} thumbnails into {pack_path} "
+          f"({os.path.getsize(pack_path) / 1024:.0f} KB).")
+    return len(figures)
+
+
+class FigureIndex:
+    """
+    Page -> figures lookup over the thumbnail pack. Only the small JSON index
+    is held in memory; a thumbnail is read from the pack when it is asked for,
+    and the full-size image is only ever read from `figures_path`.
+    """
+
+    def __init__(self, pack_path: str, figures_path: str):
+        self.pack_path = pack_path
+        self.figures_path = figures_path
+        with open(pack_path, "rb") as pack:
+            pack.seek(-_FOOTER.size, os.SEEK_END)
+            end = pack.tell()
+            (index_offset,) = _FOOTER.unpack(pack.read(_FOOTER.size))
+            pack.seek(index_offset)
+            index = json.loads(pack.read(end - index_offset))
+        self.signature = index["signature"]
+        self.figures = index["figures"]
+        self.by_page = defaultdict(list)
+        for name, (page, n, *_) in sorted(self.figures.items(), key=lambda item: item[1][:2]):
+            self.by_page[page].append(name)
+
+    @classmethod
+    def open_or_build(cls, figures_path: str, pack_path: str, thumbnail_px: int = 160) -> "FigureIndex" or None:
+        """Opens the pack, (re)building it first if the figures folder changed; None if there are no figures."""
+        files = _figure_files(figures_path)
+        if not files:
+            return None
+        stale = True
+        if os.path.exists(pack_path):
+            try:
+                index = cls(pack_path, figures_path)
+                stale = index.signature != _signature(figures_path, files)
+            except (OSError, ValueError, struct.error) as e:
+                log.warning("Figure index: unreadable pack %s (%s); rebuilding.", pack_path, e)
+        if stale:
+            try:
+                build_figure_pack(figures_path, pack_path, thumbnail_px)
+            except ImportError:
+                log.warning("Figure index: Pillow is not installed; figures are not shown with answers.")
+                return None
+        return cls(pack_path, figures_path)
+
+    def describe(self, name: str) -> dict:
+        page, n, _, _, width, height = self.figures[name]
+        return {"name": name, "page": page, "width": width, "height": height}
+
+    def for_documents(self, docs: list, limit: int = 6, sources: list[str] = None,
+                      min_side_px: int = 0) -> list[dict]:
+        """
+        The figures on the pages of `docs` (in their order), at most `limit`.
+        With `sources`, only documents from those manuals contribute pages.
+        Figures whose shorter side is below `min_side_px` (logos, rules,
+        icons) are left out.
+        """
+        found = []
+        for doc in docs:
+            if sources and doc.metadata.get("source") not in sources:
+                continue
+            page = doc.metadata.get("page")
+            if page is None:
+                continue
+            for number in range(page, (doc.metadata.get("page_end") or page) + 1):
+                for name in self.by_page.get(number, ()):
+                    if min(self.figures[name][4:6]) < min_side_px:
+                        continue
+                    if not any(figure["name"] == name for figure in found):
+                        found.append(self.describe(name))
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def thumbnail(self, name: str) -> bytes:
+        """The packed JPEG thumbnail of a figure."""
+        _, _, offset, length, _, _ = self.figures[name]
+        with open(self.pack_path, "rb") as pack:
+            pack.seek(offset)
+            return pack.read(length)
+
+    def full_path(self, name: str) -> str:
+        """Path of the full-size figure; only names from the index are accepted."""
+        if name not in self.figures:
+            raise KeyError(name)
+        return os.path.join(self.figures_path, name)
+
+
+def load_figure_index(config: dict) -> FigureIndex or None:
+    """The figure index described by the `figures` config section, or None if disabled or empty."""
+    figures_config = config.get('figures', {})
+    if not figures_config.get('enabled', True):
+        return None
+    return FigureIndex.open_or_build(
+        os.path.join(PROJECT_ROOT, figures_config.get('path', 'figures')),
+        os.path.join(PROJECT_ROOT, figures_config.get('pack_path', 'vector_store/figures.pack')),
+        figures_config.get('thumbnail_px', 160),
+    )
+
+
+# This block (re)builds the thumbnail pack from the command line
+if __name__ == '__main__':
+    from src.core.registry import load_config
+
+    main_config = load_config().get('figures', {})
+    build_figure_pack(
+        os.path.join(PROJECT_ROOT, main_config.get('path', 'figures')),
+        os.path.join(PROJECT_ROOT, main_config.get('pack_path', 'vector_store/figures.pack')),
+        main_config.get('thumbnail_px', 160),
+    )
@@ -0,0 +1,208 @@
+# src/vector_store/heading_index.py
+
+import sys
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+import logging
+from collections import defaultdict
+from langchain_core.documents import Document
+from thefuzz import fuzz
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.vector_store.parent_store import HEADING_RE, split_sections
+from src.vector_store.metadata_index import ChunkAnnotator
+
+log = logging.getLogger(__name__)
+
+HEADINGS_FILE = "headings.sqlite"
+
+# Leading numbering such as "3.", "4.2.1", "chapter 5:" or "section iv -".
+_NUMBERING_RE = re.compile(r"^(?:(?:chapter|section|part)\s+)?(?:\d+(?:\.\d+)*|[ivxlc]+)\s*[.:)\-]?\s+")
+# Question phrasing around a section name: "what are the refund rules?" -> "refund rules".
+_FILLER_RE = re.compile(
+    r"^(?:(?:please\s+)?(?:tell me about|show me|show|explain|describe|details of|info on|information on|"
+    r"what (?:is|are)|how (?:to|do i|can i))\s+)?(?:the\s+)?"
+)
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(text: str, strip_filler: bool = False) -> str:
+    """Lowercase, accent-free, punctuation-free title without leading numbering."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower().strip()
+    text = _NUMBERING_RE.sub("", text)
+    if strip_filler:
+        text = _FILLER_RE.sub("", text)
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def title_score(query: str, title: str) -> int:
+    """0-100 similarity that tolerates word order ("rules refund") and spacing ("eticket" vs "e ticket")."""
+    return max(fuzz.token_sort_ratio(query, title), fuzz.ratio(query.replace(" ", ""), title.replace(" ", "")))
+
+
+# --- 1. Writing headings at build time ---
+class HeadingWriter:
+    """
+    Records every titled section of the documents being indexed: its title,
+    normalized title, source, pages, the section's span in the loaded
+    document and the section body. Written next to the FAISS index.
+    """
+
+    def __init__(self, vector_store_path: str):
+        os.makedirs(vector_store_path, exist_ok=True)
+        self.path = os.path.join(vector_store_path, HEADINGS_FILE)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("CREATE TABLE headings (id INTEGER PRIMARY KEY, title TEXT, normalized TEXT, source TEXT, "
+                           "page INTEGER, page_end INTEGER, start INTEGER, end INTEGER, body TEXT)")
+        self.count = 0
+
+    def add(self, document: Document):
+        annotator = ChunkAnnotator(document)
+        rows = []
+        for section in split_sections(document):
+            title = section.metadata["section"]
+            normalized = normalize_title(title)
+            if not normalized:
+                continue
+            start = section.metadata["start_index"]
+            metadata = annotator.annotate(section, start).metadata
+            body = HEADING_RE.sub("", section.page_content, count=1).strip()
+            rows.append((title, normalized, metadata.get("source"), metadata.get("page"), metadata.get("page_end"),
+                         start, start + len(section.page_content), body))
+        self._conn.executemany("INSERT INTO headings (title, normalized, source, page, page_end, start, end, body) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.count += len(rows)
+
+    def close(self):
+        self._conn.execute("CREATE INDEX idx_normalized ON headings (normalized)")
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- 2. Lookup ---
+class HeadingIndex:
+    """
+    In-memory trigram index over the section titles of one or more heading
+    files (the index itself, or each collection). Only titles are held in
+    memory; a section body is read from its file when it is returned.
+    """
+
+    def __init__(self, paths: list[str]):
+        self._conns = [sqlite3.connect(path, check_same_thread=False) for path in paths]
+        self._lock = threading.Lock()
+        self.entries = []  # (normalized, title, source, page, file number, row id)
+        self.by_title = defaultdict(list)
+        self.postings = defaultdict(list)  # trigram -> normalized titles
+        for file_number, conn in enumerate(self._conns):
+            for row_id, title, normalized, source, page in conn.execute(
+                    "SELECT id, title, normalized, source, page FROM headings"):
+                entry_id = len(self.entries)
+                self.entries.append((normalized, title, source, page, file_number, row_id))
+                self.by_title[normalized].append(entry_id)
+        for normalized in self.by_title:
+            for gram in trigrams(normalized):
+                self.postings[gram].append(normalized)
+        log.info("Heading index: %d sections (%d distinct titles) from %d file(s).",
+                 len(self.entries), len(self.by_title), len(paths))
+
+    @classmethod
+    def open(cls, vector_store_path: str) -> "HeadingIndex" or None:
+        """The heading index of a built index (or of all its collections); None if none was recorded."""
+        paths = [os.path.join(vector_store_path, HEADINGS_FILE)]
+        collections_path = os.path.join(vector_store_path, "collections")
+        if os.path.isdir(collections_path):
+            paths += [os.path.join(collections_path, name, HEADINGS_FILE) for name in sorted(os.listdir(collections_path))]
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            log.info("Heading index: no %s found; rebuild the index or run heading_index.py to enable section answers.",
+                     HEADINGS_FILE)
+            return None
+        return cls(paths)
+
+    def candidates(self, query: str, limit: int = 5) -> list[tuple[str, float]]:
+        """Distinct normalized titles sharing the most trigrams with the query (Dice coefficient)."""
+        query_grams = trigrams(query)
+        overlap = defaultdict(int)
+        for gram in query_grams:
+            for title in self.postings.get(gram, ()):
+                overlap[title] += 1
+        scored = [(title, 2 * count / (len(query_grams) + len(trigrams(title)))) for title, count in overlap.items()]
+        return sorted(scored, key=lambda item: item[1], reverse=True)[:limit]
+
+    def search(self, query: str, sources: list[str] = None, limit: int = 5) -> list[dict]:
+        """
+        Sections whose title best matches `query`, best first, each with a 0-100
+        `score`. Exact normalized titles score 100; others are shortlisted by
+        trigrams and scored with `title_score`.
+        """
+        normalized = normalize_title(query, strip_filler=True)
+        if not normalized:
+            return []
+        if normalized in self.by_title:
+            titles = [(normalized, 100)]
+        else:
+            titles = [(title, title_score(normalized, title)) for title, _ in self.candidates(normalized)]
+        results = []
+        for title, score in sorted(titles, key=lambda item: item[1], reverse=True):
+            for entry_id in self.by_title[title]:
+                _, original, source, page, file_number, row_id = self.entries[entry_id]
+                if sources and source not in sources:
+                    continue
+                results.append({"title": original, "source": source, "page": page, "score": score,
+                                "file": file_number, "id": row_id})
+        return results[:limit]
+
+    def section(self, match: dict) -> dict:
+        """A search result with its section body, page range and span."""
+        with self._lock:
+            page_end, start, end, body = self._conns[match["file"]].execute(
+                "SELECT page_end, start, end, body FROM headings WHERE id = ?", (match["id"],)).fetchone()
+        return {**match, "page_end": page_end, "start": start, "end": end, "body": body}
+
+
+def write_headings(documents, vector_store_path: str) -> int:
+    """Records the headings of `documents` (any iterable) next to an index; returns the number of sections."""
+    with HeadingWriter(vector_store_path) as writer:
+        for document in documents:
+            writer.add(document)
+    print(f"Heading index: {writer.count} titled sections recorded.")
+    return writer.count
+
+
+# This block records the headings of an already built index without re-embedding anything
+if __name__ == '__main__':
+    from src.core.registry import load_config
+    from src.ingestion.pdf_loader import iter_pdf_documents
+
+    main_config = load_config()
+    pdf_folder = os.path.join(PROJECT_ROOT, main_config['data']['pdf_path'])
+    root_path = os.path.join(PROJECT_ROOT, main_config['data']['vector_store_path'])
+    if main_config.get('collections', {}).get('enabled', False):
+        from src.vector_store.collection_store import COLLECTIONS_DIR, assign_collections
+
+        pdf_files = sorted(f for f in os.listdir(pdf_folder) if f.endswith('.pdf'))
+        groups = main_config['collections'].get('groups', {}) or {}
+        for name, files in assign_collections(pdf_files, groups).items():
+            write_headings(iter_pdf_documents(pdf_folder, main_config, files),
+                           os.path.join(root_path, COLLECTIONS_DIR, name))
+    else:
+        write_headings(iter_pdf_documents(pdf_folder, main_config), root_path)
@@ -0,0 +1,187 @@
+# src/vector_store/metadata_index.py
+
+import os
+import json
+import bisect
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+import numpy as np
+from langchain_core.documents import Document
+
+from src.vector_store.parent_store import HEADING_RE
+
+log = logging.getLogger(__name__)
+
+METADATA_INDEX_FILE = "metadata.sqlite"
+FILTER_KEYS = {"source", "pages", "section", "element_type"}
+ELEMENT_TYPES = {"text", "table", "image"}
+
+
+# --- 1. Chunk annotation at build time ---
+def element_type(text: str) -> str:
+    """The kind of content a chunk mostly carries, from the loader's markers."""
+    if "--- TABLE START ---" in text:
+        return "table"
+    if "[Image Description:" in text:
+        return "image"
+    return "text"
+
+
+class ChunkAnnotator:
+    """
+    Tags the chunks of one loaded document with their page range, section
+    title and element type. Pages come from the loader's `page_starts`
+    (character offset -> page number), which is removed from chunk metadata
+    along with the loader's `tables`.
+    """
+
+    def __init__(self, document: Document):
+        self.page_starts = document.metadata.get("page_starts") or []
+        self.page_offsets = [offset for offset, _ in self.page_starts]
+        self.headings = [(m.start(), m.group(1).strip()) for m in HEADING_RE.finditer(document.page_content)]
+        self.heading_offsets = [offset for offset, _ in self.headings]
+
+    def _page_at(self, offset: int) -> int:
+        return self.page_starts[max(0, bisect.bisect_right(self.page_offsets, offset) - 1)][1]
+
+    def annotate(self, chunk: Document, start: int) -> Document:
+        chunk.metadata.pop("page_starts", None)
+        chunk.metadata.pop("tables", None)
+        if self.page_starts:
+            chunk.metadata["page"] = self._page_at(start)
+            chunk.metadata["page_end"] = self._page_at(start + max(0, len(chunk.page_content) - 1))
+        if "section" not in chunk.metadata and self.headings:
+            position = bisect.bisect_right(self.heading_offsets, start) - 1
+            chunk.metadata["section"] = self.headings[position][1] if position >= 0 else ""
+        chunk.metadata["element_type"] = element_type(chunk.page_content)
+        return chunk
+
+
+# --- 2. Filter validation ---
+def validate_filters(filters: dict) -> dict:
+    """
+    Checks a metadata filter: {"source": name or [names], "pages": [first, last],
+    "section": text contained in the title, "element_type": "text" | "table" |
+    "image" or a list}. Raises ValueError.
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("'filters' must be an object.")
+    unknown = set(filters) - FILTER_KEYS
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}. Use {', '.join(sorted(FILTER_KEYS))}.")
+    for key in ("source", "element_type"):
+        value = filters.get(key)
+        if value is not None and not (isinstance(value, str) or isinstance(value, (list, tuple))
+                                      and all(isinstance(item, str) for item in value)):
+            raise ValueError(f"'{key}' must be a string or a list of strings.")
+    if filters.get("section") is not None and not isinstance(filters["section"], str):
+        raise ValueError("'section' must be a string.")
+    pages = filters.get("pages")
+    if pages is not None and not (isinstance(pages, (list, tuple)) and len(pages) == 2
+                                  and all(isinstance(p, int) and not isinstance(p, bool) for p in pages)
+                                  and pages[0] <= pages[1]):
+        raise ValueError("'pages' must be [first, last] with first <= last.")
+    types = filters.get("element_type")
+    if types is not None and not set(_as_list(types)) <= ELEMENT_TYPES:
+        raise ValueError(f"'element_type' must be one of {', '.join(sorted(ELEMENT_TYPES))}.")
+    return filters
+
+
+def _as_list(value) -> list:
+    return [value] if isinstance(value, str) else list(value)
+
+
+# --- 3. The index ---
+class MetadataIndex:
+    """
+    SQLite index of chunk metadata keyed by FAISS position, saved next to the
+    index. `select` turns a filter into the matching positions, so a filtered
+    search runs over that subset only instead of over-fetching and dropping
+    results. Recent selections are cached.
+    """
+
+    def __init__(self, path: str, cache_size: int = 256):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    @classmethod
+    def create(cls, vector_store, vector_store_path: str) -> "MetadataIndex":
+        """Builds the index from a vector store's docstore (one pass over its chunks)."""
+        path = os.path.join(vector_store_path, METADATA_INDEX_FILE)
+        temp_path = path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        conn = sqlite3.connect(temp_path)
+        conn.execute("CREATE TABLE chunks (position INTEGER PRIMARY KEY, source TEXT, page INTEGER, "
+                     "page_end INTEGER, section TEXT, element_type TEXT)")
+        rows = []
+        for position, doc_id in vector_store.index_to_docstore_id.items():
+            metadata = vector_store.docstore.search(doc_id).metadata
+            rows.append((position, metadata.get("source"), metadata.get("page"), metadata.get("page_end"),
+                         (metadata.get("section") or "").lower(), metadata.get("element_type", "text")))
+            if len(rows) >= 10000:
+                conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)", rows)
+                rows = []
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)", rows)
+        for column in ("source", "page", "section", "element_type"):
+            conn.execute(f"CREATE INDEX idx_{column} ON chunks ({column})")
+        conn.commit()
+        conn.close()
+        os.replace(temp_path, path)
+        log.info("Metadata index: built for %d chunks at %s.", len(vector_store.index_to_docstore_id), path)
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, vector_store, vector_store_path: str) -> "MetadataIndex":
+        path = os.path.join(vector_store_path, METADATA_INDEX_FILE)
+        if os.path.exists(path):
+            return cls(path)
+        return cls.create(vector_store, vector_store_path)
+
+    def select(self, filters: dict) -> np.ndarray:
+        """Sorted FAISS positions of the chunks matching `filters`."""
+        validate_filters(filters)
+        key = json.dumps(filters, sort_keys=True)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        clauses, params = [], []
+        if filters.get("source"):
+            sources = _as_list(filters["source"])
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        if filters.get("pages"):
+            first, last = filters["pages"]
+            clauses.append("page <= ? AND page_end >= ?")
+            params.extend([last, first])
+        if filters.get("section"):
+            clauses.append("section LIKE ?")
+            params.append(f"%{filters['section'].lower()}%")
+        if filters.get("element_type"):
+            types = _as_list(filters["element_type"])
+            clauses.append(f"element_type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        query = "SELECT position FROM chunks" + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY position"
+
+        with self._lock:
+            positions = np.array([row[0] for row in self._conn.execute(query, params)], dtype=np.int64)
+            self._cache[key] = positions
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        log.info("Metadata filter %s matched %d chunks.", key, len(positions))
+        return positions
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def sources(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT source FROM chunks ORDER BY source")]
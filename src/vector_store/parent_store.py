@@ -0,0 +1,117 @@
+# src/vector_store/parent_store.py
+
+import os
+import re
+import gzip
+import json
+import logging
+from langchain_core.documents import Document
+
+log = logging.getLogger(__name__)
+
+PARENTS_FILE = "parents.json.gz"
+
+# The PDF loader writes every Title element as a "## Title" line.
+HEADING_RE = re.compile(r"^## (.+)$", re.MULTILINE)
+
+
+def split_sections(document: Document) -> list[Document]:
+    """
+    Splits a loaded document into sections at the loader's `## Title` lines.
+    Text before the first heading becomes an untitled section. Each section's
+    `start_index` is its offset in the document.
+    """
+    text = document.page_content
+    starts = [m.start() for m in HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts = [0] + starts
+
+    sections = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        body = text[start:end].strip()
+        if not body:
+            continue
+        heading = HEADING_RE.match(body)
+        sections.append(Document(
+            page_content=body,
+            metadata={**document.metadata, "section": heading.group(1).strip() if heading else "",
+                      "start_index": start + len(text[start:end]) - len(text[start:end].lstrip())},
+        ))
+    return sections
+
+
+def save_parents(parents: list[Document], vector_store_path: str):
+    """
+    Writes parent sections as one gzipped JSON file. Child chunks only carry the
+    integer `parent_id`, so the FAISS docstore does not grow.
+    """
+    with ParentWriter(vector_store_path) as writer:
+        for parent in parents:
+            writer.add(parent)
+
+
+class ParentWriter:
+    """
+    Streams parent sections into the parents file one at a time, so a large
+    build never holds all of them. `add` returns the new section's parent_id.
+    The source list is written last; JSON key order does not matter to readers.
+    """
+
+    def __init__(self, vector_store_path: str):
+        os.makedirs(vector_store_path, exist_ok=True)
+        self._file = gzip.open(os.path.join(vector_store_path, PARENTS_FILE), "wt", encoding="utf-8")
+        self._file.write('{"parents":[')
+        self._source_ids = {}
+        self.count = 0
+
+    def add(self, parent: Document) -> int:
+        source = parent.metadata.get("source", "Unknown")
+        source_id = self._source_ids.setdefault(source, len(self._source_ids))
+        row = [source_id, parent.metadata.get("section", ""), parent.page_content]
+        if parent.metadata.get("page") is not None:
+            row += [parent.metadata["page"], parent.metadata.get("page_end", parent.metadata["page"])]
+        self._file.write(("," if self.count else "") + json.dumps(row, separators=(",", ":")))
+        self.count += 1
+        return self.count - 1
+
+    def close(self):
+        sources = sorted(self._source_ids, key=self._source_ids.get)
+        self._file.write('],"sources":' + json.dumps(sources, separators=(",", ":")) + "}")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParentStore:
+    """
+    Read-only access to the parent sections saved next to the FAISS index.
+    The file is only read on first use.
+    """
+
+    def __init__(self, vector_store_path: str):
+        self.path = os.path.join(vector_store_path, PARENTS_FILE)
+        self._sources = None
+        self._parents = None
+
+    @staticmethod
+    def exists(vector_store_path: str) -> bool:
+        return os.path.exists(os.path.join(vector_store_path, PARENTS_FILE))
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        self._sources, self._parents = payload["sources"], payload["parents"]
+        log.info("Parent store: loaded %d sections from %s.", len(self._parents), self.path)
+
+    def get(self, parent_id: int) -> Document:
+        if self._parents is None:
+            self._load()
+        source_id, section, text, *pages = self._parents[parent_id]
+        metadata = {"source": self._sources[source_id], "section": section, "parent_id": parent_id}
+        if pages:
+            metadata["page"], metadata["page_end"] = pages
+        return Document(page_content=text, metadata=metadata)
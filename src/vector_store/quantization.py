@@ -0,0 +1,170 @@
+# src/vector_store/quantization.py
+
+import os
+import logging
+import numpy as np
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+
+from src.vector_store.metadata_index import MetadataIndex
+
+log = logging.getLogger(__name__)
+
+# `indexing.quantization` values -> FAISS scalar quantizer types (2x and 4x smaller than float32).
+QUANTIZATION_TYPES = {"fp16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}
+RERANK_VECTORS_FILE = "vectors.f32.npy"
+
+
+def make_index(dim: int, indexing_config: dict, nlist: int = None) -> faiss.Index:
+    """
+    An empty L2 index for the configured quantization: flat, or IVF with
+    `nlist` lists. Quantized indexes must be trained before vectors are added.
+    """
+    qtype = QUANTIZATION_TYPES.get(indexing_config.get('quantization', 'none'))
+    if nlist:
+        quantizer = faiss.IndexFlatL2(dim)
+        if qtype is None:
+            return faiss.IndexIVFFlat(quantizer, dim, nlist)
+        return faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, qtype, faiss.METRIC_L2)
+    if qtype is None:
+        return faiss.IndexFlatL2(dim)
+    return faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_L2)
+
+
+def keeps_rerank_vectors(indexing_config: dict) -> bool:
+    return indexing_config.get('quantization', 'none') in QUANTIZATION_TYPES and \
+        indexing_config.get('rerank_float32', True)
+
+
+def quantize_vector_store(vector_store: FAISS, indexing_config: dict, vector_store_path: str) -> FAISS:
+    """
+    Replaces a freshly built flat float32 index with the configured scalar
+    quantized one. With `rerank_float32`, the float32 vectors are saved next to
+    the index (on disk only) for re-ranking.
+    """
+    if indexing_config.get('quantization', 'none') not in QUANTIZATION_TYPES:
+        return vector_store
+    vectors = vector_store.index.reconstruct_n(0, vector_store.index.ntotal)
+    index = make_index(vectors.shape[1], indexing_config)
+    index.train(vectors)
+    index.add(vectors)
+    vector_store.index = index
+    if keeps_rerank_vectors(indexing_config):
+        os.makedirs(vector_store_path, exist_ok=True)
+        np.save(os.path.join(vector_store_path, RERANK_VECTORS_FILE), vectors)
+        if isinstance(vector_store, QuantizedFAISS):
+            vector_store.attach_rerank_vectors(vector_store_path, indexing_config.get('rerank_factor', 4))
+    print(f"Quantized index to {indexing_config['quantization']} ({vectors.nbytes / 1024 / 1024:.1f} MB of float32 vectors).")
+    return vector_store
+
+
+class QuantizedFAISS(FAISS):
+    """
+    FAISS store whose index may hold fp16 / int8 vectors. When float32 copies
+    are saved next to the index, a search shortlists `rerank_factor * k`
+    candidates from the compact index and reorders them by exact distance,
+    reading only those rows from a memory-mapped file.
+
+    Searches also accept `filters` (see metadata_index.validate_filters): the
+    metadata index turns them into FAISS positions and the index search is
+    restricted to those through an ID selector (or, on an IVF index, searched
+    exactly when there are at most `exact_filter_max` of them).
+    """
+    rerank_vectors = None
+    rerank_factor = 4
+    metadata_index = None
+    exact_filter_max = 20000
+
+    def attach_rerank_vectors(self, vector_store_path: str, rerank_factor: int = 4):
+        path = os.path.join(vector_store_path, RERANK_VECTORS_FILE)
+        if os.path.exists(path):
+            self.rerank_vectors = np.load(path, mmap_mode='r')
+            self.rerank_factor = rerank_factor
+
+    def _search(self, query: np.ndarray, n: int, positions: np.ndarray = None):
+        if positions is None:
+            return self.index.search(query, n)
+        selector = faiss.IDSelectorBatch(positions)
+        if not isinstance(self.index, faiss.IndexIVF):
+            return self.index.search(query, n, params=faiss.SearchParameters(sel=selector))
+
+        # An IVF search only sees the selected chunks inside its `nprobe` lists, so a narrow
+        # filter would return fewer than n hits: small subsets are searched exactly, larger
+        # ones with more lists, and with all of them if that still comes up short.
+        vectors = self._subset_vectors(positions)
+        if vectors is not None:
+            distances = ((vectors - query) ** 2).sum(axis=1)
+            top = np.argsort(distances, kind="stable")[:n]
+            return distances[top][None, :], positions[top][None, :]
+        nprobe = min(self.index.nlist, self.index.nprobe * max(1, self.index.ntotal // len(positions)))
+        distances, indices = self.index.search(query, n, params=faiss.SearchParametersIVF(sel=selector, nprobe=nprobe))
+        if nprobe < self.index.nlist and (indices[0] != -1).sum() < min(n, len(positions)):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nlist)
+            distances, indices = self.index.search(query, n, params=params)
+        return distances, indices
+
+    def _subset_vectors(self, positions: np.ndarray) -> np.ndarray or None:
+        """Float32 vectors of a filtered subset small enough to search exactly, else None."""
+        if len(positions) > self.exact_filter_max:
+            return None
+        if self.rerank_vectors is not None:
+            return np.asarray(self.rerank_vectors[positions], dtype=np.float32)
+        if self.index.direct_map.type != faiss.DirectMap.NoMap:
+            return self.index.reconstruct_batch(positions)
+        return None
+
+    def similarity_search_with_score_by_vector(self, embedding: list[float], k: int = 4, filter=None,
+                                               fetch_k: int = 20, filters: dict = None,
+                                               **kwargs) -> list[tuple[Document, float]]:
+        positions = None
+        if filters:
+            if self.metadata_index is None:
+                raise ValueError("This index has no metadata index; filters are not supported.")
+            positions = self.metadata_index.select(filters)
+            if not len(positions):
+                return []
+        if (self.rerank_vectors is None and positions is None) or filter is not None or \
+                self.distance_strategy != DistanceStrategy.EUCLIDEAN_DISTANCE:
+            return super().similarity_search_with_score_by_vector(embedding, k, filter=filter, fetch_k=fetch_k, **kwargs)
+
+        query = np.asarray([embedding], dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(query)
+        n = k * self.rerank_factor if self.rerank_vectors is not None else k
+        distances, indices = self._search(query, n, positions)
+        hits = [(int(i), float(d)) for i, d in zip(indices[0], distances[0]) if i != -1]
+        if self.rerank_vectors is not None and hits:
+            # Sorted ids read the memory-mapped file front to back.
+            rows = np.sort([i for i, _ in hits])
+            exact = ((np.asarray(self.rerank_vectors[rows]) - query) ** 2).sum(axis=1)
+            hits = sorted(zip(rows.tolist(), exact.tolist()), key=lambda hit: hit[1])
+
+        results = []
+        for position, distance in hits[:k]:
+            doc_id = self.index_to_docstore_id[position]
+            doc = self.docstore.search(doc_id)
+            if not isinstance(doc, Document):
+                raise ValueError(f"Could not find document for id {doc_id}, got {doc}")
+            results.append((doc, distance))
+        score_threshold = kwargs.get("score_threshold")
+        if score_threshold is not None:
+            results = [(doc, score) for doc, score in results if score <= score_threshold]
+        return results
+
+
+def load_vector_store(vector_store_path: str, embeddings, indexing_config: dict) -> QuantizedFAISS:
+    """
+    Loads a saved index (quantized or not), with float32 re-ranking when its
+    vectors were kept, and its metadata index (built now if the index predates it).
+    """
+    vector_store = QuantizedFAISS.load_local(vector_store_path, embeddings, allow_dangerous_deserialization=True)
+    if indexing_config.get('rerank_float32', True):
+        vector_store.attach_rerank_vectors(vector_store_path, indexing_config.get('rerank_factor', 4))
+    vector_store.metadata_index = MetadataIndex.open_or_create(vector_store, vector_store_path)
+    vector_store.exact_filter_max = indexing_config.get('exact_filter_max', 20000)
+    if isinstance(vector_store.index, faiss.IndexIVF) and vector_store.rerank_vectors is None:
+        # Lets filtered searches read a small subset's vectors back from the index.
+        vector_store.index.make_direct_map()
+    return vector_store
@@ -3,12 +3,15 @@
 import nest_asyncio
 nest_asyncio.apply()
 
-import yaml
 import os
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from pydantic import PrivateAttr
 import logging
-import streamlit as st # Import streamlit to access secrets
+from src.vector_store.parent_store import ParentStore
+from src.core.registry import load_config, get_vector_store
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
@@ -16,59 +19,138 @@ log = logging.getLogger(__name__)
 # --- DEFINE PROJECT ROOT for reliable file paths ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-def get_retriever():
+
+def choose_k(scores: list[float], min_k: int, max_k: int, score_threshold: float, score_gap: float) -> int:
     """
-    Loads the FAISS vector store using absolute paths for deployment compatibility.
+    Picks how many of the (descending) relevance scores to keep: stops at the first
+    score below the absolute threshold or after a drop larger than the gap, but
+    always keeps between min_k and max_k results.
     """
-    try:
-        # --- Load Config using absolute path and hybrid secrets logic ---
-        config = {}
-        settings_path = os.path.join(PROJECT_ROOT, "config", "settings.yaml")
-        try:
-            with open(settings_path, 'r') as f:
-                config = yaml.safe_load(f)
-            if "API_KEY" in st.secrets:
-                config['gemini']['api_key'] = st.secrets["API_KEY"]
-        except FileNotFoundError:
-            if "API_KEY" in st.secrets:
-                config = {
-                    "gemini": {"api_key": st.secrets["API_KEY"], "embedding_model": "models/embedding-001"},
-                    "data": {"vector_store_path": "vector_store/faiss_index"}
-                }
-            else:
-                raise ValueError("API Key not found in Streamlit secrets.")
-
-        api_key = config['gemini']['api_key']
-        embedding_model = config['gemini']['embedding_model']
-        
-        # --- Use absolute path for the vector store ---
-        vector_store_path = os.path.join(PROJECT_ROOT, config['data']['vector_store_path'])
-
-        # 2. Initialize embeddings model
-        embeddings = GoogleGenerativeAIEmbeddings(
-            model=embedding_model, 
-            google_api_key=api_key
+    k = min(len(scores), max_k)
+    for i in range(min_k, k):
+        if scores[i] < score_threshold or scores[i - 1] - scores[i] > score_gap:
+            return i
+    return k
+
+
+class AdaptiveRetriever(BaseRetriever):
+    """
+    Fetches a wide candidate set once and cuts it at a score gap or an absolute
+    similarity threshold, instead of always returning a fixed k.
+    """
+    vectorstore: VectorStore
+    fetch_k: int = 20
+    min_k: int = 2
+    max_k: int = 12
+    score_threshold: float = 0.5
+    score_gap: float = 0.1
+
+    _queries: int = PrivateAttr(default=0)
+    _total_k: int = PrivateAttr(default=0)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                k: int = None, filters: dict = None) -> list[Document]:
+        # A per-call k (e.g. from the intent router) caps the adaptive cut.
+        max_k = self.max_k if k is None else max(self.min_k, min(self.max_k, k))
+        # Metadata filters restrict the search itself, so no over-fetching is needed for them.
+        search_kwargs = {"filters": filters} if filters else {}
+        results = self.vectorstore.similarity_search_with_relevance_scores(query, k=max(self.fetch_k, max_k),
+                                                                           **search_kwargs)
+        scores = [score for _, score in results]
+        k = choose_k(scores, self.min_k, max_k, self.score_threshold, self.score_gap)
+
+        self._queries += 1
+        self._total_k += k
+        log.info(
+            "Adaptive retrieval: chose k=%d of %d candidates (scores %s; average k %.2f over %d queries).",
+            k, len(results), [round(s, 3) for s in scores[:k + 1]], self._total_k / self._queries, self._queries,
         )
-        
-        # 3. Load the local FAISS vector store
-        log.info(f"Loading vector store from {vector_store_path}...")
-        vector_store = FAISS.load_local(
-            vector_store_path, 
-            embeddings,
-            allow_dangerous_deserialization=True 
+
+        # Copies: the store's documents may be shared with concurrent queries.
+        return [Document(page_content=doc.page_content, metadata={**doc.metadata, "relevance_score": score})
+                for doc, score in results[:k]]
+
+
+class SectionParentRetriever(BaseRetriever):
+    """
+    Searches small child chunks and returns the deduplicated parent sections
+    they belong to, in order of their best-ranked child.
+    """
+    child_retriever: BaseRetriever
+    parent_store: ParentStore
+    max_parents: int = 4
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def vectorstore(self):
+        return self.child_retriever.vectorstore
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                **kwargs) -> list[Document]:
+        children = self.child_retriever.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        parents, seen = [], set()
+        for child in children:
+            parent_id = child.metadata.get("parent_id")
+            if parent_id is None or parent_id in seen:
+                continue
+            seen.add(parent_id)
+            parent = self.parent_store.get(parent_id)
+            if "relevance_score" in child.metadata:
+                parent = Document(page_content=parent.page_content,
+                                  metadata={**parent.metadata, "relevance_score": child.metadata["relevance_score"]})
+            parents.append(parent)
+            if len(parents) >= self.max_parents:
+                break
+        log.info("Parent retrieval: %d child chunks -> %d sections.", len(children), len(parents))
+        return parents
+
+
+def build_retriever(vector_store, config: dict):
+    """
+    Creates the retriever described by the `retrieval` section of the config:
+    a fixed top-k retriever or the adaptive score-cut retriever, wrapped in the
+    section-parent retriever when the index was built with parent documents.
+    """
+    retrieval_config = config.get('retrieval', {})
+    retriever = _build_child_retriever(vector_store, retrieval_config)
+
+    parent_config = retrieval_config.get('parent_document', {})
+    vector_store_path = os.path.join(PROJECT_ROOT, config.get('data', {}).get('vector_store_path', 'vector_store/faiss_index'))
+    if parent_config.get('enabled', False) and ParentStore.exists(vector_store_path):
+        return SectionParentRetriever(
+            child_retriever=retriever,
+            parent_store=ParentStore(vector_store_path),
+            max_parents=parent_config.get('max_parents', 4),
         )
-        
-        log.info("Vector store loaded successfully.")
-        return vector_store.as_retriever(search_kwargs={"k": 7})
+    return retriever
 
-    except FileNotFoundError:
-        log.error(f"Vector store not found at {vector_store_path}. Please ensure it is built.")
-        st.error(f"Vector store not found at {vector_store_path}. Build process may have failed.")
-        return None
+
+def _build_child_retriever(vector_store, retrieval_config: dict):
+    if retrieval_config.get('mode', 'fixed') == 'adaptive':
+        return AdaptiveRetriever(
+            vectorstore=vector_store,
+            fetch_k=retrieval_config.get('fetch_k', 20),
+            min_k=retrieval_config.get('min_k', 2),
+            max_k=retrieval_config.get('max_k', 12),
+            score_threshold=retrieval_config.get('score_threshold', 0.5),
+            score_gap=retrieval_config.get('score_gap', 0.1),
+        )
+    return vector_store.as_retriever(search_kwargs={"k": retrieval_config.get('k', 7)})
+
+
+def get_retriever():
+    """
+    Builds the configured retriever over the shared vector store from the registry.
+    """
+    try:
+        vector_store = get_vector_store()
+        if vector_store is None:
+            log.error("Vector store could not be loaded. Please ensure it is built.")
+            return None
+        return build_retriever(vector_store, load_config())
     except Exception as e:
         log.error(f"An error occurred while loading the retriever: {e}")
-        st.error(f"An error occurred while loading the retriever: {e}")
         return None
 
 # src/vector_store/retriever.py
-
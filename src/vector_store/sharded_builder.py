@@ -0,0 +1,166 @@
+# src/vector_store/sharded_builder.py
+
+import os
+import sys
+import shutil
+import numpy as np
+import faiss
+
+from src.ingestion.pdf_loader import iter_pdf_documents
+from src.vector_store.docstore import SQLiteDocstore, build_docstore
+from src.vector_store.parent_store import ParentWriter
+from src.vector_store.quantization import QuantizedFAISS, RERANK_VECTORS_FILE, keeps_rerank_vectors, make_index
+from src.vector_store.vector_builder import PROJECT_ROOT, finish_build, make_splitter, split_children, split_document
+from src.vector_store.heading_index import HeadingWriter
+from src.vector_store.table_store import TableWriter
+
+SHARDS_DIR = "shards"
+
+
+class ShardWriter:
+    """
+    Collects embedded chunks until their estimated size reaches `max_bytes`,
+    then spills the vectors to a .npy shard and the chunks to the docstore.
+    Chunk ids are their positions in the final index, as strings.
+    """
+
+    def __init__(self, shards_path: str, docstore: SQLiteDocstore, max_bytes: int):
+        self.shards_path = shards_path
+        self.docstore = docstore
+        self.max_bytes = max_bytes
+        self.shard_files = []
+        self.total = 0
+        self._docs, self._vectors, self._pending_bytes = [], [], 0
+
+    def add(self, docs: list, vectors: list[list[float]]):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._docs.extend(docs)
+        self._vectors.append(vectors)
+        self._pending_bytes += vectors.nbytes + sum(sys.getsizeof(doc.page_content) for doc in docs)
+        if self._pending_bytes >= self.max_bytes:
+            self.flush()
+
+    def flush(self):
+        if not self._docs:
+            return
+        path = os.path.join(self.shards_path, f"shard-{len(self.shard_files):05d}.npy")
+        np.save(path, np.vstack(self._vectors))
+        self.docstore.add({str(self.total + i): doc for i, doc in enumerate(self._docs)})
+        self.total += len(self._docs)
+        self.shard_files.append(path)
+        print(f"  - Shard {len(self.shard_files)}: {len(self._docs)} chunks spilled "
+              f"({self._pending_bytes / 1024 / 1024:.1f} MB).")
+        self._docs, self._vectors, self._pending_bytes = [], [], 0
+
+
+def _training_sample(shard_files: list[str], total: int, sample_size: int) -> np.ndarray:
+    """An even sample of up to `sample_size` vectors across all shards, read via mmap."""
+    fraction = min(1.0, sample_size / total)
+    rng = np.random.default_rng(0)
+    parts = []
+    for path in shard_files:
+        shard = np.load(path, mmap_mode='r')
+        take = min(shard.shape[0], max(1, round(shard.shape[0] * fraction)))
+        rows = np.sort(rng.choice(shard.shape[0], size=take, replace=False))
+        parts.append(np.asarray(shard[rows], dtype=np.float32))
+    return np.vstack(parts)
+
+
+def build_index_from_shards(shard_files: list[str], indexing_config: dict, rerank_path: str = None) -> faiss.Index:
+    """
+    Creates the FAISS index and adds the shards one at a time. A flat float32
+    index needs no training; IVF and quantized indexes are trained on a
+    bounded sample first. With `rerank_path`, the float32 vectors are also
+    concatenated into that file for re-ranking.
+    """
+    dim = np.load(shard_files[0], mmap_mode='r').shape[1]
+    total = sum(np.load(path, mmap_mode='r').shape[0] for path in shard_files)
+    nlist = None
+    if indexing_config.get('index_type', 'flat') == 'ivf':
+        # FAISS wants roughly 39+ training points per list.
+        nlist = max(1, min(indexing_config.get('ivf_nlist', 1024), total // 39))
+    index = make_index(dim, indexing_config, nlist)
+    if not index.is_trained:
+        print(f"Training {type(index).__name__}...")
+        index.train(_training_sample(shard_files, total, indexing_config.get('train_sample_size', 50000)))
+    if nlist:
+        index.nprobe = indexing_config.get('ivf_nprobe', 16)
+
+    rerank = None if rerank_path is None else \
+        np.lib.format.open_memmap(rerank_path, mode='w+', dtype=np.float32, shape=(total, dim))
+    offset = 0
+    for path in shard_files:
+        vectors = np.ascontiguousarray(np.load(path))
+        index.add(vectors)
+        if rerank is not None:
+            rerank[offset:offset + len(vectors)] = vectors
+        offset += len(vectors)
+    if rerank is not None:
+        rerank.flush()
+    return index
+
+
+def build_sharded_vector_store(config: dict, embeddings, vector_store_path: str, files: list[str] = None):
+    """
+    Out-of-core variant of the build in `get_or_create_vector_store`: manuals
+    are parsed, split and embedded one at a time, and chunks and vectors are
+    spilled to disk whenever the pending shard reaches
+    `indexing.shard_memory_mb`, so the build's working set does not grow with
+    the corpus. The index is assembled from the shards at the end and the chunk
+    text stays in a SQLite docstore rather than in the pickled index.
+
+    The build happens in `<vector_store_path>.building` and is moved into
+    place only when complete, so an interrupted build is never loaded.
+    `files` restricts the build to the given PDF file names.
+    """
+    indexing_config = config.get('indexing', {})
+    max_bytes = indexing_config.get('shard_memory_mb', 256) * 1024 * 1024
+    batch_size = indexing_config.get('embed_batch_size', 64)
+    parent_mode = config.get('retrieval', {}).get('parent_document', {}).get('enabled', False)
+
+    build_path = vector_store_path + ".building"
+    shutil.rmtree(build_path, ignore_errors=True)
+    shards_path = os.path.join(build_path, SHARDS_DIR)
+    os.makedirs(shards_path)
+
+    # --- 1. Parse, split, embed and spill one manual at a time ---
+    docstore = build_docstore(build_path, config)
+    writer = ShardWriter(shards_path, docstore, max_bytes)
+    splitter = make_splitter(config)
+    parents = ParentWriter(build_path) if parent_mode else None
+    headings = HeadingWriter(build_path)
+    tables = TableWriter(build_path)
+    pdf_path = os.path.join(PROJECT_ROOT, config['data']['pdf_path'])
+    for document in iter_pdf_documents(pdf_path, config, files):
+        headings.add(document)
+        tables.add(document)
+        chunks = split_children(document, splitter, parents) if parents else split_document(document, splitter)
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            writer.add(batch, embeddings.embed_documents([chunk.page_content for chunk in batch]))
+    writer.flush()
+    if parents is not None:
+        parents.close()
+    headings.close()
+    tables.close()
+    docstore.close()
+
+    if writer.total == 0:
+        print("ERROR: No documents were loaded to build the knowledge base.")
+        shutil.rmtree(build_path, ignore_errors=True)
+        return None
+
+    # --- 2. Assemble the index from the shards ---
+    print(f"Building FAISS index from {len(writer.shard_files)} shards ({writer.total} chunks)...")
+    rerank_path = os.path.join(build_path, RERANK_VECTORS_FILE) if keeps_rerank_vectors(indexing_config) else None
+    index = build_index_from_shards(writer.shard_files, indexing_config, rerank_path)
+    shutil.rmtree(shards_path)
+
+    # --- 3. Save the finished build and move it into place ---
+    vector_store = QuantizedFAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=build_docstore(build_path, config),
+        index_to_docstore_id={i: str(i) for i in range(writer.total)},
+    )
+    return finish_build(vector_store, build_path, vector_store_path, indexing_config)
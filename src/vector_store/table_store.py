@@ -0,0 +1,226 @@
+# src/vector_store/table_store.py
+
+import sys
+import os
+import re
+import json
+import sqlite3
+import threading
+import logging
+from langchain_core.documents import Document
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.ingestion.table_parser import format_rows
+from src.vector_store.metadata_index import ChunkAnnotator
+
+log = logging.getLogger(__name__)
+
+TABLES_FILE = "tables.sqlite"
+# Longest cell value or header, in words, that is looked up as a phrase of the question.
+MAX_PHRASE_WORDS = 6
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Single words that never identify a row or column on their own.
+_STOP_WORDS = {"the", "for", "and", "what", "which", "how", "much", "many", "are", "is", "of", "in", "on", "to",
+               "yes", "no", "nil", "all", "any", "not", "na", "with", "per", "from", "does", "do", "can"}
+# Words that carry no part of what a question asks for, left out when measuring how much of it a cell covers.
+_FILLER_WORDS = _STOP_WORDS | {"a", "an", "i", "me", "my", "we", "our", "you", "your", "it", "its", "be", "was",
+                               "were", "will", "would", "should", "could", "may", "please", "tell", "get", "if",
+                               "this", "that", "there", "at", "by", "as", "or", "about"}
+
+
+def normalize_cell(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def question_phrases(question: str) -> set[str]:
+    """Every run of up to MAX_PHRASE_WORDS consecutive words of the question, normalized."""
+    words = _WORD_RE.findall(question.lower())
+    phrases = {" ".join(words[i:j]) for i in range(len(words))
+               for j in range(i + 1, min(len(words), i + MAX_PHRASE_WORDS) + 1)}
+    return phrases - _STOP_WORDS
+
+
+def coverage(question: str, *names: str) -> int:
+    """Share (0-100) of the question's content words that appear in `names` (e.g. a row's key and a header)."""
+    words = [word for word in _WORD_RE.findall(question.lower()) if word not in _FILLER_WORDS]
+    if not words:
+        return 0
+    named = {word for name in names if name for word in normalize_cell(name).split()}
+    return round(100 * sum(word in named for word in words) / len(words))
+
+
+# --- 1. Writing tables at build time ---
+class TableWriter:
+    """
+    Stores the tables the loader recovered (document metadata `tables`) as
+    rows of cells with their header, source, page and section. Cells are
+    indexed by normalized value and by row, headers (the columns) by
+    normalized text.
+    `add` removes the tables from the document's metadata so they are not
+    copied into every chunk.
+    """
+
+    def __init__(self, vector_store_path: str):
+        os.makedirs(vector_store_path, exist_ok=True)
+        self.path = os.path.join(vector_store_path, TABLES_FILE)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript("""
+            CREATE TABLE tables (id INTEGER PRIMARY KEY, source TEXT, page INTEGER, section TEXT, header TEXT);
+            CREATE TABLE headers (table_id INTEGER, col INTEGER, header TEXT, normalized TEXT);
+            CREATE TABLE cells (table_id INTEGER, row INTEGER, col INTEGER, value TEXT, normalized TEXT);
+        """)
+        self.count = 0
+
+    def add(self, document: Document):
+        tables = document.metadata.pop("tables", None) or []
+        annotator = ChunkAnnotator(document)
+        for table in tables:
+            header, *rows = table["rows"]
+            metadata = annotator.annotate(Document(page_content=format_rows(table["rows"])), table["offset"]).metadata
+            table_id = self._conn.execute(
+                "INSERT INTO tables (source, page, section, header) VALUES (?, ?, ?, ?)",
+                (document.metadata.get("source"), table.get("page") or metadata.get("page"),
+                 metadata.get("section", ""), json.dumps(header)),
+            ).lastrowid
+            self._conn.executemany("INSERT INTO headers VALUES (?, ?, ?, ?)",
+                                   [(table_id, col, text, normalize_cell(text)) for col, text in enumerate(header)])
+            self._conn.executemany("INSERT INTO cells VALUES (?, ?, ?, ?, ?)",
+                                   [(table_id, row_number, col, value, normalize_cell(value))
+                                    for row_number, row in enumerate(rows) for col, value in enumerate(row)])
+            self.count += 1
+
+    def close(self):
+        self._conn.executescript("""
+            CREATE INDEX idx_headers_normalized ON headers (normalized);
+            CREATE INDEX idx_cells_normalized ON cells (normalized);
+            CREATE INDEX idx_cells_row ON cells (table_id, row, col);
+        """)
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- 2. Lookup ---
+class TableStore:
+    """
+    Read access to the table files of a built index (or of each collection).
+    `lookup` finds the cells a question points at: a row named by one of its
+    cells (e.g. "Tatkal") crossed with a column named by its header (e.g. "Fee").
+    """
+
+    def __init__(self, paths: list[str]):
+        self._conns = [sqlite3.connect(path, check_same_thread=False) for path in paths]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, vector_store_path: str) -> "TableStore" or None:
+        """The table store of a built index (or of all its collections); None if none was recorded."""
+        paths = [os.path.join(vector_store_path, TABLES_FILE)]
+        collections_path = os.path.join(vector_store_path, "collections")
+        if os.path.isdir(collections_path):
+            paths += [os.path.join(collections_path, name, TABLES_FILE) for name in sorted(os.listdir(collections_path))]
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            log.info("Table store: no %s found; rebuild the index or run table_store.py to enable table lookups.",
+                     TABLES_FILE)
+            return None
+        return cls(paths)
+
+    def _lookup_file(self, conn: sqlite3.Connection, phrases: list[str], sources: list[str],
+                     min_key_chars: int) -> list[dict]:
+        marks = ", ".join("?" * len(phrases))
+        columns = conn.execute(f"SELECT table_id, col, header, normalized FROM headers WHERE normalized IN ({marks})",
+                               phrases).fetchall()
+        keys = conn.execute(f"SELECT table_id, row, col, value, normalized FROM cells WHERE normalized IN ({marks})",
+                            phrases).fetchall()
+        keys = [key for key in keys if len(key[4]) >= min_key_chars and not key[4].isdigit()]
+        table_ids = {key[0] for key in keys}
+        if not table_ids:
+            return []
+        tables = {row[0]: {"source": row[1], "page": row[2], "section": row[3], "header": json.loads(row[4])}
+                  for row in conn.execute(f"SELECT id, source, page, section, header FROM tables "
+                                          f"WHERE id IN ({', '.join('?' * len(table_ids))})", list(table_ids))
+                  if not sources or row[1] in sources}
+
+        cells = []
+        for table_id, row, key_col, key_value, key_normalized in keys:
+            if table_id not in tables:
+                continue
+            values = [value for (value,) in conn.execute(
+                "SELECT value FROM cells WHERE table_id = ? AND row = ? ORDER BY col", (table_id, row))]
+            hit = {**tables[table_id], "row": values, "key": key_value, "key_col": key_col}
+            targets = [(col, header, normalized) for t, col, header, normalized in columns
+                       if t == table_id and col != key_col and col < len(values)]
+            if not targets:
+                # A row the question names, but no column: still a useful excerpt for the LLM.
+                cells.append({**hit, "column": None, "value": None, "score": len(key_normalized)})
+            for col, header, normalized in targets:
+                cells.append({**hit, "column": header, "value": values[col],
+                              "score": len(key_normalized) + len(normalized)})
+        return cells
+
+    def lookup(self, question: str, sources: list[str] = None, min_key_chars: int = 3) -> list[dict]:
+        """
+        Rows of stored tables that the question names, best first. Each hit
+        has the table's source, page, section and header, the row's cells, the
+        naming cell (`key`), when a header of that table also appears in the
+        question, the `column` and its `value`, and the `coverage` (0-100) of
+        the question by the key and column.
+        """
+        phrases = sorted(question_phrases(question))
+        if not phrases:
+            return []
+        hits = []
+        with self._lock:
+            for conn in self._conns:
+                hits.extend(self._lookup_file(conn, phrases, sources, min_key_chars))
+        for hit in hits:
+            hit["coverage"] = coverage(question, hit["key"], hit["column"])
+        return sorted(hits, key=lambda hit: (hit["value"] is not None, hit["coverage"], hit["score"]), reverse=True)
+
+
+def row_excerpt(hit: dict) -> Document:
+    """A table row with its header, as a small context document."""
+    return Document(
+        page_content="--- TABLE START ---\n" + format_rows([hit["header"], hit["row"]]) + "\n--- TABLE END ---",
+        metadata={"source": hit["source"], "page": hit["page"], "section": hit["section"], "element_type": "table"},
+    )
+
+
+def write_tables(documents, vector_store_path: str) -> int:
+    """Stores the recovered tables of `documents` next to an index; returns the number of tables."""
+    with TableWriter(vector_store_path) as writer:
+        for document in documents:
+            writer.add(document)
+    print(f"Table store: {writer.count} tables recorded.")
+    return writer.count
+
+
+# This block records the tables of an already built index without re-embedding anything
+if __name__ == '__main__':
+    from src.core.registry import load_config
+    from src.ingestion.pdf_loader import iter_pdf_documents
+
+    main_config = load_config()
+    pdf_folder = os.path.join(PROJECT_ROOT, main_config['data']['pdf_path'])
+    root_path = os.path.join(PROJECT_ROOT, main_config['data']['vector_store_path'])
+    if main_config.get('collections', {}).get('enabled', False):
+        from src.vector_store.collection_store import COLLECTIONS_DIR, assign_collections
+
+        pdf_files = sorted(f for f in os.listdir(pdf_folder) if f.endswith('.pdf'))
+        groups = main_config['collections'].get('groups', {}) or {}
+        for name, files in assign_collections(pdf_files, groups).items():
+            write_tables(iter_pdf_documents(pdf_folder, main_config, files), os.path.join(root_path, COLLECTIONS_DIR, name))
+    else:
+        write_tables(iter_pdf_documents(pdf_folder, main_config), root_path)
@@ -2,36 +2,126 @@
 
 import sys
 import os
-import yaml
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
+import shutil
 
 # --- System Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(PROJECT_ROOT)
 
 # --- Now import from your src module ---
-from src.ingestion.pdf_loader import load_and_process_pdfs
+from src.core.registry import load_config, create_embeddings
+from src.vector_store.parent_store import split_sections, ParentWriter
+from src.vector_store.quantization import QuantizedFAISS, load_vector_store, quantize_vector_store
+from src.vector_store.metadata_index import METADATA_INDEX_FILE, ChunkAnnotator, MetadataIndex
+from src.vector_store.heading_index import write_headings
+from src.vector_store.table_store import write_tables
 
-def get_or_create_vector_store(config: dict):
+
+def make_splitter(config: dict):
+    """The text splitter for embedded chunks: child chunks in parent-document mode, else regular chunks."""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    parent_config = config.get('retrieval', {}).get('parent_document', {})
+    if not parent_config.get('enabled', False):
+        return RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=300, add_start_index=True)
+    return RecursiveCharacterTextSplitter(
+        chunk_size=parent_config.get('child_chunk_size', 400),
+        chunk_overlap=parent_config.get('child_chunk_overlap', 50),
+        add_start_index=True,
+    )
+
+
+def split_document(document, splitter) -> list:
+    """Splits one document into chunks tagged with page range, section and element type."""
+    annotator = ChunkAnnotator(document)
+    return [annotator.annotate(chunk, chunk.metadata.get("start_index", 0))
+            for chunk in splitter.split_documents([document])]
+
+
+def split_children(document, splitter, parents: ParentWriter) -> list:
+    """Cuts one document into sections, saves them as parents and returns their child chunks."""
+    annotator = ChunkAnnotator(document)
+    children = []
+    for section in split_sections(document):
+        section_start = section.metadata["start_index"]
+        parent_id = parents.add(annotator.annotate(section, section_start))
+        for child in splitter.split_documents([section]):
+            child.metadata["parent_id"] = parent_id
+            # Offsets relative to the whole document, so chunks of one source stay comparable.
+            child.metadata["start_index"] = section_start + child.metadata.get("start_index", 0)
+            children.append(annotator.annotate(child, child.metadata["start_index"]))
+    return children
+
+
+def split_documents(documents: list, config: dict, vector_store_path: str) -> list:
+    """
+    Splits loaded documents into the chunks that get embedded.
+    With `retrieval.parent_document.enabled`, documents are first cut into
+    sections at their `## Title` lines; the sections are saved as parents and
+    only small child chunks (tagged with their `parent_id`) are embedded.
+    """
+    splitter = make_splitter(config)
+    if not config.get('retrieval', {}).get('parent_document', {}).get('enabled', False):
+        return [chunk for document in documents for chunk in split_document(document, splitter)]
+
+    with ParentWriter(vector_store_path) as parents:
+        children = [child for document in documents for child in split_children(document, splitter, parents)]
+    print(f"Parent-document index: {parents.count} sections -> {len(children)} child chunks.")
+    return children
+
+
+def index_exists(vector_store_path: str) -> bool:
+    """True once a build has been saved at the path (a bare or partly written directory does not count)."""
+    return os.path.exists(os.path.join(vector_store_path, "index.faiss"))
+
+
+def finish_build(vector_store: QuantizedFAISS, build_path: str, vector_store_path: str,
+                 indexing_config: dict) -> QuantizedFAISS:
+    """
+    Saves a finished build (index, docstore and metadata index) in
+    `build_path`, then moves the directory to `vector_store_path`, replacing
+    any earlier index there. The move is the last step, so a build that fails
+    part-way never leaves an incomplete index in place. Returns the store,
+    attached to its files at the final path.
+    """
+    from src.vector_store.docstore import SQLiteDocstore
+
+    MetadataIndex.create(vector_store, build_path).close()
+    if isinstance(vector_store.docstore, SQLiteDocstore):
+        # Pickled by save_local with the path it will have; reopened there on first use.
+        vector_store.docstore.relocate(vector_store_path)
+    # Nothing may keep a file of the build open while the directory is moved.
+    vector_store.rerank_vectors = None
+    vector_store.save_local(build_path)
+    shutil.rmtree(vector_store_path, ignore_errors=True)
+    os.rename(build_path, vector_store_path)
+
+    vector_store.attach_rerank_vectors(vector_store_path, indexing_config.get('rerank_factor', 4))
+    vector_store.metadata_index = MetadataIndex(os.path.join(vector_store_path, METADATA_INDEX_FILE))
+    print(f"Knowledge base built and saved successfully at {vector_store_path}")
+    return vector_store
+
+
+def get_or_create_vector_store(config: dict, embeddings=None):
     """
     Checks if the vector store exists. If so, loads it.
     If not, builds it, saves it, and returns the store object directly from memory.
     This function is now completely decoupled from Streamlit.
+    `embeddings` defaults to a new client from the registry's factory.
     """
     vector_store_path = os.path.join(PROJECT_ROOT, config['data']['vector_store_path'])
-    api_key = config['gemini']['api_key']
+    if embeddings is None:
+        embeddings = create_embeddings(config)
     
+    # Per-manual / per-department collections live in subdirectories and are loaded lazily.
+    if config.get('collections', {}).get('enabled', False):
+        from src.vector_store.collection_store import get_or_create_collections
+        return get_or_create_collections(config, embeddings, vector_store_path)
+
     # --- 1. Check if store exists, and load it ---
-    if os.path.exists(vector_store_path):
+    if index_exists(vector_store_path):
         print("Vector store found. Loading from disk...")
-        embeddings = GoogleGenerativeAIEmbeddings(model=config['gemini']['embedding_model'], google_api_key=api_key)
-        vector_store = FAISS.load_local(
-            vector_store_path, 
-            embeddings,
-            allow_dangerous_deserialization=True
-        )
+        vector_store = load_vector_store(vector_store_path, embeddings, config.get('indexing', {}))
         print("Vector store loaded successfully.")
         return vector_store
 
@@ -39,32 +129,51 @@ def get_or_create_vector_store(config: dict):
     else:
         # UI messages like st.info() are now handled by the calling script (app.py)
         print("Knowledge base not found. Triggering build process...")
-        
-        pdf_path = os.path.join(PROJECT_ROOT, config['data']['pdf_path'])
-        documents = load_and_process_pdfs(pdf_path, config)
-        if not documents:
-            # Error messages are now simple prints; app.py will show the st.error()
-            print("ERROR: No documents were loaded to build the knowledge base.")
-            return None
-
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=300)
-        docs = text_splitter.split_documents(documents)
-        
-        embeddings = GoogleGenerativeAIEmbeddings(model=config['gemini']['embedding_model'], google_api_key=api_key)
-        
-        print("Building and saving FAISS vector store...")
-        vector_store = FAISS.from_documents(docs, embeddings)
-        vector_store.save_local(vector_store_path)
-        print(f"Knowledge base built and saved successfully at {vector_store_path}")
-        # Return the newly created object directly from memory
-        return vector_store
+        return build_vector_store(config, embeddings, vector_store_path)
+
+
+def build_vector_store(config: dict, embeddings, vector_store_path: str, files: list[str] = None):
+    """
+    Builds the vector store from the PDFs (or only `files` among them), saves
+    it at `vector_store_path` and returns it. Returns None if nothing loaded.
+    The build happens in `<vector_store_path>.building` (see finish_build).
+    """
+    if config.get('indexing', {}).get('mode', 'in_memory') == 'sharded':
+        from src.vector_store.sharded_builder import build_sharded_vector_store
+        return build_sharded_vector_store(config, embeddings, vector_store_path, files)
+
+    # Imported only when building, so loading a prebuilt index never pulls in the PDF stack.
+    from src.ingestion.pdf_loader import load_and_process_pdfs
+
+    pdf_path = os.path.join(PROJECT_ROOT, config['data']['pdf_path'])
+    documents = load_and_process_pdfs(pdf_path, config, files)
+    if not documents:
+        # Error messages are now simple prints; app.py will show the st.error()
+        print("ERROR: No documents were loaded to build the knowledge base.")
+        return None
+
+    # Everything is written to a build directory that is moved into place once complete.
+    build_path = vector_store_path + ".building"
+    shutil.rmtree(build_path, ignore_errors=True)
+    write_headings(documents, build_path)
+    write_tables(documents, build_path)
+    docs = split_documents(documents, config, build_path)
+    
+    # Document embeddings pass straight through the cache; only queries are cached.
+    print("Building and saving FAISS vector store...")
+    vector_store = QuantizedFAISS.from_documents(docs, embeddings)
+    vector_store = quantize_vector_store(vector_store, config.get('indexing', {}), build_path)
+    if config.get('docstore', {}).get('backend', 'memory') == 'sqlite':
+        from src.vector_store.docstore import copy_to_sqlite
+        vector_store.docstore = copy_to_sqlite(vector_store.docstore._dict, build_path, config)
+    vector_store = finish_build(vector_store, build_path, vector_store_path, config.get('indexing', {}))
+    # Return the newly created object directly from memory
+    return vector_store
 
 # This block allows you to still run this script directly from the command line for local building
 if __name__ == '__main__':
-    # When run directly, it loads its own config from the standard path
-    with open(os.path.join(PROJECT_ROOT, "config", "settings.yaml"), 'r') as f:
-        main_config = yaml.safe_load(f)
-    get_or_create_vector_store(main_config)
+    # When run directly, it loads the config through the registry
+    get_or_create_vector_store(load_config())
 
 
 
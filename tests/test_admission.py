@@ -0,0 +1,96 @@
+# tests/test_admission.py
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.core.admission import BACKGROUND, INTERACTIVE, AdmissionController, AdmissionRejected
+
+
+def drained(rpm: float = 60, **kwargs) -> AdmissionController:
+    """A controller whose request bucket is empty, so every caller has to queue."""
+    controller = AdmissionController("test", rpm=rpm, **kwargs)
+    controller.requests.level = 0.0
+    return controller
+
+
+def test_admits_immediately_while_there_is_capacity():
+    controller = AdmissionController("test", rpm=60)
+    assert controller.acquire() < 0.1
+    assert controller.stats()["admitted"] == 1
+
+
+def test_interactive_callers_overtake_queued_background_work():
+    # One request per 50ms once the bucket is empty.
+    controller = drained(rpm=1200, timeout_seconds=5)
+    order = []
+
+    async def call(name: str, priority: int, delay: float):
+        await asyncio.sleep(delay)
+        await controller.acquire_async(priority=priority)
+        order.append(name)
+
+    async def main():
+        await asyncio.gather(call("background-1", BACKGROUND, 0), call("background-2", BACKGROUND, 0.005),
+                             call("interactive", INTERACTIVE, 0.01))
+
+    asyncio.run(main())
+    assert order == ["interactive", "background-1", "background-2"]
+
+
+def test_deadline_rejects_and_is_counted():
+    controller = drained(rpm=1)
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(timeout=0.05)
+    stats = controller.stats()
+    assert (stats["queue_depth"], stats["rejected_deadline"], stats["declined_no_wait"]) == (0, 1, 0)
+
+
+def test_a_caller_that_will_not_wait_is_counted_as_declined():
+    controller = drained(rpm=1)
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(controller.acquire_async(timeout=0))
+    stats = controller.stats()
+    assert (stats["rejected_deadline"], stats["declined_no_wait"]) == (0, 1)
+
+
+def test_a_full_queue_rejects_interactive_callers():
+    controller = drained(rpm=1, max_queue=1)
+
+    async def main():
+        waiter = asyncio.create_task(controller.acquire_async(timeout=5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire_async()
+        waiter.cancel()
+
+    asyncio.run(main())
+    assert controller.stats()["rejected_queue_full"] == 1
+
+
+def test_a_cancelled_waiter_leaves_the_queue():
+    controller = drained(rpm=1200)
+
+    async def main():
+        waiter = asyncio.create_task(controller.acquire_async(timeout=30))
+        await asyncio.sleep(0.01)
+        assert controller.stats()["queue_depth"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.stats()["queue_depth"] == 0
+        # The next caller is admitted as soon as the bucket refills, not after the dead ticket's deadline.
+        start = time.monotonic()
+        await controller.acquire_async(timeout=1)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.5
+    stats = controller.stats()
+    assert (stats["cancelled"], stats["rejected_deadline"], stats["admitted"]) == (1, 0, 1)
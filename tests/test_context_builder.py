@@ -0,0 +1,65 @@
+# tests/test_context_builder.py
+
+import os
+import sys
+
+from langchain_core.documents import Document
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.context_builder import (
+    CHARS_PER_TOKEN, assemble_context, estimate_tokens, merge_overlapping, select_mmr, trim_to_budget,
+)
+
+
+def chunk(text: str, source: str = "manual.pdf", **metadata) -> Document:
+    return Document(page_content=text, metadata={"source": source, **metadata})
+
+
+def test_mmr_stops_once_the_token_budget_is_spent():
+    docs = [chunk(f"topic{i} " * 100) for i in range(5)]  # ~200 tokens each, all distinct
+
+    selected = select_mmr(docs, "topic0", token_budget=300)
+
+    assert len(selected) == 2
+    assert selected[0] is docs[0]
+
+
+def test_mmr_skips_near_duplicates():
+    original = chunk("reset the pump by holding the power button for ten seconds")
+    duplicate = chunk("reset the pump by holding the power button for ten seconds.")
+    other = chunk("the filter should be replaced every six months")
+
+    selected = select_mmr([original, duplicate, other], "how do I reset the pump", token_budget=1000)
+
+    assert selected == [original, other]
+
+
+def test_overlapping_chunks_from_the_same_source_are_merged():
+    first = chunk("abcdefghij", start_index=0)
+    second = chunk("ghijklmnop", start_index=6)
+    elsewhere = chunk("ghijklmnop", source="other.pdf", start_index=6)
+
+    merged = merge_overlapping([first, second, elsewhere])
+
+    assert [d.page_content for d in merged] == ["abcdefghijklmnop", "ghijklmnop"]
+
+
+def test_trim_cuts_the_last_chunk_at_a_line_boundary():
+    docs = [chunk("x" * 40), chunk("line one\nline two\nline three")]
+
+    trimmed = trim_to_budget(docs, token_budget=15)  # 60 characters
+
+    assert trimmed[0].page_content == "x" * 40
+    assert trimmed[1].page_content == "line one\nline two"
+
+
+def test_assembled_context_stays_within_the_budget():
+    docs = [chunk(f"section {i}\n" + f"detail{i} " * 80, source=f"doc{i}.pdf") for i in range(10)]
+
+    packed = assemble_context(docs, "detail3", token_budget=250)
+
+    assert sum(len(d.page_content) for d in packed) <= 250 * CHARS_PER_TOKEN
+    assert sum(estimate_tokens(d.page_content) for d in packed) <= 250
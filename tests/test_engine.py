@@ -0,0 +1,83 @@
+# tests/test_engine.py
+
+import asyncio
+import os
+import sys
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.engine import QAEngine
+from src.bot_engine.gemini_responder import RAGChain
+from src.bot_engine.intent_router import RoutePlan
+from src.bot_engine.memory import ConversationMemory
+from src.bot_engine.response_cache import SemanticResponseCache
+
+PLAN = RoutePlan("default", k=4, context_token_budget=1000, max_output_tokens=200)
+
+
+class FakeRouter:
+    def route(self, question: str) -> RoutePlan:
+        return PLAN
+
+    def plan_for(self, question: str) -> RoutePlan:
+        return PLAN
+
+
+class FakeRetriever:
+    async def ainvoke(self, question: str, **kwargs) -> list:
+        return [Document(page_content=f"Passage about {question}", metadata={"source": "a.pdf", "page": 1})]
+
+
+class FakeAnswerChain:
+    """Stands in for the Gemini chain and records what each generation was given."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def astream(self, inputs: dict):
+        self.calls.append(inputs)
+        yield f"Answer to {inputs['question']}"
+
+
+def make_engine() -> tuple[QAEngine, FakeAnswerChain]:
+    chain = FakeAnswerChain()
+    rag_chain = RAGChain(FakeRetriever(), {"default": chain}, FakeRouter(), DeterministicFakeEmbedding(size=16),
+                         SemanticResponseCache("v1"))
+    return QAEngine([], rag_chain, index_version="v1"), chain
+
+
+def test_a_standalone_question_later_in_a_chat_uses_the_response_cache():
+    engine, chain = make_engine()
+    memory = ConversationMemory()
+
+    async def main():
+        first = await engine.answer("How do I cancel a tatkal ticket?")
+        await engine.answer("What are the refund rules?", memory)
+        second = await engine.answer("How do I cancel a tatkal ticket?", memory)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert second["answer"] == first["answer"]
+    assert len(chain.calls) == 2  # The second turn's question was answered from the cache.
+    assert engine.rag_chain.response_cache.stats()["hits"] == 1
+    assert len(memory.turns) == 2
+
+
+def test_a_follow_up_is_condensed_and_answered_with_the_history():
+    engine, chain = make_engine()
+    memory = ConversationMemory()
+
+    async def main():
+        await engine.answer("How do I cancel a tatkal ticket?", memory)
+        await engine.answer("How long does it take?", memory)
+
+    asyncio.run(main())
+    follow_up = chain.calls[-1]
+    assert follow_up["question"] == "How long does it take? (regarding: How do I cancel a tatkal ticket?)"
+    assert "User: How do I cancel a tatkal ticket?" in follow_up["history"]
+    assert chain.calls[0]["history"] == "(none)"
@@ -0,0 +1,37 @@
+# tests/test_import_report.py
+
+import os
+import subprocess
+import sys
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.tools.import_report import ingestion_leaks, summarize
+
+
+def test_ingestion_leaks_matches_whole_package_names():
+    rows = [("unstructured.partition.pdf", 10, 10), ("unstructured_client", 5, 5), ("google.generativeai", 1, 1),
+            ("google.protobuf", 1, 1)]
+
+    assert ingestion_leaks(rows) == ["google.generativeai", "unstructured.partition.pdf"]
+
+
+def test_summarize_sums_self_time_per_package():
+    rows = [("numpy", 3000, 5000), ("numpy.linalg", 2000, 2000), ("yaml", 1000, 1000)]
+
+    summary = summarize(rows, top=1)
+
+    assert summary["total_ms"] == 6.0
+    assert summary["packages"] == [("numpy", 5000)]
+    assert summary["slowest"] == [("numpy", 3000, 5000)]
+
+
+def test_serving_path_does_not_import_the_pdf_loader():
+    # A fresh interpreter, so modules other tests imported do not count.
+    code = "import sys, src.bot_engine.engine; print('src.ingestion.pdf_loader' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
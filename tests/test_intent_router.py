@@ -0,0 +1,56 @@
+# tests/test_intent_router.py
+
+import os
+import sys
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.intent_router import DEFAULT_PLANS, build_intent_router, classify_intent
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("What is the warranty period?", "brief"),
+    ("Define torque", "brief"),
+    ("Reset code E4", "brief"),
+    ("How do I replace the filter?", "detailed"),
+    ("Explain the calibration procedure", "detailed"),
+    ("What are the steps to reset the pump?", "detailed"),
+    ("Which maintenance tasks should be done before the first seasonal start-up", "detailed"),
+])
+def test_classify_intent(question, intent):
+    assert classify_intent(question) == intent
+
+
+def test_plans_are_sized_per_intent_with_config_overrides():
+    router = build_intent_router({"routing": {"brief": {"k": 2}}, "retrieval": {"k": 5}})
+
+    brief = router.plan_for("What is the warranty period?")
+    detailed = router.plan_for("How do I replace the filter?")
+
+    assert (brief.name, brief.k) == ("brief", 2)
+    assert brief.context_token_budget == DEFAULT_PLANS["brief"]["context_token_budget"]
+    assert detailed.k == DEFAULT_PLANS["detailed"]["k"]
+    assert brief.call_tokens < detailed.call_tokens
+
+
+def test_disabled_routing_uses_the_default_plan():
+    router = build_intent_router({"routing": {"enabled": False}, "retrieval": {"k": 5},
+                                  "context": {"token_budget": 1800}})
+
+    plan = router.plan_for("What is the warranty period?")
+
+    assert (plan.name, plan.k, plan.context_token_budget) == ("default", 5, 1800)
+
+
+def test_route_counts_decisions_but_plan_for_does_not():
+    router = build_intent_router({})
+
+    router.plan_for("Define torque")
+    router.route("Define torque")
+    router.route("How do I replace the filter?")
+
+    assert router.stats() == {"brief": 1, "detailed": 1, "default": 0}
@@ -0,0 +1,74 @@
+# tests/test_metadata_index.py
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.vector_store.metadata_index import MetadataIndex, validate_filters
+
+CHUNKS = [
+    {"source": "a.pdf", "page": 1, "page_end": 2, "section": "Refund Rules", "element_type": "text"},
+    {"source": "a.pdf", "page": 3, "page_end": 3, "section": "Refund Rules", "element_type": "table"},
+    {"source": "b.pdf", "page": 2, "page_end": 4, "section": "Tatkal Booking", "element_type": "text"},
+    {"source": "b.pdf", "page": 9, "page_end": 9, "section": "", "element_type": "image"},
+]
+
+
+@pytest.fixture
+def metadata_index(tmp_path):
+    docs = {str(position): Document(page_content="", metadata=metadata) for position, metadata in enumerate(CHUNKS)}
+    vector_store = SimpleNamespace(index_to_docstore_id={position: str(position) for position in range(len(CHUNKS))},
+                                   docstore=SimpleNamespace(search=docs.get))
+    return MetadataIndex.create(vector_store, str(tmp_path))
+
+
+@pytest.mark.parametrize("filters", [
+    {"source": "a.pdf", "pages": [1, 5], "section": "refund", "element_type": ["text", "table"]},
+    {"source": ["a.pdf", "b.pdf"], "element_type": "image"},
+    {"pages": (4, 4)},
+])
+def test_accepts_valid_filters(filters):
+    assert validate_filters(filters) is filters
+
+
+@pytest.mark.parametrize("filters", [
+    "a.pdf",
+    {"manual": "a.pdf"},
+    {"source": 3},
+    {"source": ["a.pdf", None]},
+    {"section": ["refund"]},
+    {"element_type": 5},
+    {"element_type": "video"},
+    {"element_type": ["text", 1]},
+    {"pages": [1]},
+    {"pages": [True, 3]},
+    {"pages": [1.0, 3]},
+    {"pages": [5, 2]},
+])
+def test_rejects_invalid_filters_with_value_error(filters):
+    with pytest.raises(ValueError):
+        validate_filters(filters)
+
+
+@pytest.mark.parametrize("filters, positions", [
+    ({"source": "a.pdf"}, [0, 1]),
+    ({"source": ["a.pdf", "b.pdf"], "element_type": "text"}, [0, 2]),
+    ({"pages": [2, 3]}, [0, 1, 2]),
+    ({"section": "REFUND"}, [0, 1]),
+    ({"source": "c.pdf"}, []),
+])
+def test_select_returns_matching_positions(metadata_index, filters, positions):
+    assert metadata_index.select(filters).tolist() == positions
+    assert metadata_index.select(filters).tolist() == positions  # Served from the cache.
+
+
+def test_select_validates_before_querying(metadata_index):
+    with pytest.raises(ValueError):
+        metadata_index.select({"section": 7})
@@ -0,0 +1,50 @@
+# tests/test_quantization.py
+
+import os
+import sys
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.embeddings import FakeEmbeddings
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.vector_store.quantization import QuantizedFAISS
+
+DIM = 16
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(0).standard_normal((20000, DIM)).astype(np.float32)
+
+
+def ivf_store(vectors, direct_map: bool, exact_filter_max: int = 20000) -> QuantizedFAISS:
+    index = faiss.IndexIVFFlat(faiss.IndexFlatL2(DIM), DIM, 512)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = 8
+    if direct_map:
+        index.make_direct_map()
+    store = QuantizedFAISS(FakeEmbeddings(size=DIM), index, InMemoryDocstore({}), {})
+    store.exact_filter_max = exact_filter_max
+    return store
+
+
+@pytest.mark.parametrize("direct_map, subset, exact_filter_max", [
+    (True, 200, 20000),    # Exact search over the subset's vectors.
+    (False, 200, 20000),   # No vectors to read back: more (then all) lists are probed.
+    (True, 3000, 100),     # Too large to search exactly.
+])
+def test_filtered_ivf_search_returns_the_nearest_selected_chunks(vectors, direct_map, subset, exact_filter_max):
+    rng = np.random.default_rng(1)
+    positions = np.sort(rng.choice(len(vectors), subset, replace=False)).astype(np.int64)
+    query = rng.standard_normal((1, DIM)).astype(np.float32)
+    expected = positions[np.argsort(((vectors[positions] - query) ** 2).sum(axis=1))[:7]]
+
+    _, indices = ivf_store(vectors, direct_map, exact_filter_max)._search(query, 7, positions)
+    assert indices[0].tolist() == expected.tolist()
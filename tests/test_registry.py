@@ -0,0 +1,85 @@
+# tests/test_registry.py
+
+import os
+import sys
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.core import registry
+
+
+@pytest.fixture
+def fresh_registry(tmp_path, monkeypatch):
+    """Points the registry at temporary settings/secrets files and clears its process-wide state."""
+    monkeypatch.setattr(registry, "SETTINGS_PATH", str(tmp_path / "settings.yaml"))
+    monkeypatch.setattr(registry, "SECRETS_PATH", str(tmp_path / "secrets.toml"))
+    monkeypatch.setattr(registry, "_config", None)
+    monkeypatch.setattr(registry, "_resources", {})
+    for name in ("API_KEY", "GEMINI_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
+
+
+def test_settings_are_merged_over_defaults_and_loaded_once(fresh_registry):
+    (fresh_registry / "settings.yaml").write_text(
+        "gemini:\n  api_key: file-key\n  llm_model: models/other\nretrieval:\n  k: 4\n"
+    )
+
+    config = registry.load_config()
+
+    assert config["gemini"]["llm_model"] == "models/other"
+    assert config["gemini"]["embedding_model"] == registry.DEFAULT_CONFIG["gemini"]["embedding_model"]
+    assert config["retrieval"]["k"] == 4
+    (fresh_registry / "settings.yaml").write_text("gemini:\n  api_key: changed\n")
+    assert registry.load_config() is config
+
+
+def test_api_key_comes_from_the_environment_before_the_file(fresh_registry, monkeypatch):
+    (fresh_registry / "settings.yaml").write_text("gemini:\n  api_key: file-key\n")
+    monkeypatch.setenv("GEMINI_API_KEY", "env-key")
+
+    assert registry.load_config()["gemini"]["api_key"] == "env-key"
+
+
+def test_api_key_falls_back_to_the_streamlit_secrets_file(fresh_registry):
+    (fresh_registry / "secrets.toml").write_text('API_KEY = "secret-key"\n')
+
+    assert registry.load_config()["gemini"]["api_key"] == "secret-key"
+
+
+@pytest.mark.parametrize("settings", ["", "gemini:\n  api_key: YOUR_API_KEY_HERE\n"])
+def test_missing_or_placeholder_key_is_a_config_error(fresh_registry, settings):
+    (fresh_registry / "settings.yaml").write_text(settings)
+
+    with pytest.raises(registry.ConfigError):
+        registry.load_config()
+
+
+def test_resources_are_shared(fresh_registry):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    assert registry._get_or_create("thing", factory) is registry._get_or_create("thing", factory)
+    assert len(calls) == 1
+
+
+def test_a_failed_vector_store_load_is_retried(fresh_registry, monkeypatch):
+    from src.vector_store import vector_builder
+
+    loads = []
+    monkeypatch.setattr(registry, "load_config", lambda: {})
+    monkeypatch.setattr(registry, "get_embeddings", lambda: None)
+    monkeypatch.setattr(vector_builder, "get_or_create_vector_store",
+                        lambda config, embeddings: loads.append(1) or (None if len(loads) == 1 else "store"))
+
+    assert registry.get_vector_store() is None
+    assert registry.get_vector_store() == "store"
+    assert registry.get_vector_store() == "store"
+    assert len(loads) == 2
@@ -0,0 +1,119 @@
+# tests/test_resilience.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.resilience import CircuitBreaker, LLMUnavailable, ResilientLLM
+
+
+def test_breaker_opens_after_consecutive_failures_and_closes_after_a_good_trial(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.bot_engine.resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.rejects() and not breaker.allow()
+
+    now[0] += 30
+    assert breaker.state == "half_open"
+    assert not breaker.rejects()  # Checking does not take the trial slot ...
+    assert breaker.allow()        # ... only the one trial call does,
+    assert breaker.rejects() and not breaker.allow()  # and everyone else waits for its outcome.
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.times_opened == 1
+
+
+def test_a_failed_trial_reopens_the_breaker(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.bot_engine.resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] += 29
+    assert breaker.state == "open"
+
+
+async def _collect(llm: ResilientLLM, factory) -> list[str]:
+    return [chunk async for chunk in llm.astream(factory)]
+
+
+def test_an_error_after_the_first_chunk_becomes_llm_unavailable():
+    async def flaky():
+        yield "partial "
+        raise ConnectionError("stream reset")
+
+    llm = ResilientLLM(hedge_enabled=False, failure_threshold=1)
+    chunks = []
+
+    async def main():
+        async for chunk in llm.astream(flaky):
+            chunks.append(chunk)
+
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(main())
+    assert chunks == ["partial "]
+    assert llm.breaker.state == "open"
+
+
+def test_no_first_token_in_time_counts_as_a_failure():
+    async def silent():
+        await asyncio.sleep(5)
+        yield "late"
+
+    llm = ResilientLLM(first_token_seconds=0.05, hedge_enabled=False, failure_threshold=1)
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(_collect(llm, silent))
+    assert llm.stats()["timeouts"] == 1 and llm.breaker.state == "open"
+    with pytest.raises(LLMUnavailable):  # Rejected at once while open.
+        asyncio.run(_collect(llm, silent))
+
+
+def test_a_cancelled_half_open_trial_frees_the_slot():
+    async def slow():
+        await asyncio.sleep(5)
+        yield "late"
+
+    async def fast():
+        yield "ok"
+
+    llm = ResilientLLM(hedge_enabled=False, failure_threshold=1, reset_seconds=0)
+    llm.breaker.record_failure()
+
+    async def main():
+        trial = asyncio.create_task(_collect(llm, slow))
+        await asyncio.sleep(0.01)
+        assert llm.breaker.trial_in_progress
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+        return await _collect(llm, fast)
+
+    assert asyncio.run(main()) == ["ok"]
+    assert llm.breaker.state == "closed"
+
+
+def test_rag_chain_keeps_partial_text_when_the_stream_breaks():
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from src.bot_engine.gemini_responder import RAGChain
+    from test_engine import FakeRetriever, FakeRouter
+
+    class BrokenChain:
+        async def astream(self, inputs: dict):
+            yield "The fee is"
+            raise ConnectionError("stream reset")
+
+    rag_chain = RAGChain(FakeRetriever(), {"default": BrokenChain()}, FakeRouter(),
+                         DeterministicFakeEmbedding(size=16), resilient_llm=ResilientLLM(hedge_enabled=False))
+    answer = asyncio.run(rag_chain.ainvoke("what is the tatkal fee"))
+    assert answer.startswith("The fee is\n\n_(The answer was interrupted: LLM stream failed")
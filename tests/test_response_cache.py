@@ -0,0 +1,79 @@
+# tests/test_response_cache.py
+
+import os
+import sys
+
+import numpy as np
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.response_cache import SemanticResponseCache, get_index_version
+
+
+def unit(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def test_paraphrase_above_threshold_hits():
+    cache = SemanticResponseCache("v1", similarity_threshold=0.9)
+    cache.store("What is the refund policy?", unit(1, 0, 0), "30 days.", latency=2.0)
+
+    entry = cache.lookup(unit(0.99, 0.1, 0))
+
+    assert entry["answer"] == "30 days."
+    assert entry["similarity"] >= 0.9
+    assert cache.stats()["saved_llm_seconds"] == 2.0
+
+
+def test_different_question_below_threshold_misses():
+    cache = SemanticResponseCache("v1", similarity_threshold=0.9)
+    cache.store("What is the refund policy?", unit(1, 0, 0), "30 days.", latency=2.0)
+
+    assert cache.lookup(unit(0, 1, 0)) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticResponseCache("v1", similarity_threshold=0.9, max_entries=2)
+    cache.store("a", unit(1, 0, 0), "A", latency=1.0)
+    cache.store("b", unit(0, 1, 0), "B", latency=1.0)
+    cache.lookup(unit(1, 0, 0))  # "a" is now the most recently used
+    cache.store("c", unit(0, 0, 1), "C", latency=1.0)
+
+    assert cache.lookup(unit(1, 0, 0))["answer"] == "A"
+    assert cache.lookup(unit(0, 1, 0)) is None
+    assert cache.stats()["size"] == 2
+
+
+def test_persisted_entries_survive_a_restart_on_the_same_index(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    SemanticResponseCache("v1", persist_path=path).store("a", unit(1, 0, 0), "A", latency=1.0)
+
+    reopened = SemanticResponseCache("v1", persist_path=path)
+
+    assert reopened.lookup(unit(1, 0, 0))["answer"] == "A"
+
+
+def test_persisted_entries_are_dropped_when_the_index_version_changes(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    SemanticResponseCache("v1", persist_path=path).store("a", unit(1, 0, 0), "A", latency=1.0)
+
+    rebuilt = SemanticResponseCache("v2", persist_path=path)
+
+    assert rebuilt.stats()["size"] == 0
+    assert rebuilt.lookup(unit(1, 0, 0)) is None
+    # The stale rows are deleted from the file, not just skipped.
+    assert SemanticResponseCache("v1", persist_path=path).stats()["size"] == 0
+
+
+def test_index_version_changes_when_the_index_is_rebuilt(tmp_path):
+    index_file = tmp_path / "index.faiss"
+    index_file.write_bytes(b"old")
+    before = get_index_version(str(tmp_path))
+
+    index_file.write_bytes(b"rebuilt index")
+
+    assert get_index_version(str(tmp_path)) != before
+    assert get_index_version(str(tmp_path)) == get_index_version(str(tmp_path))
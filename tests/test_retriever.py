@@ -0,0 +1,71 @@
+# tests/test_retriever.py
+
+import os
+import sys
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.vector_store.parent_store import ParentStore, ParentWriter
+from src.vector_store.retriever import AdaptiveRetriever, SectionParentRetriever, choose_k
+
+
+@pytest.mark.parametrize("scores, expected", [
+    ([0.9, 0.88, 0.86, 0.85], 4),          # No cut: everything up to max_k.
+    ([0.9, 0.88, 0.6, 0.58], 2),           # A drop larger than the gap.
+    ([0.9, 0.88, 0.86, 0.45], 3),          # A score under the absolute threshold.
+    ([0.9, 0.3, 0.2], 2),                  # Cuts never go below min_k ...
+    ([0.9], 1),                            # ... unless there are fewer results than that.
+    ([], 0),
+    ([0.9, 0.89, 0.88, 0.87, 0.86, 0.85], 5),  # Never more than max_k.
+])
+def test_choose_k(scores, expected):
+    assert choose_k(scores, min_k=2, max_k=5, score_threshold=0.5, score_gap=0.1) == expected
+
+
+class FixedStore(VectorStore):
+    """Returns the same Document objects for every query, as a shared docstore would."""
+
+    def __init__(self, results: list[tuple[Document, float]]):
+        self.results = results
+
+    def similarity_search_with_relevance_scores(self, query, k=4, **kwargs):
+        return self.results[:k]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.results[:k]]
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError
+
+
+def test_adaptive_retriever_scores_copies_not_the_stored_documents():
+    shared = [Document(page_content="refunds", metadata={"source": "a.pdf"}),
+              Document(page_content="tatkal", metadata={"source": "a.pdf"})]
+    retriever = AdaptiveRetriever(vectorstore=FixedStore(list(zip(shared, [0.9, 0.85]))))
+    docs = retriever.invoke("refund")
+    assert [doc.metadata["relevance_score"] for doc in docs] == [0.9, 0.85]
+    assert all("relevance_score" not in doc.metadata for doc in shared)
+
+
+def test_parent_retriever_returns_each_section_once_with_its_best_child_score(tmp_path):
+    with ParentWriter(str(tmp_path)) as parents:
+        for section in ("Refunds", "Tatkal"):
+            parents.add(Document(page_content=f"{section} text", metadata={"source": "a.pdf", "section": section}))
+    children = [(Document(page_content="c1", metadata={"parent_id": 1}), 0.9),
+                (Document(page_content="c2", metadata={"parent_id": 0}), 0.8),
+                (Document(page_content="c3", metadata={"parent_id": 1}), 0.7)]
+    retriever = SectionParentRetriever(child_retriever=AdaptiveRetriever(vectorstore=FixedStore(children)),
+                                       parent_store=ParentStore(str(tmp_path)))
+    docs = retriever.invoke("tatkal")
+    assert [(doc.metadata["section"], doc.metadata["relevance_score"]) for doc in docs] == [("Tatkal", 0.9),
+                                                                                          ("Refunds", 0.8)]
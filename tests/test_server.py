@@ -0,0 +1,52 @@
+# tests/test_server.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.api.server import make_handler
+
+
+class FakeEngine:
+    figure_index = None
+
+    def metrics(self) -> dict:
+        return {"single_flight": {"started": 0}}
+
+
+async def _request(raw: bytes) -> bytes:
+    server = await asyncio.start_server(make_handler(FakeEngine()), "127.0.0.1", 0)
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    return response
+
+
+@pytest.mark.parametrize("raw, status", [
+    (b"GET /health HTTP/1.1\r\n\r\n", b"200"),
+    (b"GET /metrics HTTP/1.1\r\n\r\n", b"200"),
+    (b"POST /health HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}", b"405"),
+    (b"DELETE /metrics HTTP/1.1\r\n\r\n", b"405"),
+    (b"POST /figures/figure-1-1.jpg HTTP/1.1\r\n\r\n", b"405"),
+    (b"GET /answer HTTP/1.1\r\n\r\n", b"405"),
+    (b"GET /nowhere HTTP/1.1\r\n\r\n", b"404"),
+    (b"POST /answer HTTP/1.1\r\nContent-Length: abc\r\n\r\n", b"400"),
+    (b"POST /answer HTTP/1.1\r\nContent-Length: -5\r\n\r\n", b"400"),
+])
+def test_status_codes(raw, status):
+    assert asyncio.run(_request(raw)).split(b" ")[1] == status
+
+
+def test_head_sends_headers_only():
+    response = asyncio.run(_request(b"HEAD /health HTTP/1.1\r\n\r\n"))
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200") and b"Content-Length: 16" in head and body == b""
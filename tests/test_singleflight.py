@@ -0,0 +1,117 @@
+# tests/test_singleflight.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.singleflight import SingleFlight
+
+
+async def _collect(flights: SingleFlight, key, factory) -> list:
+    return [event async for event in flights.stream(key, factory)]
+
+
+def test_a_late_joiner_gets_the_events_it_missed_and_the_rest():
+    flights = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        for n in range(3):
+            yield n
+            await asyncio.sleep(0.02)
+
+    async def main():
+        first = asyncio.create_task(_collect(flights, "q", compute))
+        await asyncio.sleep(0.03)  # The flight has published at least one event.
+        late = asyncio.create_task(_collect(flights, "q", compute))
+        return await first, await late
+
+    assert asyncio.run(main()) == ([0, 1, 2], [0, 1, 2])
+    assert len(runs) == 1
+    assert flights.stats() == {"started": 1, "coalesced": 1, "cancelled": 0, "in_flight": 0}
+
+
+def test_an_error_reaches_every_subscriber_after_the_events_before_it():
+    flights = SingleFlight()
+
+    async def compute():
+        yield "partial"
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+
+    async def subscriber(seen: list):
+        async for event in flights.stream("q", compute):
+            seen.append(event)
+
+    async def main():
+        seen = [[], []]
+        results = await asyncio.gather(subscriber(seen[0]), subscriber(seen[1]), return_exceptions=True)
+        return seen, results
+
+    seen, results = asyncio.run(main())
+    assert seen == [["partial"], ["partial"]]
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_a_finished_flight_is_not_reused():
+    flights = SingleFlight()
+
+    async def compute():
+        yield "answer"
+
+    async def main():
+        return await _collect(flights, "q", compute), await _collect(flights, "q", compute)
+
+    assert asyncio.run(main()) == (["answer"], ["answer"])
+    assert flights.stats()["started"] == 2
+
+
+def _slow_computation(state: dict):
+    async def compute():
+        try:
+            yield "first"
+            await asyncio.sleep(5)
+            yield "never"
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+    return compute
+
+
+def test_the_computation_is_cancelled_when_its_last_subscriber_leaves():
+    flights = SingleFlight()
+    state = {}
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(_collect(flights, "q", _slow_computation(state)), 0.05)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert state == {"cancelled": True}
+    assert flights.stats()["cancelled"] == 1 and flights.stats()["in_flight"] == 0
+
+
+def test_the_computation_keeps_running_while_a_subscriber_remains():
+    flights = SingleFlight()
+    state = {}
+
+    async def main():
+        staying = asyncio.create_task(_collect(flights, "q", _slow_computation(state)))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(_collect(flights, "q", _slow_computation(state)), 0.05)
+        await asyncio.sleep(0.01)
+        running = not staying.done() and flights.stats()["in_flight"] == 1
+        staying.cancel()
+        await asyncio.gather(staying, return_exceptions=True)
+        return running
+
+    assert asyncio.run(main())
+    assert state == {"cancelled": True}  # Only once the remaining subscriber left too.
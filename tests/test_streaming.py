@@ -0,0 +1,56 @@
+# tests/test_streaming.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.streaming import astream_clean_line_breaks, clean_line_breaks, stream_clean_line_breaks
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    (["a<br>b"], "a\nb"),
+    (["a<", "br>b"], "a\nb"),
+    (["a<b", "r>b"], "a\nb"),
+    (["a<br", ">b"], "a\nb"),
+    (["a<br><b", "r>b"], "a\n\nb"),
+    (["a<br", "><br>b"], "a\n\nb"),
+    (["a<", "b", "r", ">b"], "a\nb"),
+])
+def test_tags_split_across_chunks_are_replaced(chunks, expected):
+    assert "".join(stream_clean_line_breaks(chunks)) == expected
+
+
+def test_stream_matches_the_whole_text_cleaner():
+    text = "Step 1<br>Step 2<br><br>Note: 1 < 2 and <b>bold</b>"
+    chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+
+    assert "".join(stream_clean_line_breaks(chunks)) == clean_line_breaks(text)
+
+
+def test_trailing_partial_tag_is_flushed_as_text():
+    parts = list(stream_clean_line_breaks(["x < y", " <b"]))
+
+    assert "".join(parts) == "x < y <b"
+    assert parts[-1] == "<b"
+
+
+def test_only_a_possible_tag_is_held_back():
+    # Text that cannot start a tag is sent as soon as it arrives.
+    assert next(stream_clean_line_breaks(["hello", "<br>"])) == "hello"
+
+
+def test_async_stream_replaces_split_tags():
+    async def chunks():
+        for chunk in ["a<b", "r><b", "r>b", "<"]:
+            yield chunk
+
+    async def collect():
+        return [part async for part in astream_clean_line_breaks(chunks())]
+
+    assert "".join(asyncio.run(collect())) == "a\n\nb<"
@@ -0,0 +1,59 @@
+# tests/test_table_matcher.py
+
+import os
+import sys
+
+import pytest
+from langchain_core.documents import Document
+
+# --- System Path Setup ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from src.bot_engine.table_matcher import get_table_answer
+from src.ingestion.table_parser import format_rows
+from src.vector_store.table_store import TableStore, write_tables
+
+ROWS = [["Class", "Cancellation Fee", "Refund"],
+        ["Tatkal", "Rs. 100", "Nil"],
+        ["Sleeper", "Rs. 60", "50"]]
+CONFIG = {"min_score": 75, "min_margin": 10, "max_query_words": 10}
+
+
+@pytest.fixture
+def table_store(tmp_path):
+    content = "## Cancellation Charges\n\n--- TABLE START ---\n"
+    document = Document(
+        page_content=content + format_rows(ROWS) + "\n--- TABLE END ---\n",
+        metadata={"source": "rules.pdf", "page_starts": [[0, 4]],
+                  "tables": [{"offset": len(content), "page": 4, "rows": ROWS}]},
+    )
+    write_tables([document], str(tmp_path))
+    return TableStore.open(str(tmp_path))
+
+
+def test_answers_a_question_that_names_a_row_and_column(table_store):
+    answer, excerpts = get_table_answer("What is the cancellation fee for Tatkal?", table_store, CONFIG)
+    assert answer.startswith("**Cancellation Fee** for **Tatkal**: Rs. 100")
+    assert "Source: rules.pdf (Page: 4)" in answer
+    assert len(excerpts) == 1
+
+
+@pytest.mark.parametrize("question", [
+    "Can I get a refund if I cancel my sleeper ticket after the train has departed and the chart is prepared?",
+    "what is the cancellation fee for a sleeper tatkal ticket booked through an agent",
+])
+def test_leaves_questions_the_cell_only_partly_covers_to_the_llm(table_store, question):
+    answer, excerpts = get_table_answer(question, table_store, CONFIG)
+    assert answer is None
+    assert excerpts and all(doc.metadata["element_type"] == "table" for doc in excerpts)
+
+
+def test_a_short_question_naming_two_rows_is_ambiguous(table_store):
+    answer, excerpts = get_table_answer("cancellation fee tatkal sleeper", table_store, CONFIG)
+    assert answer is None
+    assert len(excerpts) == 2
+
+
+def test_source_filter_scopes_the_lookup(table_store):
+    assert get_table_answer("cancellation fee for tatkal", table_store, CONFIG, {"source": "other.pdf"}) == (None, [])